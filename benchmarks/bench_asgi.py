@@ -0,0 +1,153 @@
+"""Compare concurrent skill execution throughput: gunicorn sync workers vs ASGI.
+
+Usage:
+    python benchmarks/bench_asgi.py --concurrency 32 --requests 128 --sleep-ms 500
+
+Both servers are started from this checkout with the same worker count, and
+a throwaway skill that sleeps for ``--sleep-ms`` is used so the result shows
+how many executions each deployment keeps in flight.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SLEEP_SKILL = """import json, sys, time
+data = json.loads(sys.stdin.read() or "{}")
+time.sleep(data.get("sleepMs", 0) / 1000)
+print(json.dumps({"slept": data.get("sleepMs", 0)}))
+"""
+
+MODES = {
+    "wsgi": [
+        "skills_runtime_service.wsgi:application",
+    ],
+    "asgi": [
+        "skills_runtime_service.asgi:application",
+        "--worker-class",
+        "uvicorn_worker.UvicornWorker",
+    ],
+}
+
+
+def make_skill(root: Path) -> Path:
+    skill_dir = root / "skills" / "sleep"
+    skill_dir.mkdir(parents=True)
+    (skill_dir / "run.py").write_text(SLEEP_SKILL, encoding="utf-8")
+    (skill_dir / "skill.yaml").write_text(
+        json.dumps({"name": "sleep", "runtime": {"type": "python"}, "timeout": 120000}),
+        encoding="utf-8",
+    )
+    return skill_dir.parent
+
+
+def start_server(mode: str, port: int, workers: int, workdir: Path) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "SKILLS_DIR": str(workdir / "skills"),
+        "ARTIFACTS_DIR": str(workdir / f"artifacts-{mode}"),
+        "SQLITE_PATH": str(workdir / "db.sqlite3"),
+        "RUNTIME_ASYNC_VIEWS": "1" if mode == "asgi" else "0",
+    }
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        *MODES[mode],
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(workers),
+        "--timeout",
+        "120",
+    ]
+    proc = subprocess.Popen(
+        command,
+        cwd=str(ROOT),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit(f"{mode} server did not start on port {port}")
+
+
+def call(port: int, sleep_ms: int) -> float:
+    body = json.dumps({"skillName": "sleep", "input": {"sleepMs": sleep_ms}}).encode("utf-8")
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/skills/execute",
+        data=body,
+        headers={"Content-Type": "application/json"},
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=600) as response:
+        payload = json.loads(response.read())
+    if not payload.get("success"):
+        raise RuntimeError(payload)
+    return time.perf_counter() - started
+
+
+def run_load(port: int, concurrency: int, requests: int, sleep_ms: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies: List[float] = list(pool.map(lambda _: call(port, sleep_ms), range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "throughput": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "elapsed_s": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--sleep-ms", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument("--modes", default="wsgi,asgi")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="skills-bench-") as tmp:
+        workdir = Path(tmp)
+        make_skill(workdir)
+        print(f"{'mode':<6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'total s':>8}")
+        for offset, mode in enumerate(args.modes.split(",")):
+            port = args.port + offset
+            proc = start_server(mode, port, args.workers, workdir)
+            try:
+                stats = run_load(port, args.concurrency, args.requests, args.sleep_ms)
+            finally:
+                proc.terminate()
+                proc.wait()
+            print(
+                f"{mode:<6} {stats['throughput']:>8.2f} {stats['p50_ms']:>9.1f} "
+                f"{stats['p95_ms']:>9.1f} {stats['elapsed_s']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
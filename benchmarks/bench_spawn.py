@@ -0,0 +1,123 @@
+"""Measure skill process launch latency: per-call resolution vs compiled launch plans.
+
+Usage:
+    python benchmarks/bench_spawn.py --iterations 300
+
+Each variant starts ``/bin/true`` (or ``--command``) with stdin/stdout/stderr
+pipes, waits for it and records the wall time of the launch call itself:
+
+- legacy:      ``shutil.which`` + ``os.environ.copy()`` + ``Popen`` per call
+               (what ``_build_command``/``_build_env`` used to do)
+- plan:        argv and the allow-listed env prepared once, ``Popen`` per call
+               (cwd + new session, as the executor launches skills)
+- posix_spawn: ``os.posix_spawn`` with the same argv/env, for reference; it
+               cannot chdir into the skill directory, so the executor does
+               not use it
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from runtime.launch import allowed_env  # noqa: E402
+
+
+def popen(argv: List[str], env: Dict[str, str], cwd: str) -> None:
+    proc = subprocess.Popen(
+        argv,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=cwd,
+        env=env,
+        start_new_session=True,
+    )
+    proc.communicate()
+
+
+def legacy(command: str, cwd: str) -> Callable[[], None]:
+    def launch() -> None:
+        executable = shutil.which(command) or command
+        env = os.environ.copy()
+        env["SKILL_EXECUTION_ID"] = "exec-bench"
+        popen([executable], env, cwd)
+
+    return launch
+
+
+def plan(command: str, cwd: str) -> Callable[[], None]:
+    argv = [shutil.which(command) or command]
+    template = allowed_env()
+
+    def launch() -> None:
+        env = dict(template)
+        env["SKILL_EXECUTION_ID"] = "exec-bench"
+        popen(argv, env, cwd)
+
+    return launch
+
+
+def posix_spawn(command: str, cwd: str) -> Callable[[], None]:
+    executable = shutil.which(command) or command
+    template = allowed_env()
+
+    def launch() -> None:
+        env = dict(template)
+        env["SKILL_EXECUTION_ID"] = "exec-bench"
+        pid = os.posix_spawn(executable, [executable], env, setsid=True)
+        os.waitpid(pid, 0)
+
+    return launch
+
+
+def measure(launch: Callable[[], None], iterations: int) -> List[float]:
+    for _ in range(10):
+        launch()
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        launch()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--command", default="true")
+    parser.add_argument(
+        "--env-padding",
+        type=int,
+        default=100,
+        help="extra dummy variables in the server environment, to mimic a busy host",
+    )
+    args = parser.parse_args()
+
+    for index in range(args.env_padding):
+        os.environ[f"BENCH_PADDING_{index}"] = "x" * 64
+
+    cwd = str(ROOT)
+    print(f"{'variant':<12} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    for name, factory in (("legacy", legacy), ("plan", plan), ("posix_spawn", posix_spawn)):
+        samples = measure(factory(args.command, cwd), args.iterations)
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(
+            f"{name:<12} {statistics.median(samples):>8.3f} {p95:>8.3f} "
+            f"{statistics.mean(samples):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
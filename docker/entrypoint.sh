@@ -3,6 +3,38 @@ set -eu
 
 python manage.py migrate --noinput
 
+if [ -n "${SKILL_SPAWNER_SOCKET:-}" ]; then
+  python -m runtime.spawner --socket "$SKILL_SPAWNER_SOCKET" &
+  spawner_pid=$!
+  waited=0
+  while [ ! -S "$SKILL_SPAWNER_SOCKET" ]; do
+    if ! kill -0 "$spawner_pid" 2>/dev/null; then
+      echo "skill spawner exited before creating $SKILL_SPAWNER_SOCKET" >&2
+      exit 1
+    fi
+    if [ "$waited" -ge 100 ]; then
+      echo "timed out waiting for skill spawner socket $SKILL_SPAWNER_SOCKET" >&2
+      kill "$spawner_pid" 2>/dev/null || true
+      exit 1
+    fi
+    sleep 0.1
+    waited=$((waited + 1))
+  done
+fi
+
+if [ "${SERVER_MODE:-wsgi}" = "jobs" ]; then
+  exec python manage.py run_job_workers
+fi
+
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  export RUNTIME_ASYNC_VIEWS=1
+  exec gunicorn skills_runtime_service.asgi:application \
+    --worker-class uvicorn_worker.UvicornWorker \
+    --bind "0.0.0.0:${PORT:-8080}" \
+    --workers "${GUNICORN_WORKERS:-2}" \
+    --timeout "${GUNICORN_TIMEOUT:-30}"
+fi
+
 exec gunicorn skills_runtime_service.wsgi:application \
   --bind "0.0.0.0:${PORT:-8080}" \
   --workers "${GUNICORN_WORKERS:-2}" \
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import math
+import os
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from .models import SkillSpec
+from .process import start_time
+
+POLL_INTERVAL_SECONDS = 0.05
+DURATION_SMOOTHING = 0.2
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, message: str, retry_after: int) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionControl:
+    # Host-wide per-skill concurrency limit. State lives in
+    # ``<root>/<skill>.json`` and is only touched under an flock on
+    # ``<root>/<skill>.lock``, so every gunicorn worker sees the same running
+    # set and FIFO queue. Entries of processes that died are pruned.
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._pid = os.getpid()
+        self._start = start_time(self._pid)
+
+    def acquire(self, skill: SkillSpec) -> Optional[str]:
+        if not skill.max_concurrency:
+            return None
+        ticket = self._new_ticket()
+        deadline = time.monotonic() + skill.queue_timeout_ms / 1000
+        try:
+            while not self._try(skill, ticket, deadline):
+                time.sleep(POLL_INTERVAL_SECONDS)
+        except AdmissionRejected:
+            raise
+        except BaseException:
+            self._abandon(skill, ticket)
+            raise
+        return ticket
+
+    async def acquire_async(self, skill: SkillSpec) -> Optional[str]:
+        if not skill.max_concurrency:
+            return None
+        ticket = self._new_ticket()
+        deadline = time.monotonic() + skill.queue_timeout_ms / 1000
+        try:
+            while not await asyncio.to_thread(self._try, skill, ticket, deadline):
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+        except AdmissionRejected:
+            raise
+        except BaseException:
+            # A cancelled waiter must not stay at the head of the queue.
+            await asyncio.to_thread(self._abandon, skill, ticket)
+            raise
+        return ticket
+
+    def release(self, skill: SkillSpec, ticket: Optional[str], elapsed_seconds: float) -> None:
+        if ticket is None:
+            return
+        with self._state(skill) as state:
+            state["running"] = [e for e in state["running"] if e["ticket"] != ticket]
+            average = state.get("avgSeconds")
+            if average is None:
+                state["avgSeconds"] = elapsed_seconds
+            else:
+                state["avgSeconds"] = (
+                    average * (1 - DURATION_SMOOTHING) + elapsed_seconds * DURATION_SMOOTHING
+                )
+
+    def _abandon(self, skill: SkillSpec, ticket: str) -> None:
+        with self._state(skill) as state:
+            state["running"] = [e for e in state["running"] if e["ticket"] != ticket]
+            state["queue"] = [e for e in state["queue"] if e["ticket"] != ticket]
+
+    def _try(self, skill: SkillSpec, ticket: str, deadline: float) -> bool:
+        with self._state(skill) as state:
+            running = state["running"]
+            queue = state["queue"]
+            position = next((i for i, e in enumerate(queue) if e["ticket"] == ticket), None)
+
+            if position is None:
+                if not queue and len(running) < skill.max_concurrency:
+                    running.append(self._entry(ticket))
+                    return True
+                if len(queue) >= skill.queue_size:
+                    raise AdmissionRejected(
+                        f"Skill '{skill.name}' is at capacity",
+                        self._retry_after(skill, state),
+                    )
+                queue.append(self._entry(ticket))
+                return False
+
+            if position == 0 and len(running) < skill.max_concurrency:
+                running.append(queue.pop(0))
+                return True
+            if time.monotonic() >= deadline:
+                del queue[position]
+                raise AdmissionRejected(
+                    f"Timed out waiting for a '{skill.name}' slot",
+                    self._retry_after(skill, state),
+                )
+            return False
+
+    @contextmanager
+    def _state(self, skill: SkillSpec) -> Iterator[Dict[str, Any]]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{skill.name}.json"
+        fd = os.open(self.root / f"{skill.name}.lock", os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                state = {}
+            state.setdefault("running", [])
+            state.setdefault("queue", [])
+            state["running"] = [e for e in state["running"] if self._alive(e)]
+            state["queue"] = [e for e in state["queue"] if self._alive(e)]
+            try:
+                yield state
+            finally:
+                tmp_fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+                with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                    json.dump(state, fh)
+                os.replace(tmp, path)
+        finally:
+            os.close(fd)
+
+    def _entry(self, ticket: str) -> Dict[str, Any]:
+        return {"ticket": ticket, "pid": self._pid, "start": self._start}
+
+    def _alive(self, entry: Dict[str, Any]) -> bool:
+        if entry.get("pid") == self._pid:
+            return True
+        return start_time(entry.get("pid", 0)) == entry.get("start")
+
+    def _new_ticket(self) -> str:
+        if os.getpid() != self._pid:
+            # Forked gunicorn workers inherit the executor built in the master.
+            self._pid = os.getpid()
+            self._start = start_time(self._pid)
+        return uuid.uuid4().hex
+
+    def _retry_after(self, skill: SkillSpec, state: Dict[str, Any]) -> int:
+        average = state.get("avgSeconds") or 1.0
+        waves = (len(state["queue"]) + 1) / skill.max_concurrency
+        return max(1, math.ceil(average * waves))
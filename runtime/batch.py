@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from .admission import AdmissionRejected
+from .executor import SkillExecutor
+from .models import ExecutionResult, SkillSpec
+from .payload import result_payload
+from .registry import SkillRegistry
+from .spawner import SpawnerUnavailable
+
+
+@dataclass
+class BatchItem:
+    index: int
+    skill_name: Optional[str]
+    skill: Optional[SkillSpec]
+    input_data: Dict[str, Any]
+    timeout_ms: Optional[int]
+
+
+def parse_timeout_ms(value: Any) -> Optional[int]:
+    # options.timeoutMs: absent, or a positive integer number of milliseconds.
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+        raise ValueError("options.timeoutMs must be a positive integer")
+    return value
+
+
+def parse_items(registry: SkillRegistry, raw_items: Any) -> List[BatchItem]:
+    if not isinstance(raw_items, list):
+        raise ValueError("items must be a list")
+    items: List[BatchItem] = []
+    for index, raw in enumerate(raw_items):
+        raw = raw if isinstance(raw, dict) else {}
+        skill_name = raw.get("skillName")
+        options = raw.get("options") or {}
+        if not isinstance(options, dict):
+            raise ValueError(f"items[{index}].options must be an object")
+        items.append(
+            BatchItem(
+                index=index,
+                skill_name=skill_name,
+                skill=registry.get(skill_name) if skill_name else None,
+                input_data=raw.get("input") or {},
+                timeout_ms=parse_timeout_ms(options.get("timeoutMs")),
+            )
+        )
+    return items
+
+
+def _invalid(item: BatchItem) -> Optional[Dict[str, Any]]:
+    if not item.skill_name:
+        return {"success": False, "status": 400, "error": "skillName is required"}
+    if item.skill is None:
+        return {"success": False, "status": 404, "error": "Skill not found"}
+    return None
+
+
+def _finished(result: ExecutionResult) -> Dict[str, Any]:
+    return {"status": 200 if result.success else 500, **result_payload(result)}
+
+
+def _rejected(exc: AdmissionRejected) -> Dict[str, Any]:
+    return {"success": False, "status": 429, "error": str(exc), "retryAfter": exc.retry_after}
+
+
+def _failed(exc: Exception) -> Dict[str, Any]:
+    status = 503 if isinstance(exc, SpawnerUnavailable) else 500
+    return {"success": False, "status": status, "error": str(exc)}
+
+
+def _timed(item: BatchItem, payload: Dict[str, Any], queued: float, started: float) -> Dict[str, Any]:
+    return {
+        "index": item.index,
+        "skillName": item.skill_name,
+        **payload,
+        "queuedMs": round(queued * 1000, 1),
+        "durationMs": round((time.monotonic() - started) * 1000, 1),
+    }
+
+
+def run_batch(
+    executor: SkillExecutor,
+    items: List[BatchItem],
+    parallelism: int,
+) -> Iterator[Dict[str, Any]]:
+    # Yields one payload per item in completion order; each carries its index.
+    batch_started = time.monotonic()
+
+    def run(item: BatchItem) -> Dict[str, Any]:
+        started = time.monotonic()
+        payload = _invalid(item)
+        if payload is None:
+            try:
+                payload = _finished(
+                    executor.execute(item.skill, input_data=item.input_data, timeout_ms=item.timeout_ms)
+                )
+            except AdmissionRejected as exc:
+                payload = _rejected(exc)
+            except Exception as exc:  # noqa: BLE001
+                payload = _failed(exc)
+        return _timed(item, payload, started - batch_started, started)
+
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        futures = [pool.submit(run, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+async def run_batch_async(
+    executor: SkillExecutor,
+    items: List[BatchItem],
+    parallelism: int,
+) -> AsyncIterator[Dict[str, Any]]:
+    batch_started = time.monotonic()
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+
+    async def run(item: BatchItem) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.monotonic()
+            payload = _invalid(item)
+            if payload is None:
+                try:
+                    payload = _finished(
+                        await executor.execute_async(
+                            item.skill,
+                            input_data=item.input_data,
+                            timeout_ms=item.timeout_ms,
+                        )
+                    )
+                except AdmissionRejected as exc:
+                    payload = _rejected(exc)
+                except Exception as exc:  # noqa: BLE001
+                    payload = _failed(exc)
+            return _timed(item, payload, started - batch_started, started)
+
+    tasks = [asyncio.ensure_future(run(item)) for item in items]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
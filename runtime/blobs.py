@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+READ_CHUNK = 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+GZIP_SUFFIX = ".gz"
+
+
+@dataclass
+class StoredArtifact:
+    path: str
+    digest: str
+    size: int
+    encoding: Optional[str] = None
+
+
+class BlobStore:
+    # Content-addressed store under ARTIFACTS_DIR/.blobs. Uncompressed blobs
+    # are hardlinked into execution directories so identical artifacts share
+    # one inode; a gzip blob replaces the file, which then lives only in the
+    # execution's manifest.
+
+    def __init__(self, root: Path, compress: bool = False) -> None:
+        self.root = root
+        self.compress = compress
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, digest: str, encoding: Optional[str] = None) -> Path:
+        suffix = GZIP_SUFFIX if encoding == "gzip" else ""
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def has(self, digest: str) -> bool:
+        return self.blob_path(digest).exists() or self.blob_path(digest, "gzip").exists()
+
+    def ingest(self, exec_dir: Path, rel_path: str) -> Optional[StoredArtifact]:
+        path = exec_dir / rel_path
+        try:
+            if self.compress:
+                return self._ingest_compressed(path, rel_path)
+            return self._ingest_linked(path, rel_path)
+        except OSError:
+            return None
+
+    def write_manifest(self, exec_dir: Path, stored: List[StoredArtifact]) -> None:
+        entries = [
+            {"path": item.path, "digest": item.digest, "size": item.size, "encoding": item.encoding}
+            for item in stored
+        ]
+        fd, tmp = tempfile.mkstemp(dir=exec_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"artifacts": entries}, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, exec_dir / MANIFEST_NAME)
+
+    def read_manifest(self, exec_dir: Path) -> Dict[str, StoredArtifact]:
+        try:
+            data = json.loads((exec_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return {
+            entry["path"]: StoredArtifact(
+                path=entry["path"],
+                digest=entry["digest"],
+                size=entry["size"],
+                encoding=entry.get("encoding"),
+            )
+            for entry in data.get("artifacts") or []
+        }
+
+    def _ingest_linked(self, path: Path, rel_path: str) -> StoredArtifact:
+        digest, size = _hash_file(path)
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        if blob.exists():
+            _replace_with_link(blob, path)
+        else:
+            try:
+                os.link(path, blob)
+                os.chmod(blob, 0o444)
+            except FileExistsError:
+                _replace_with_link(blob, path)
+            except OSError:
+                # Filesystems without hardlinks keep a plain copy per execution.
+                _copy_into(path, blob)
+        return StoredArtifact(rel_path, digest, size)
+
+    def _ingest_compressed(self, path: Path, rel_path: str) -> StoredArtifact:
+        # One pass over the file both hashes it and writes the gzip stream.
+        hasher = hashlib.sha256()
+        size = 0
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as gz:
+                    for chunk in iter(lambda: src.read(READ_CHUNK), b""):
+                        hasher.update(chunk)
+                        size += len(chunk)
+                        gz.write(chunk)
+            digest = hasher.hexdigest()
+            if self.blob_path(digest).exists():
+                os.unlink(tmp)
+                _replace_with_link(self.blob_path(digest), path)
+                return StoredArtifact(rel_path, digest, size)
+            blob = self.blob_path(digest, "gzip")
+            if blob.exists():
+                os.unlink(tmp)
+                # Marks the blob as in use for the retention GC.
+                os.utime(blob)
+            else:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                os.chmod(tmp, 0o444)
+                os.replace(tmp, blob)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        os.unlink(path)
+        return StoredArtifact(rel_path, digest, size, encoding="gzip")
+
+
+def _hash_file(path: Path) -> Tuple[str, int]:
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(READ_CHUNK), b""):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def _replace_with_link(blob: Path, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.link")
+    try:
+        os.link(blob, tmp)
+    except OSError:
+        return
+    os.replace(tmp, path)
+
+
+def _copy_into(path: Path, blob: Path) -> None:
+    fd, tmp = tempfile.mkstemp(dir=blob.parent, suffix=".tmp")
+    os.close(fd)
+    shutil.copyfile(path, tmp)
+    os.chmod(tmp, 0o444)
+    os.replace(tmp, blob)
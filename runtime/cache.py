@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import ExecutionResult, SkillSpec
+
+IGNORED_DIRS = {"__pycache__", ".git"}
+HASH_CHUNK = 1 << 20
+
+
+class ResultCache:
+    def __init__(
+        self,
+        root: Path,
+        max_bytes: int = 256 * 1024 * 1024,
+        memory_entries: int = 1024,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._digests: Dict[Path, Tuple[Tuple[Any, ...], str]] = {}
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        fields: Optional[List[str]] = None,
+    ) -> str:
+        if fields is not None:
+            input_data = {name: input_data.get(name) for name in fields}
+        canonical = json.dumps(
+            input_data,
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256()
+        digest.update(self.skill_digest(skill).encode("ascii"))
+        digest.update(b"\0")
+        digest.update(canonical.encode("utf-8"))
+        return digest.hexdigest()
+
+    def skill_digest(self, skill: SkillSpec) -> str:
+        # Content hash of the skill directory. Files are only re-read when
+        # their size or mtime changed since the previous call.
+        files = self._skill_files(skill)
+        signature = tuple(
+            (rel, stat.st_size, stat.st_mtime_ns) for rel, _, stat in files
+        )
+        with self._lock:
+            known = self._digests.get(skill.path)
+        if known is not None and known[0] == signature:
+            return known[1]
+
+        digest = hashlib.sha256()
+        for rel, path, _ in files:
+            digest.update(rel.encode("utf-8") + b"\0")
+            try:
+                with open(path, "rb") as fh:
+                    for chunk in iter(lambda: fh.read(HASH_CHUNK), b""):
+                        digest.update(chunk)
+            except OSError:
+                continue
+            digest.update(b"\0")
+        value = digest.hexdigest()
+        with self._lock:
+            self._digests[skill.path] = (signature, value)
+        return value
+
+    def get(self, key: str) -> Optional[ExecutionResult]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry["expiresAt"] > now:
+                    self._memory.move_to_end(key)
+                    return self._result(entry)
+                del self._memory[key]
+
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("expiresAt", 0) <= now:
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._remember(key, entry)
+        return self._result(entry)
+
+    def put(self, key: str, result: ExecutionResult, ttl_ms: int) -> None:
+        entry = {
+            "expiresAt": time.time() + ttl_ms / 1000,
+            "executionId": result.execution_id,
+            "output": result.output,
+            "artifacts": result.artifacts,
+            "artifactDetails": result.artifact_details,
+            "stderr": result.stderr,
+        }
+        self._remember(key, entry)
+
+        path = self._entry_path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        self._account(len(data))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        self._remove(self._entry_path(key))
+
+    def _skill_files(self, skill: SkillSpec) -> List[Tuple[str, Path, os.stat_result]]:
+        # Declared artifacts are written into the skill directory by the skill
+        # itself, so they must not change the digest.
+        excluded = {(skill.path / rel).resolve() for rel in skill.artifacts}
+        files: List[Tuple[str, Path, os.stat_result]] = []
+        for dirpath, dirnames, filenames in os.walk(skill.path):
+            dirnames[:] = sorted(d for d in dirnames if d not in IGNORED_DIRS)
+            for filename in sorted(filenames):
+                path = Path(dirpath) / filename
+                if path.suffix == ".pyc" or path.resolve() in excluded:
+                    continue
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((path.relative_to(skill.path).as_posix(), path, stat))
+        return files
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _result(self, entry: Dict[str, Any]) -> ExecutionResult:
+        return ExecutionResult(
+            success=True,
+            execution_id=entry["executionId"],
+            output=entry["output"],
+            artifacts=list(entry.get("artifacts") or []),
+            artifact_details=list(entry.get("artifactDetails") or []),
+            stderr=entry.get("stderr"),
+            exit_code=0,
+            cached=True,
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _account(self, size: int) -> None:
+        # Every gunicorn worker keeps its own running estimate; the directory
+        # itself is the source of truth whenever eviction actually runs.
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(stat.st_size for _, stat in self._scan())
+            else:
+                self._disk_bytes += size
+            if self._disk_bytes <= self.max_bytes:
+                return
+            self._disk_bytes = self._evict()
+
+    def _scan(self) -> List[Tuple[Path, os.stat_result]]:
+        entries: List[Tuple[Path, os.stat_result]] = []
+        for path in self.root.glob("*/*.json"):
+            try:
+                entries.append((path, path.stat()))
+            except OSError:
+                continue
+        return entries
+
+    def _evict(self) -> int:
+        entries = sorted(self._scan(), key=lambda item: item[1].st_mtime)
+        total = sum(stat.st_size for _, stat in entries)
+        target = self.max_bytes * 0.9
+        for path, stat in entries:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= stat.st_size
+        return total
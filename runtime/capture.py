@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import select
+import selectors
+import subprocess
+import time
+
+READ_CHUNK = 65536
+DRAIN_GRACE_SECONDS = 1
+
+
+class OutputCapture:
+    def __init__(self, max_stdout_bytes: int, max_stderr_bytes: int) -> None:
+        self.max_stdout_bytes = max_stdout_bytes
+        self.max_stderr_bytes = max_stderr_bytes
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self.stdout_exceeded = False
+        self.stderr_truncated = False
+
+    def feed_stdout(self, chunk: bytes) -> bool:
+        if len(self.stdout) + len(chunk) > self.max_stdout_bytes:
+            self.stdout_exceeded = True
+            return False
+        self.stdout.extend(chunk)
+        return True
+
+    def feed_stderr(self, chunk: bytes) -> None:
+        self.stderr.extend(chunk)
+        overflow = len(self.stderr) - self.max_stderr_bytes
+        if overflow > 0:
+            del self.stderr[:overflow]
+            self.stderr_truncated = True
+
+    def stderr_text(self) -> str:
+        data = self.stderr
+        if self.stderr_truncated:
+            start = 0
+            while start < len(data) and data[start] & 0xC0 == 0x80:
+                start += 1
+            data = data[start:]
+        return data.decode("utf-8", errors="replace")
+
+
+def pump(
+    proc: subprocess.Popen,
+    stdin: bytes,
+    timeout_seconds: float,
+    capture: OutputCapture,
+) -> bool:
+    # Returns True on timeout. Stops early when stdout crosses its limit; the
+    # caller terminates the child in both cases.
+    deadline = time.monotonic() + timeout_seconds
+    view = memoryview(stdin)
+    offset = 0
+    with selectors.DefaultSelector() as selector:
+        if view:
+            selector.register(proc.stdin, selectors.EVENT_WRITE)
+        else:
+            proc.stdin.close()
+        selector.register(proc.stdout, selectors.EVENT_READ)
+        selector.register(proc.stderr, selectors.EVENT_READ)
+
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            for key, _ in selector.select(remaining):
+                if key.fileobj is proc.stdin:
+                    try:
+                        offset += os.write(key.fd, view[offset:offset + select.PIPE_BUF])
+                    except BrokenPipeError:
+                        offset = len(view)
+                    if offset >= len(view):
+                        selector.unregister(proc.stdin)
+                        proc.stdin.close()
+                    continue
+                chunk = os.read(key.fd, READ_CHUNK)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                elif key.fileobj is proc.stdout:
+                    if not capture.feed_stdout(chunk):
+                        return False
+                else:
+                    capture.feed_stderr(chunk)
+
+    try:
+        proc.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        return True
+    return False
+
+
+async def pump_async(
+    proc: asyncio.subprocess.Process,
+    stdin: bytes,
+    timeout_seconds: float,
+    capture: OutputCapture,
+) -> bool:
+    async def read_stdout() -> None:
+        while True:
+            chunk = await proc.stdout.read(READ_CHUNK)
+            if not chunk or not capture.feed_stdout(chunk):
+                return
+
+    async def read_stderr() -> None:
+        while True:
+            chunk = await proc.stderr.read(READ_CHUNK)
+            if not chunk:
+                return
+            capture.feed_stderr(chunk)
+
+    async def run() -> None:
+        try:
+            proc.stdin.write(stdin)
+            await proc.stdin.drain()
+            proc.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        await stdout_task
+        if not capture.stdout_exceeded:
+            await proc.wait()
+
+    stdout_task = asyncio.ensure_future(read_stdout())
+    stderr_task = asyncio.ensure_future(read_stderr())
+    try:
+        await asyncio.wait_for(run(), timeout=timeout_seconds)
+        timed_out = False
+    except asyncio.TimeoutError:
+        timed_out = True
+    if not timed_out and not capture.stdout_exceeded:
+        await asyncio.wait([stderr_task], timeout=DRAIN_GRACE_SECONDS)
+    stdout_task.cancel()
+    stderr_task.cancel()
+    return timed_out
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import dataclasses
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .models import ExecutionResult
+
+STALE_RESULT_SECONDS = 60
+
+
+class Coalescer:
+    # Single-flight for identical executions. Inside one process callers share
+    # a Future; across processes the leader holds an flock on ``<key>.lock``
+    # and hands its result over in ``<key>.json`` before unlinking the lock.
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: str) -> Tuple[bool, Future]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._inflight[key] = future
+            return True, future
+
+    def leave(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def acquire(self, key: str) -> Tuple[Optional[int], Optional[ExecutionResult]]:
+        # Returns (lock fd, None) when the caller should run the execution, or
+        # (None, result) when another process already produced it.
+        self.root.mkdir(parents=True, exist_ok=True)
+        lock_path = self.root / f"{key}.lock"
+        result_path = self.root / f"{key}.json"
+        started = time.time()
+        while True:
+            fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                contended = False
+            except BlockingIOError:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                contended = True
+
+            current = self._same_file(fd, lock_path)
+            shared = self._read(result_path, started) if contended or not current else None
+            if shared is not None:
+                os.close(fd)
+                return None, shared
+            if current:
+                self._prune()
+                return fd, None
+            # The previous leader unlinked the lock without leaving a result
+            # we can use; start over on the new lock file.
+            os.close(fd)
+
+    def publish(self, key: str, fd: int, result: ExecutionResult) -> None:
+        payload = {"finishedAt": time.time(), "result": dataclasses.asdict(result)}
+        try:
+            tmp_fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+            with os.fdopen(tmp_fd, "w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False)
+            os.replace(tmp, self.root / f"{key}.json")
+        except (OSError, TypeError, ValueError):
+            pass
+        self.release(key, fd)
+
+    def release(self, key: str, fd: int) -> None:
+        try:
+            os.unlink(self.root / f"{key}.lock")
+        except OSError:
+            pass
+        os.close(fd)
+
+    def _same_file(self, fd: int, path: Path) -> bool:
+        try:
+            return os.fstat(fd).st_ino == os.stat(path).st_ino
+        except OSError:
+            return False
+
+    def _read(self, path: Path, since: float) -> Optional[ExecutionResult]:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if payload.get("finishedAt", 0) < since:
+            return None
+        try:
+            return ExecutionResult(**payload["result"])
+        except (KeyError, TypeError):
+            return None
+
+    def _prune(self) -> None:
+        cutoff = time.time() - STALE_RESULT_SECONDS
+        for path in self.root.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import re
+import unicodedata
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from .blobs import BlobStore
+from .executor import RESERVED_FILES
+
+EXECUTION_ID = re.compile(r"^exec-[0-9a-f]{12}$")
+CHUNK_SIZE = 256 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_UNSAFE_FILENAME = re.compile(r'[^\x20-\x7e]|["\\]')
+
+
+@dataclass
+class ArtifactFile:
+    name: str
+    path: Path
+    size: int
+    etag: str
+    # "gzip" when ``path`` is a compressed blob rather than the file itself.
+    encoding: Optional[str] = None
+
+    @property
+    def content_type(self) -> str:
+        return mimetypes.guess_type(self.name)[0] or "application/octet-stream"
+
+
+@dataclass
+class DownloadPlan:
+    status: int
+    headers: Dict[str, str] = field(default_factory=dict)
+    start: int = 0
+    length: int = 0
+    # Send the stored gzip bytes as they are (Content-Encoding: gzip).
+    raw: bool = False
+
+
+def list_artifacts(
+    artifacts_dir: Path,
+    blobs: BlobStore,
+    execution_id: str,
+) -> Optional[List[ArtifactFile]]:
+    if not EXECUTION_ID.match(execution_id):
+        return None
+    exec_dir = artifacts_dir / execution_id
+    if not exec_dir.is_dir():
+        return None
+    manifest = blobs.read_manifest(exec_dir)
+    if not manifest:
+        return _unindexed(exec_dir)
+
+    artifacts: List[ArtifactFile] = []
+    for name, item in manifest.items():
+        etag = f'"{item.digest}"'
+        if item.encoding == "gzip":
+            path = blobs.blob_path(item.digest, "gzip")
+        elif (exec_dir / name).is_file():
+            path = exec_dir / name
+        else:
+            path = blobs.blob_path(item.digest)
+        if path.is_file():
+            artifacts.append(ArtifactFile(name, path, item.size, etag, item.encoding))
+    return artifacts
+
+
+def find_artifact(
+    artifacts_dir: Path,
+    blobs: BlobStore,
+    execution_id: str,
+    name: str,
+) -> Optional[ArtifactFile]:
+    for artifact in list_artifacts(artifacts_dir, blobs, execution_id) or []:
+        if artifact.name == name:
+            return artifact
+    return None
+
+
+def _unindexed(exec_dir: Path) -> List[ArtifactFile]:
+    # Executions whose artifacts never reached the blob store still serve the
+    # files in place, with a weak validator.
+    artifacts: List[ArtifactFile] = []
+    root = exec_dir.resolve()
+    for path in sorted(exec_dir.rglob("*")):
+        name = path.relative_to(exec_dir).as_posix()
+        if name in RESERVED_FILES or not path.is_file() or path.name.startswith("."):
+            continue
+        if not path.resolve().is_relative_to(root):
+            continue
+        stat = path.stat()
+        etag = f'W/"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        artifacts.append(ArtifactFile(name, path, stat.st_size, etag))
+    return artifacts
+
+
+def plan_download(
+    artifact: ArtifactFile,
+    range_header: Optional[str] = None,
+    if_range: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+    accept_encoding: Optional[str] = None,
+) -> DownloadPlan:
+    headers = {
+        "Content-Type": artifact.content_type,
+        "ETag": artifact.etag,
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition("inline", Path(artifact.name).name),
+    }
+    if artifact.encoding:
+        headers["Vary"] = "Accept-Encoding"
+    if if_none_match and _none_match(if_none_match, artifact.etag):
+        return DownloadPlan(304, headers)
+
+    byte_range = None
+    # If-Range needs a strong validator that still matches; otherwise the
+    # client gets the whole file.
+    strong_match = if_range == artifact.etag and not artifact.etag.startswith("W/")
+    if range_header and (not if_range or strong_match):
+        byte_range = _parse_range(range_header, artifact.size)
+        if byte_range == (-1, -1):
+            headers["Content-Range"] = f"bytes */{artifact.size}"
+            return DownloadPlan(416, headers)
+
+    if byte_range is None:
+        if artifact.encoding == "gzip" and "gzip" in (accept_encoding or ""):
+            headers["Content-Encoding"] = "gzip"
+            size = artifact.path.stat().st_size
+            headers["Content-Length"] = str(size)
+            return DownloadPlan(200, headers, 0, size, raw=True)
+        headers["Content-Length"] = str(artifact.size)
+        return DownloadPlan(200, headers, 0, artifact.size)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return DownloadPlan(206, headers, start, end - start + 1)
+
+
+def content_disposition(disposition: str, filename: str) -> str:
+    # RFC 6266: a quoted ASCII fallback for old clients plus the exact name
+    # as RFC 5987 filename*. Headers must stay latin-1 encodable.
+    decomposed = unicodedata.normalize("NFKD", filename)
+    fallback = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    fallback = _UNSAFE_FILENAME.sub("_", fallback).strip() or "download"
+    value = f'{disposition}; filename="{fallback}"'
+    if fallback != filename:
+        value += f"; filename*=UTF-8''{quote(filename, safe='')}"
+    return value
+
+
+def _none_match(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison: opaque tags without W/.
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    # Single byte ranges only; anything else is ignored and served in full.
+    # (-1, -1) marks an unsatisfiable range.
+    match = _RANGE.match(header.strip())
+    if not match or not (match.group(1) or match.group(2)):
+        return None
+    first, last = match.group(1), match.group(2)
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return -1, -1
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return -1, -1
+    return start, end
+
+
+def sendfile_span(artifact: ArtifactFile, plan: DownloadPlan) -> Optional[Tuple[Path, int, int]]:
+    # Byte spans that exist verbatim on disk can go through os.sendfile.
+    if artifact.encoding == "gzip" and not plan.raw:
+        return None
+    return artifact.path, plan.start, plan.length
+
+
+def iter_content(artifact: ArtifactFile, plan: DownloadPlan) -> Iterator[bytes]:
+    if artifact.encoding == "gzip" and not plan.raw:
+        source: BinaryIO = gzip.open(artifact.path, "rb")
+    else:
+        source = open(artifact.path, "rb")
+    with source:
+        # Seeking a gzip stream decompresses up to the offset.
+        source.seek(plan.start)
+        remaining = plan.length
+        while remaining > 0:
+            chunk = source.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def send_span(out_fd: int, path: Path, offset: int, count: int) -> None:
+    with open(path, "rb") as fh:
+        while count > 0:
+            sent = os.sendfile(out_fd, fh.fileno(), offset, min(count, 1 << 30))
+            if sent == 0:
+                break
+            offset += sent
+            count -= sent
+
+
+class _ZipSink:
+    # Write-only, non-seekable target: zipfile then emits data descriptors
+    # and the archive can be streamed while it is built.
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self._written = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._written += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_zip(artifacts: List[ArtifactFile]) -> Iterator[bytes]:
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for artifact in artifacts:
+            info = zipfile.ZipInfo(artifact.name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = artifact.size
+            plan = DownloadPlan(200, start=0, length=artifact.size)
+            with archive.open(info, "w") as entry:
+                for chunk in iter_content(artifact, plan):
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
@@ -1,15 +1,68 @@
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import errno
 import json
 import os
 import shutil
 import subprocess
-import sys
+import time
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from .models import ExecutionResult, SkillSpec
+from .admission import AdmissionControl
+from .blobs import MANIFEST_NAME, BlobStore, StoredArtifact
+from .cache import ResultCache
+from .capture import OutputCapture, pump, pump_async
+from .coalesce import Coalescer
+from .limiter import AdaptiveLimiter
+from .launch import allowed_env, compile_launch
+from .models import ExecutionResult, LaunchPlan, SkillSpec
+from .persistent import PersistentPool
+from .process import cleanup_session, terminate_session
+from .retention import ArtifactGC, ArtifactIndex, RetentionPolicy, directory_size
+from .spawner import SpawnerClient
+from .standby import StandbyPool
+from .zygote import ZygoteManager
+
+ARTIFACTS_SUBDIR = "artifacts"
+# Files the runtime writes into every execution directory itself.
+RESERVED_FILES = {"stdout.txt", "stderr.txt", "output.json", MANIFEST_NAME}
+
+
+@dataclass
+class _Outcome:
+    execution_id: str
+    stdout: bytes
+    stderr: str
+    exit_code: Optional[int]
+    timed_out: bool = False
+    stdout_exceeded: bool = False
+    output: Optional[Any] = None
+    leaked: int = 0
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.resolve().relative_to(root.resolve())
+    except ValueError:
+        return False
+    return True
+
+
+def _glob_files(root: Path, pattern: str) -> List[str]:
+    try:
+        matches = sorted(root.glob(pattern))
+    except (ValueError, NotImplementedError):
+        return []
+    return [
+        path.relative_to(root).as_posix()
+        for path in matches
+        if path.is_file() and _is_within(path, root)
+    ]
 
 
 class SkillExecutor:
@@ -19,11 +72,30 @@ class SkillExecutor:
         default_timeout_ms: int = 10_000,
         max_stdout_bytes: int = 1_000_000,
         max_stderr_bytes: int = 1_000_000,
+        spawner_socket: Optional[Path] = None,
+        kill_grace_ms: int = 1_000,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        limiter: Optional[AdaptiveLimiter] = None,
+        compress_artifacts: bool = False,
+        retention: Optional[RetentionPolicy] = None,
     ) -> None:
         self.artifacts_dir = artifacts_dir
         self.default_timeout_ms = default_timeout_ms
         self.max_stdout_bytes = max_stdout_bytes
         self.max_stderr_bytes = max_stderr_bytes
+        self.kill_grace_seconds = kill_grace_ms / 1000
+        self.standby = StandbyPool(self._spawn, self._remove_workdir)
+        self.spawner = SpawnerClient(spawner_socket) if spawner_socket else None
+        self.zygotes = ZygoteManager()
+        self.persistent = PersistentPool(max_stdout_bytes, max_stderr_bytes)
+        self.cache = ResultCache(cache_dir or artifacts_dir / ".cache", cache_max_bytes)
+        self.coalescer = Coalescer(artifacts_dir / ".inflight")
+        self.admission = AdmissionControl(artifacts_dir / ".admission")
+        self.blobs = BlobStore(artifacts_dir / ".blobs", compress_artifacts)
+        self.index = ArtifactIndex(artifacts_dir / ".index")
+        self.gc = ArtifactGC(artifacts_dir, self.index, self.blobs, retention or RetentionPolicy())
+        self.limiter = limiter
 
     def execute(
         self,
@@ -31,57 +103,279 @@ class SkillExecutor:
         input_data: Optional[Dict[str, Any]] = None,
         timeout_ms: Optional[int] = None,
     ) -> ExecutionResult:
-        execution_id = f"exec-{uuid.uuid4().hex[:12]}"
-        exec_dir = self.artifacts_dir / execution_id
-        exec_dir.mkdir(parents=True, exist_ok=True)
+        input_data = input_data or {}
+        if not skill.coalesce:
+            return self._execute(skill, input_data, timeout_ms)
 
-        command = self._build_command(skill)
-        env = os.environ.copy()
-        env["SKILL_EXECUTION_ID"] = execution_id
-        env["SKILL_NAME"] = skill.name
+        key = self.cache.key(skill, input_data)
+        leader, future = self.coalescer.join(key)
+        if not leader:
+            return self._alias(skill, future.result())
+        try:
+            fd, shared = self.coalescer.acquire(key)
+            if shared is not None:
+                result = self._alias(skill, shared)
+            else:
+                try:
+                    result = self._execute(skill, input_data, timeout_ms)
+                except BaseException:
+                    self.coalescer.release(key, fd)
+                    raise
+                self.coalescer.publish(key, fd, result)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            self.coalescer.leave(key, future)
+        future.set_result(result)
+        return result
 
-        timeout_seconds = (timeout_ms or skill.timeout_ms or self.default_timeout_ms) / 1000
+    def _execute(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_ms: Optional[int],
+    ) -> ExecutionResult:
+        cache_key, cached = self._lookup(skill, input_data)
+        if cached is not None:
+            return cached
+        timeout_seconds = self._timeout_seconds(skill, timeout_ms)
+        ticket = self.admission.acquire(skill)
+        started = time.monotonic()
+        try:
+            outcome = self._run_limited(skill, input_data, timeout_seconds)
+        finally:
+            self.admission.release(skill, ticket, time.monotonic() - started)
+        result = self._finish(skill, outcome, timeout_seconds)
+        self._store(skill, cache_key, result)
+        return result
+
+    async def execute_async(
+        self,
+        skill: SkillSpec,
+        input_data: Optional[Dict[str, Any]] = None,
+        timeout_ms: Optional[int] = None,
+    ) -> ExecutionResult:
+        input_data = input_data or {}
+        if not skill.coalesce:
+            return await self._execute_async(skill, input_data, timeout_ms)
 
+        key = await asyncio.to_thread(self.cache.key, skill, input_data)
+        leader, future = self.coalescer.join(key)
+        if not leader:
+            shared = await asyncio.wrap_future(future)
+            return await asyncio.to_thread(self._alias, skill, shared)
         try:
-            proc = subprocess.Popen(
-                command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                cwd=str(skill.path),
-                env=env,
-                text=True,
+            fd, shared = await asyncio.to_thread(self.coalescer.acquire, key)
+            if shared is not None:
+                result = await asyncio.to_thread(self._alias, skill, shared)
+            else:
+                try:
+                    result = await self._execute_async(skill, input_data, timeout_ms)
+                except BaseException:
+                    self.coalescer.release(key, fd)
+                    raise
+                await asyncio.to_thread(self.coalescer.publish, key, fd, result)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            self.coalescer.leave(key, future)
+        future.set_result(result)
+        return result
+
+    async def _execute_async(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_ms: Optional[int],
+    ) -> ExecutionResult:
+        cache_key, cached = await asyncio.to_thread(self._lookup, skill, input_data)
+        if cached is not None:
+            return cached
+        timeout_seconds = self._timeout_seconds(skill, timeout_ms)
+        ticket = await self.admission.acquire_async(skill)
+        started = time.monotonic()
+        try:
+            outcome = await self._run_limited_async(skill, input_data, timeout_seconds)
+        finally:
+            await asyncio.to_thread(
+                self.admission.release, skill, ticket, time.monotonic() - started
             )
-            stdout, stderr = proc.communicate(
-                input=json.dumps(input_data or {}),
-                timeout=timeout_seconds,
+        result = await asyncio.to_thread(self._finish, skill, outcome, timeout_seconds)
+        await asyncio.to_thread(self._store, skill, cache_key, result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "adaptive": self.limiter.snapshot() if self.limiter else {"enabled": False},
+            "artifacts": self.gc.stats(),
+        }
+
+    def _run_limited(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+    ) -> _Outcome:
+        if self.limiter is None:
+            return self._run(skill, input_data, timeout_seconds)
+        self.limiter.acquire()
+        started = time.monotonic()
+        outcome: Optional[_Outcome] = None
+        try:
+            outcome = self._run(skill, input_data, timeout_seconds)
+            return outcome
+        finally:
+            self.limiter.release(
+                skill.name,
+                time.monotonic() - started,
+                outcome is not None and outcome.timed_out,
             )
-            exit_code = proc.returncode
-        except subprocess.TimeoutExpired:
-            proc.kill()
-            stdout, stderr = proc.communicate()
-            self._write_logs(exec_dir, stdout, stderr)
+
+    async def _run_limited_async(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+    ) -> _Outcome:
+        if self.limiter is not None:
+            self.limiter.acquire()
+        started = time.monotonic()
+        outcome: Optional[_Outcome] = None
+        try:
+            if self._runs_in_thread(skill):
+                outcome = await asyncio.to_thread(self._run, skill, input_data, timeout_seconds)
+            else:
+                outcome = await self._run_async(skill, input_data, timeout_seconds)
+            return outcome
+        finally:
+            if self.limiter is not None:
+                self.limiter.release(
+                    skill.name,
+                    time.monotonic() - started,
+                    outcome is not None and outcome.timed_out,
+                )
+
+    def _lookup(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+    ) -> Tuple[Optional[str], Optional[ExecutionResult]]:
+        if not skill.cache_ttl_ms:
+            return None, None
+        key = self.cache.key(skill, input_data, skill.cache_key)
+        result = self.cache.get(key)
+        if result is None:
+            return key, None
+        # Cached results point at the artifacts of the execution that produced
+        # them; once those are gone the entry is useless.
+        details = result.artifact_details or [{"path": path} for path in result.artifacts]
+        if not all(self._artifact_available(detail) for detail in details):
+            self.cache.invalidate(key)
+            return key, None
+        return key, result
+
+    def _artifact_available(self, detail: Dict[str, Any]) -> bool:
+        path = self.artifacts_dir.parent / detail["path"]
+        if path.exists():
+            return True
+        # Compressed artifacts only exist as a blob named in the manifest.
+        digest = (detail.get("digest") or "").partition(":")[2]
+        exec_dir = self.artifacts_dir / Path(detail["path"]).parts[1]
+        return bool(digest) and (exec_dir / MANIFEST_NAME).exists() and self.blobs.has(digest)
+
+    def _alias(self, skill: SkillSpec, result: ExecutionResult) -> ExecutionResult:
+        # Coalesced callers get their own execution id whose directory links to
+        # the one that actually ran.
+        alias_id = self._new_execution_id()
+        target = (self.artifacts_dir / result.execution_id).resolve()
+        try:
+            os.symlink(target.name, self.artifacts_dir / alias_id, target_is_directory=True)
+        except OSError:
+            return dataclasses.replace(result, coalesced=True)
+        try:
+            # The alias is only a symlink; its blobs belong to the leader.
+            self.index.record(alias_id, skill.name, 0, [], target=target.name)
+        except OSError:
+            pass
+
+        def aliased(rel_path: str) -> str:
+            parts = Path(rel_path).parts
+            if len(parts) > 2 and parts[1] == result.execution_id:
+                return str(Path(parts[0], alias_id, *parts[2:]))
+            return rel_path
+
+        return dataclasses.replace(
+            result,
+            execution_id=alias_id,
+            artifacts=[aliased(rel_path) for rel_path in result.artifacts],
+            artifact_details=[
+                {**detail, "path": aliased(detail["path"])} for detail in result.artifact_details
+            ],
+            coalesced=True,
+        )
+
+    def _store(self, skill: SkillSpec, key: Optional[str], result: ExecutionResult) -> None:
+        if key is not None and result.success:
+            self.cache.put(key, result, skill.cache_ttl_ms)
+
+    def _timeout_seconds(self, skill: SkillSpec, timeout_ms: Optional[int]) -> float:
+        return (timeout_ms or skill.timeout_ms or self.default_timeout_ms) / 1000
+
+    def _finish(
+        self,
+        skill: SkillSpec,
+        outcome: _Outcome,
+        timeout_seconds: float,
+    ) -> ExecutionResult:
+        result = self._result(skill, outcome, timeout_seconds)
+        self._index(skill.name, result)
+        return result
+
+    def _index(self, skill_name: str, result: ExecutionResult) -> None:
+        digests = sorted(
+            {d["digest"].partition(":")[2] for d in result.artifact_details if d.get("digest")}
+        )
+        try:
+            size = directory_size(self.artifacts_dir / result.execution_id)
+            self.index.record(result.execution_id, skill_name, size, digests)
+        except OSError:
+            pass
+
+    def _result(
+        self,
+        skill: SkillSpec,
+        outcome: _Outcome,
+        timeout_seconds: float,
+    ) -> ExecutionResult:
+        execution_id = outcome.execution_id
+        stdout = outcome.stdout
+        stderr = outcome.stderr
+        exit_code = outcome.exit_code
+        exec_dir = self.artifacts_dir / execution_id
+        exec_dir.mkdir(parents=True, exist_ok=True)
+        self._write_logs(exec_dir, stdout, stderr)
+
+        if outcome.timed_out:
             return ExecutionResult(
                 success=False,
                 execution_id=execution_id,
                 error=f"Execution timed out after {timeout_seconds:.2f}s",
-                stderr=self._truncate(stderr, self.max_stderr_bytes),
+                stderr=stderr,
+                leaked_processes=outcome.leaked,
             )
 
-        stdout = stdout or ""
-        stderr = stderr or ""
-        self._write_logs(exec_dir, stdout, stderr)
-
-        if len(stdout.encode("utf-8")) > self.max_stdout_bytes:
+        if outcome.stdout_exceeded:
             return ExecutionResult(
                 success=False,
                 execution_id=execution_id,
                 error="stdout exceeded limit",
-                stderr=self._truncate(stderr, self.max_stderr_bytes),
+                stderr=stderr,
                 exit_code=exit_code,
+                leaked_processes=outcome.leaked,
             )
-        if len(stderr.encode("utf-8")) > self.max_stderr_bytes:
-            stderr = self._truncate(stderr, self.max_stderr_bytes)
 
         if exit_code != 0:
             return ExecutionResult(
@@ -90,17 +384,22 @@ class SkillExecutor:
                 error=f"Skill exited with code {exit_code}",
                 stderr=stderr,
                 exit_code=exit_code,
+                leaked_processes=outcome.leaked,
             )
 
         try:
-            output = json.loads(stdout) if stdout.strip() else None
-        except json.JSONDecodeError as exc:
+            if outcome.output is not None:
+                output = outcome.output
+            else:
+                output = json.loads(stdout) if stdout.strip() else None
+        except ValueError as exc:
             return ExecutionResult(
                 success=False,
                 execution_id=execution_id,
                 error=f"Invalid JSON output: {exc}",
                 stderr=stderr,
                 exit_code=exit_code,
+                leaked_processes=outcome.leaked,
             )
 
         if output is None:
@@ -110,54 +409,317 @@ class SkillExecutor:
                 error="Skill returned empty output",
                 stderr=stderr,
                 exit_code=exit_code,
+                leaked_processes=outcome.leaked,
             )
 
-        artifacts = self._collect_artifacts(skill, exec_dir)
+        stored = self._archive(exec_dir, self._collect_artifacts(skill, exec_dir))
         self._write_output(exec_dir, output)
 
         return ExecutionResult(
             success=True,
             execution_id=execution_id,
             output=output,
-            artifacts=artifacts,
+            artifacts=[detail["path"] for detail in stored],
+            artifact_details=stored,
             stderr=stderr if stderr else None,
             exit_code=exit_code,
+            leaked_processes=outcome.leaked,
+        )
+
+    def _run(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+    ) -> _Outcome:
+        if skill.mode == "persistent":
+            return self._run_persistent(skill, input_data, timeout_seconds)
+        payload = json.dumps(input_data).encode("utf-8")
+        if skill.fork_safe:
+            return self._run_forked(skill, payload, timeout_seconds)
+        if self.spawner is not None:
+            remote = self._run_remote(skill, payload, timeout_seconds)
+            if remote is not None:
+                return remote
+
+        execution_id, proc = self._start(skill)
+        capture = self._capture()
+        try:
+            timed_out = pump(proc, payload, timeout_seconds, capture)
+            if timed_out or capture.stdout_exceeded:
+                leaked = terminate_session(proc.pid, self.kill_grace_seconds, proc.poll)
+            else:
+                proc.wait()
+                leaked = cleanup_session(proc.pid, self.kill_grace_seconds)
+            proc.wait()
+        except BaseException:
+            # Whatever interrupted the run, the session must not outlive it.
+            terminate_session(proc.pid, self.kill_grace_seconds, proc.poll)
+            proc.wait()
+            raise
+        finally:
+            for stream in (proc.stdin, proc.stdout, proc.stderr):
+                stream.close()
+        return _Outcome(
+            execution_id,
+            capture.stdout,
+            capture.stderr_text(),
+            None if timed_out else proc.returncode,
+            timed_out=timed_out,
+            stdout_exceeded=capture.stdout_exceeded,
+            leaked=leaked,
         )
 
+    def _run_remote(
+        self,
+        skill: SkillSpec,
+        payload: bytes,
+        timeout_seconds: float,
+    ) -> Optional[_Outcome]:
+        try:
+            sock = self.spawner.connect()
+        except OSError:
+            return None
+        execution_id = self._new_execution_id()
+        capture = self._capture()
+        exit_code, timed_out, leaked = self.spawner.run(
+            sock,
+            self._build_command(skill),
+            self._launch_plan(skill).cwd,
+            self._build_env(skill, execution_id),
+            payload,
+            timeout_seconds,
+            self.kill_grace_seconds,
+            capture,
+        )
+        return _Outcome(
+            execution_id,
+            capture.stdout,
+            capture.stderr_text(),
+            exit_code,
+            timed_out=timed_out,
+            stdout_exceeded=capture.stdout_exceeded,
+            leaked=leaked,
+        )
+
+    def _runs_in_thread(self, skill: SkillSpec) -> bool:
+        return (
+            skill.mode == "persistent"
+            or skill.fork_safe
+            or skill.standby > 0
+            or self.spawner is not None
+        )
+
+    async def _run_async(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+    ) -> _Outcome:
+        execution_id = self._new_execution_id()
+        proc = await asyncio.create_subprocess_exec(
+            *self._build_command(skill),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=self._launch_plan(skill).cwd,
+            env=self._build_env(skill, execution_id),
+            start_new_session=True,
+        )
+        capture = self._capture()
+        payload = json.dumps(input_data).encode("utf-8")
+        try:
+            timed_out = await pump_async(proc, payload, timeout_seconds, capture)
+            if timed_out or capture.stdout_exceeded:
+                leaked = await asyncio.to_thread(
+                    terminate_session, proc.pid, self.kill_grace_seconds
+                )
+            else:
+                await proc.wait()
+                leaked = await asyncio.to_thread(
+                    cleanup_session, proc.pid, self.kill_grace_seconds
+                )
+            await proc.wait()
+        except BaseException:
+            # Cancellation (client gone, shutdown) included: the termination
+            # is shielded so a second cancel cannot leave the session behind.
+            await asyncio.shield(
+                asyncio.to_thread(terminate_session, proc.pid, self.kill_grace_seconds)
+            )
+            raise
+        return _Outcome(
+            execution_id,
+            capture.stdout,
+            capture.stderr_text(),
+            None if timed_out else proc.returncode,
+            timed_out=timed_out,
+            stdout_exceeded=capture.stdout_exceeded,
+            leaked=leaked,
+        )
+
+    def _run_persistent(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+    ) -> _Outcome:
+        execution_id = self._new_execution_id()
+        env = self._build_env(skill, execution_id)
+        # Workers outlive a single execution, so the per-execution values
+        # travel in the request frame instead of the environment.
+        env.pop("SKILL_EXECUTION_ID")
+        frame = {
+            "workdir": env.pop("SKILL_WORKDIR"),
+            "artifactsDir": env.pop("SKILL_ARTIFACTS_DIR"),
+        }
+        reply = self.persistent.run(
+            skill,
+            self._build_command(skill),
+            env,
+            execution_id,
+            input_data,
+            timeout_seconds,
+            frame,
+        )
+        return _Outcome(
+            execution_id,
+            reply.stdout,
+            reply.stderr.decode("utf-8", errors="replace"),
+            reply.exit_code,
+            timed_out=reply.timed_out,
+            stdout_exceeded=reply.stdout_exceeded,
+            output=reply.output,
+        )
+
+    def _run_forked(self, skill: SkillSpec, payload: bytes, timeout_seconds: float) -> _Outcome:
+        execution_id = self._new_execution_id()
+        capture = self._capture()
+        exit_code, timed_out, leaked = self.zygotes.run(
+            skill,
+            self._build_env(skill, execution_id),
+            payload,
+            timeout_seconds,
+            self.kill_grace_seconds,
+            capture,
+        )
+        return _Outcome(
+            execution_id,
+            capture.stdout,
+            capture.stderr_text(),
+            exit_code,
+            timed_out=timed_out,
+            stdout_exceeded=capture.stdout_exceeded,
+            leaked=leaked,
+        )
+
+    def _start(self, skill: SkillSpec) -> Tuple[str, subprocess.Popen]:
+        standby = self.standby.acquire(skill)
+        if standby is not None:
+            return standby
+        return self._spawn(skill)
+
+    def _spawn(self, skill: SkillSpec) -> Tuple[str, subprocess.Popen]:
+        execution_id = self._new_execution_id()
+        proc = subprocess.Popen(
+            self._build_command(skill),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self._launch_plan(skill).cwd,
+            env=self._build_env(skill, execution_id),
+            start_new_session=True,
+        )
+        return execution_id, proc
+
+    def _capture(self) -> OutputCapture:
+        return OutputCapture(self.max_stdout_bytes, self.max_stderr_bytes)
+
+    def _new_execution_id(self) -> str:
+        return f"exec-{uuid.uuid4().hex[:12]}"
+
+    def _build_env(self, skill: SkillSpec, execution_id: str) -> Dict[str, str]:
+        workdir = self.artifacts_dir / execution_id
+        (workdir / ARTIFACTS_SUBDIR).mkdir(parents=True, exist_ok=True)
+        env = dict(self._launch_plan(skill).env)
+        env["SKILL_EXECUTION_ID"] = execution_id
+        env["SKILL_NAME"] = skill.name
+        env["SKILL_WORKDIR"] = str(workdir)
+        env["SKILL_ARTIFACTS_DIR"] = str(workdir / ARTIFACTS_SUBDIR)
+        return env
+
+    def _remove_workdir(self, execution_id: str) -> None:
+        # Standby processes get their workdir at launch; one discarded before
+        # running anything is never indexed, so nothing else would remove it.
+        shutil.rmtree(self.artifacts_dir / execution_id, ignore_errors=True)
+
+    def _launch_plan(self, skill: SkillSpec) -> LaunchPlan:
+        # Registry-loaded skills carry a compiled plan; anything else is
+        # compiled on demand with the default environment allow-list.
+        if skill.launch is None:
+            skill.launch = compile_launch(skill, allowed_env())
+        return skill.launch
+
     def _build_command(self, skill: SkillSpec) -> List[str]:
-        if skill.runtime_type == "python":
-            return [sys.executable, str(skill.entrypoint)]
-        if skill.runtime_type == "node":
-            if skill.entrypoint.suffix == ".ts":
-                tsx = shutil.which("tsx")
-                if tsx:
-                    return [tsx, str(skill.entrypoint)]
-                ts_node = shutil.which("ts-node")
-                if ts_node:
-                    return [ts_node, str(skill.entrypoint)]
-                raise RuntimeError("No tsx or ts-node found for TypeScript skill")
-            return ["node", str(skill.entrypoint)]
-        if skill.runtime_type == "shell":
-            return ["bash", str(skill.entrypoint)]
-        raise RuntimeError(f"Unsupported runtime: {skill.runtime_type}")
+        plan = self._launch_plan(skill)
+        if plan.error:
+            raise RuntimeError(plan.error)
+        return list(plan.argv)
 
     def _collect_artifacts(self, skill: SkillSpec, exec_dir: Path) -> List[str]:
+        # Declared paths are relative to SKILL_WORKDIR, where skills write
+        # directly. Skills still writing into their own directory get the file
+        # moved over; only literal paths are adopted from there.
         collected: List[str] = []
-        for rel_path in skill.artifacts:
-            source = (skill.path / rel_path).resolve()
-            if not source.exists():
+        for pattern in skill.artifacts:
+            matches = _glob_files(exec_dir, pattern)
+            if not matches and not any(ch in pattern for ch in "*?["):
+                matches = self._adopt_legacy(skill, exec_dir, pattern)
+            for rel_path in matches:
+                if rel_path in RESERVED_FILES:
+                    continue
+                if rel_path not in collected:
+                    collected.append(rel_path)
+        return collected
+
+    def _archive(self, exec_dir: Path, rel_paths: List[str]) -> List[Dict[str, Any]]:
+        # Each artifact is hashed into the blob store; the manifest records the
+        # digests so compressed artifacts can be served without the file.
+        stored: List[StoredArtifact] = []
+        details: List[Dict[str, Any]] = []
+        for rel_path in rel_paths:
+            path = str(Path(self.artifacts_dir.name) / exec_dir.name / rel_path)
+            item = self.blobs.ingest(exec_dir, rel_path)
+            if item is None:
+                details.append({"path": path, "digest": None, "size": None})
                 continue
-            target = exec_dir / rel_path
-            target.parent.mkdir(parents=True, exist_ok=True)
+            stored.append(item)
+            details.append({"path": path, "digest": f"sha256:{item.digest}", "size": item.size})
+        if stored:
+            try:
+                self.blobs.write_manifest(exec_dir, stored)
+            except OSError:
+                pass
+        return details
+
+    def _adopt_legacy(self, skill: SkillSpec, exec_dir: Path, rel_path: str) -> List[str]:
+        source = skill.path / rel_path
+        if not source.is_file() or not _is_within(source, skill.path):
+            return []
+        target = exec_dir / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(source, target)
+        except OSError as exc:
+            if exc.errno != errno.EXDEV:
+                return []
             try:
                 shutil.copy2(source, target)
-                collected.append(str(Path(self.artifacts_dir.name) / exec_dir.name / rel_path))
             except OSError:
-                continue
-        return collected
+                return []
+        return [rel_path]
 
-    def _write_logs(self, exec_dir: Path, stdout: str, stderr: str) -> None:
-        (exec_dir / "stdout.txt").write_text(stdout, encoding="utf-8")
+    def _write_logs(self, exec_dir: Path, stdout: bytes, stderr: str) -> None:
+        (exec_dir / "stdout.txt").write_bytes(stdout)
         (exec_dir / "stderr.txt").write_text(stderr, encoding="utf-8")
 
     def _write_output(self, exec_dir: Path, output: Dict[str, Any]) -> None:
@@ -165,9 +727,3 @@ class SkillExecutor:
             json.dumps(output, ensure_ascii=False, indent=2),
             encoding="utf-8",
         )
-
-    def _truncate(self, text: str, limit_bytes: int) -> str:
-        encoded = text.encode("utf-8")
-        if len(encoded) <= limit_bytes:
-            return text
-        return encoded[:limit_bytes].decode("utf-8", errors="ignore")
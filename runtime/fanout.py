@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .executor import SkillExecutor
+from .models import ExecutionResult, SkillSpec
+from .registry import SkillRegistry
+
+
+@dataclass
+class MapSpec:
+    path: List[str]
+    chunk_size: int
+    parallelism: int
+    output_path: List[str]
+    reducer: Optional[SkillSpec] = None
+    deadline_ms: Optional[int] = None
+
+
+def parse_map(
+    registry: SkillRegistry,
+    raw: Any,
+    max_parallelism: int,
+) -> MapSpec:
+    if not isinstance(raw, dict) or not raw.get("path"):
+        raise ValueError("options.map.path is required")
+    chunk_size = int(raw.get("chunkSize") or 1)
+    parallelism = int(raw.get("parallelism") or max_parallelism)
+    if chunk_size < 1:
+        raise ValueError("options.map.chunkSize must be >= 1")
+    reducer = None
+    if raw.get("reducer"):
+        reducer = registry.get(raw["reducer"])
+        if reducer is None:
+            raise ValueError("options.map.reducer: skill not found")
+    deadline_ms = raw.get("deadlineMs")
+    return MapSpec(
+        path=str(raw["path"]).split("."),
+        chunk_size=chunk_size,
+        parallelism=max(1, min(parallelism, max_parallelism)),
+        output_path=str(raw.get("outputPath") or raw["path"]).split("."),
+        reducer=reducer,
+        deadline_ms=int(deadline_ms) if deadline_ms else None,
+    )
+
+
+def _get(data: Any, path: List[str]) -> Any:
+    for part in path:
+        if not isinstance(data, dict) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+
+def _with_value(data: Dict[str, Any], path: List[str], value: Any) -> Dict[str, Any]:
+    result = copy.copy(data)
+    target = result
+    for part in path[:-1]:
+        target[part] = copy.copy(target.get(part) or {})
+        target = target[part]
+    target[path[-1]] = value
+    return result
+
+
+def split_input(input_data: Dict[str, Any], spec: MapSpec, max_chunks: int) -> List[Dict[str, Any]]:
+    items = _get(input_data, spec.path)
+    if not isinstance(items, list):
+        raise ValueError(f"input.{'.'.join(spec.path)} must be a list")
+    chunks = [
+        _with_value(input_data, spec.path, items[start:start + spec.chunk_size])
+        for start in range(0, len(items), spec.chunk_size)
+    ]
+    if len(chunks) > max_chunks:
+        raise ValueError(f"map would create {len(chunks)} chunks, at most {max_chunks} allowed")
+    return chunks
+
+
+def _concat(outputs: List[Any], spec: MapSpec) -> Any:
+    # Chunks that return a bare list are concatenated directly; otherwise the
+    # list at outputPath is concatenated into a copy of the first output.
+    if all(isinstance(output, list) for output in outputs):
+        return [item for output in outputs for item in output]
+    merged: List[Any] = []
+    for index, output in enumerate(outputs):
+        part = _get(output, spec.output_path)
+        if not isinstance(part, list):
+            raise ValueError(f"chunk {index} output has no list at {'.'.join(spec.output_path)}")
+        merged.extend(part)
+    base = outputs[0] if outputs and isinstance(outputs[0], dict) else {}
+    return _with_value(base, spec.output_path, merged)
+
+
+class _MapRun:
+    def __init__(
+        self,
+        executor: SkillExecutor,
+        skill: SkillSpec,
+        chunks: List[Dict[str, Any]],
+        timeout_ms: Optional[int],
+        spec: MapSpec,
+    ) -> None:
+        self.spec = spec
+        self.chunks = chunks
+        self.started = time.monotonic()
+        self.deadline = self.started + spec.deadline_ms / 1000 if spec.deadline_ms else None
+        self.chunk_timeout_ms = timeout_ms or skill.timeout_ms or executor.default_timeout_ms
+        self.results: List[Optional[ExecutionResult]] = [None] * len(chunks)
+        self.reports: List[Dict[str, Any]] = [{"index": i} for i in range(len(chunks))]
+        self.failed = threading.Event()
+
+    def timeout_for(self, index: int) -> Optional[int]:
+        # None means the chunk must not start: a sibling failed or the total
+        # deadline has passed.
+        if self.failed.is_set():
+            self.reports[index].update(
+                success=False,
+                skipped=True,
+                error="Skipped after an earlier chunk failed",
+            )
+            return None
+        if self.deadline is None:
+            return self.chunk_timeout_ms
+        remaining_ms = int((self.deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0:
+            self.failed.set()
+            self.reports[index].update(success=False, error="Map deadline exceeded")
+            return None
+        return min(self.chunk_timeout_ms, remaining_ms)
+
+    def record(
+        self,
+        index: int,
+        started: float,
+        result: Optional[ExecutionResult],
+        error: str = "",
+    ) -> None:
+        report = self.reports[index]
+        report["durationMs"] = round((time.monotonic() - started) * 1000, 1)
+        if result is None:
+            report.update(success=False, error=error)
+            self.failed.set()
+            return
+        self.results[index] = result
+        report.update(success=result.success, executionId=result.execution_id)
+        if not result.success:
+            report["error"] = result.error
+            self.failed.set()
+
+    def merged(self) -> Tuple[Optional[Any], Optional[str]]:
+        failures = [r for r in self.reports if not r.get("success")]
+        failed = next((r for r in failures if not r.get("skipped")), failures[0] if failures else None)
+        if failed is not None:
+            return None, f"chunk {failed['index']} failed: {failed.get('error')}"
+        outputs = [result.output for result in self.results]
+        if self.spec.reducer is not None:
+            return outputs, None
+        try:
+            return _concat(outputs, self.spec), None
+        except ValueError as exc:
+            return None, str(exc)
+
+    def payload(
+        self,
+        output: Any,
+        error: Optional[str],
+        reducer: Optional[ExecutionResult] = None,
+    ) -> Dict[str, Any]:
+        results = [result for result in self.results if result]
+        payload: Dict[str, Any] = {"success": error is None}
+        if error is None:
+            payload["output"] = output
+            payload["artifacts"] = [path for result in results for path in result.artifacts]
+            payload["artifactDetails"] = [
+                detail for result in results for detail in result.artifact_details
+            ]
+        else:
+            payload["error"] = error
+        if reducer is not None:
+            payload["reducer"] = {"executionId": reducer.execution_id, "success": reducer.success}
+        payload["chunks"] = self.reports
+        payload["durationMs"] = round((time.monotonic() - self.started) * 1000, 1)
+        return payload
+
+    def reducer_timeout(self) -> Optional[int]:
+        if self.deadline is None:
+            return None
+        return max(1, int((self.deadline - time.monotonic()) * 1000))
+
+
+def _reduced(run: _MapRun, result: ExecutionResult) -> Dict[str, Any]:
+    if not result.success:
+        return run.payload(None, f"reducer failed: {result.error}", result)
+    payload = run.payload(result.output, None, result)
+    payload["artifacts"] = payload["artifacts"] + result.artifacts
+    payload["artifactDetails"] = payload["artifactDetails"] + result.artifact_details
+    return payload
+
+
+def run_map(
+    executor: SkillExecutor,
+    skill: SkillSpec,
+    input_data: Dict[str, Any],
+    timeout_ms: Optional[int],
+    spec: MapSpec,
+    max_chunks: int,
+) -> Dict[str, Any]:
+    run = _MapRun(executor, skill, split_input(input_data, spec, max_chunks), timeout_ms, spec)
+
+    def execute(index: int) -> None:
+        chunk_timeout = run.timeout_for(index)
+        if chunk_timeout is None:
+            return
+        started = time.monotonic()
+        try:
+            result = executor.execute(skill, input_data=run.chunks[index], timeout_ms=chunk_timeout)
+        except Exception as exc:  # noqa: BLE001
+            run.record(index, started, None, str(exc))
+            return
+        run.record(index, started, result)
+
+    with ThreadPoolExecutor(max_workers=spec.parallelism) as pool:
+        list(pool.map(execute, range(len(run.chunks))))
+
+    output, error = run.merged()
+    if error is not None or spec.reducer is None:
+        return run.payload(output, error)
+    try:
+        reduced = executor.execute(
+            spec.reducer,
+            input_data={"outputs": output},
+            timeout_ms=run.reducer_timeout(),
+        )
+    except Exception as exc:  # noqa: BLE001
+        return run.payload(None, f"reducer failed: {exc}")
+    return _reduced(run, reduced)
+
+
+async def run_map_async(
+    executor: SkillExecutor,
+    skill: SkillSpec,
+    input_data: Dict[str, Any],
+    timeout_ms: Optional[int],
+    spec: MapSpec,
+    max_chunks: int,
+) -> Dict[str, Any]:
+    run = _MapRun(executor, skill, split_input(input_data, spec, max_chunks), timeout_ms, spec)
+    semaphore = asyncio.Semaphore(spec.parallelism)
+
+    async def execute(index: int) -> None:
+        async with semaphore:
+            chunk_timeout = run.timeout_for(index)
+            if chunk_timeout is None:
+                return
+            started = time.monotonic()
+            try:
+                result = await executor.execute_async(
+                    skill,
+                    input_data=run.chunks[index],
+                    timeout_ms=chunk_timeout,
+                )
+            except Exception as exc:  # noqa: BLE001
+                run.record(index, started, None, str(exc))
+                return
+            run.record(index, started, result)
+
+    await asyncio.gather(*(execute(index) for index in range(len(run.chunks))))
+
+    output, error = run.merged()
+    if error is not None or spec.reducer is None:
+        return run.payload(output, error)
+    try:
+        reduced = await executor.execute_async(
+            spec.reducer,
+            input_data={"outputs": output},
+            timeout_ms=run.reducer_timeout(),
+        )
+    except Exception as exc:  # noqa: BLE001
+        return run.payload(None, f"reducer failed: {exc}")
+    return _reduced(run, reduced)
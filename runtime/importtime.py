@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from .models import SkillSpec
+
+# "import time:       412 |       1290 |   encodings.aliases"; nesting adds
+# two spaces per level in front of the module name.
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)\s*$")
+_HEADER = "import time: self [us] | cumulative | imported package"
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> Tuple[List[ImportTiming], str]:
+    # Splits -X importtime lines from the rest of stderr.
+    timings: List[ImportTiming] = []
+    rest: List[str] = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), len(indent) // 2))
+        elif line.strip() != _HEADER:
+            rest.append(line)
+    return timings, "\n".join(rest)
+
+
+def profile_startup(
+    skill: SkillSpec,
+    payload: Dict[str, Any],
+    timeout_seconds: float,
+    top: int = 15,
+) -> Dict[str, Any]:
+    # One run of the skill under -X importtime, outside the executor: the
+    # working directory is temporary and nothing is cached or indexed.
+    plan = skill.launch
+    if skill.runtime_type != "python":
+        raise ValueError("import timing is only available for python skills")
+    if plan is None or plan.error:
+        raise ValueError(plan.error if plan else f"skill '{skill.name}' has no launch plan")
+
+    argv = [plan.argv[0], "-X", "importtime", *plan.argv[1:]]
+    with tempfile.TemporaryDirectory(prefix="importtime-") as workdir:
+        artifacts_dir = Path(workdir) / "artifacts"
+        artifacts_dir.mkdir()
+        env = {
+            **plan.env,
+            "SKILL_EXECUTION_ID": "importtime",
+            "SKILL_NAME": skill.name,
+            "SKILL_WORKDIR": workdir,
+            "SKILL_ARTIFACTS_DIR": str(artifacts_dir),
+        }
+        started = time.perf_counter()
+        proc = subprocess.run(
+            argv,
+            input=json.dumps(payload, ensure_ascii=False),
+            capture_output=True,
+            text=True,
+            cwd=plan.cwd,
+            env=env,
+            timeout=timeout_seconds,
+            start_new_session=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+
+    timings, stderr = parse_importtime(proc.stderr)
+    by_self = sorted(timings, key=lambda timing: timing.self_us, reverse=True)
+    top_level = sorted(
+        (timing for timing in timings if timing.depth == 0),
+        key=lambda timing: timing.cumulative_us,
+        reverse=True,
+    )
+    return {
+        "skill": skill.name,
+        "argv": argv,
+        "exitCode": proc.returncode,
+        "wallMs": round(wall_ms, 1),
+        "importMs": round(sum(timing.self_us for timing in timings) / 1000, 1),
+        "modules": len(timings),
+        "slowestModules": [_timing(timing) for timing in by_self[:top]],
+        "topLevelImports": [_timing(timing) for timing in top_level[:top]],
+        "stderr": stderr,
+    }
+
+
+def _timing(timing: ImportTiming) -> Dict[str, Any]:
+    return {
+        "module": timing.module,
+        "selfMs": round(timing.self_us / 1000, 2),
+        "cumulativeMs": round(timing.cumulative_us / 1000, 2),
+    }
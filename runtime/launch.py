@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import py_compile
+import shutil
+import sys
+from importlib.util import MAGIC_NUMBER, cache_from_source
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from . import nodecache
+from .models import LaunchPlan, SkillSpec
+
+# Variables a skill process inherits from the server. Entries ending in "*"
+# match by prefix; everything else (DJANGO_SECRET_KEY, database settings, ...)
+# stays in the server.
+DEFAULT_ENV_ALLOWLIST = (
+    "PATH",
+    "HOME",
+    "USER",
+    "LOGNAME",
+    "LANG",
+    "LANGUAGE",
+    "LC_*",
+    "TZ",
+    "TMPDIR",
+    "PYTHON*",
+    "VIRTUAL_ENV",
+    "NODE_*",
+    "SSL_CERT_FILE",
+    "SSL_CERT_DIR",
+    "REQUESTS_CA_BUNDLE",
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "NO_PROXY",
+    "http_proxy",
+    "https_proxy",
+    "no_proxy",
+    "GITHUB_TOKEN",
+    "GH_TOKEN",
+    "CODEX_HOME",
+)
+
+PYBOOT = Path(__file__).resolve().parent / "pyboot.py"
+PRECOMPILE_SKIP_DIRS = {"__pycache__", ".git", "node_modules"}
+# Flags that would replace the entrypoint instead of configuring the
+# interpreter.
+_REJECTED_FLAGS = {"-c", "-m", "-"}
+
+
+def allowed_env(
+    extra: Iterable[str] = (),
+    environ: Optional[Mapping[str, str]] = None,
+) -> Dict[str, str]:
+    environ = os.environ if environ is None else environ
+    patterns = [*DEFAULT_ENV_ALLOWLIST, *extra]
+    exact = {p for p in patterns if not p.endswith("*")}
+    prefixes = tuple(p[:-1] for p in patterns if p.endswith("*"))
+    return {
+        name: value
+        for name, value in environ.items()
+        if name in exact or (prefixes and name.startswith(prefixes))
+    }
+
+
+def compile_launch(
+    skill: SkillSpec,
+    env: Dict[str, str],
+    bootstrap: bool = False,
+    python_flags: Sequence[str] = (),
+    node_cache_dir: Optional[Path] = None,
+) -> LaunchPlan:
+    # Executables are looked up once here instead of on every execution.
+    search_path = env.get("PATH")
+    entrypoint = str(skill.entrypoint)
+    cwd = str(skill.path)
+    if skill.runtime_type == "python":
+        flags = skill.python_flags if skill.python_flags is not None else python_flags
+        # ``python run.py`` compiles the script itself on every launch; the
+        # bootstrap loads it like a module so precompiled bytecode is used.
+        script = (str(PYBOOT), entrypoint) if bootstrap else (entrypoint,)
+        return LaunchPlan((sys.executable, *flags, *script), env, cwd)
+    if skill.runtime_type == "node":
+        node = shutil.which("node", path=search_path) or "node"
+        problem = "No tsx or ts-node found for TypeScript skill"
+        if node_cache_dir is not None:
+            try:
+                entry_dir, transpiled = nodecache.prepare(skill, node_cache_dir, node, search_path)
+            except (nodecache.TranspileError, OSError) as exc:
+                problem = f"TypeScript transpile failed: {exc}"
+            else:
+                env = {**env, **nodecache.compile_cache_env(entry_dir)}
+                if transpiled is not None:
+                    return LaunchPlan((node, str(transpiled)), env, cwd)
+        if skill.entrypoint.suffix == ".ts":
+            # No esbuild: transpile on every execution as before.
+            for runner in ("tsx", "ts-node"):
+                found = shutil.which(runner, path=search_path)
+                if found:
+                    return LaunchPlan((found, entrypoint), env, cwd)
+            return LaunchPlan((), env, cwd, error=problem)
+        return LaunchPlan((node, entrypoint), env, cwd)
+    if skill.runtime_type == "shell":
+        return LaunchPlan((shutil.which("bash", path=search_path) or "bash", entrypoint), env, cwd)
+    return LaunchPlan((), env, cwd, error=f"Unsupported runtime: {skill.runtime_type}")
+
+
+def parse_python_flags(flags: Sequence[str]) -> List[str]:
+    # "-X" takes the next token as its value ("-X", "frozen_modules=on");
+    # everything else must be a single interpreter option.
+    parsed: List[str] = []
+    expect_value = False
+    for flag in flags:
+        if expect_value:
+            parsed.append(flag)
+            expect_value = False
+            continue
+        if not flag.startswith("-") or flag in _REJECTED_FLAGS or flag.startswith(("-c", "-m")):
+            raise ValueError(f"unsupported python flag '{flag}'")
+        parsed.append(flag)
+        expect_value = flag in ("-X", "-W")
+    if expect_value:
+        raise ValueError(f"python flag '{parsed[-1]}' needs a value")
+    return parsed
+
+
+def precompile(skill: SkillSpec, python_flags: Sequence[str] = ()) -> int:
+    # Writes bytecode for every module in the skill tree where the skill
+    # interpreter (same executable) looks for it, so launches under
+    # PYTHONDONTWRITEBYTECODE stop recompiling. Up-to-date files are left
+    # alone, which keeps rescans and other workers cheap.
+    flags = skill.python_flags if skill.python_flags is not None else python_flags
+    optimization = 2 if "-OO" in flags else 1 if "-O" in flags else ""
+    compiled = 0
+    for dirpath, dirnames, filenames in os.walk(skill.path):
+        dirnames[:] = [
+            name for name in dirnames if name not in PRECOMPILE_SKIP_DIRS and not name.startswith(".")
+        ]
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            source = os.path.abspath(os.path.join(dirpath, filename))
+            target = cache_from_source(source, optimization=optimization)
+            if _fresh(source, target):
+                continue
+            try:
+                py_compile.compile(
+                    source,
+                    cfile=target,
+                    doraise=True,
+                    optimize=optimization or 0,
+                )
+            except (py_compile.PyCompileError, OSError):
+                continue
+            compiled += 1
+    return compiled
+
+
+def _fresh(source: str, target: str) -> bool:
+    # Same check SourceFileLoader applies to timestamp-based pycs.
+    try:
+        stat = os.stat(source)
+        with open(target, "rb") as fh:
+            header = fh.read(16)
+    except OSError:
+        return False
+    return (
+        len(header) == 16
+        and header[:4] == MAGIC_NUMBER
+        and int.from_bytes(header[4:8], "little") == 0
+        and int.from_bytes(header[8:12], "little") == int(stat.st_mtime) & 0xFFFFFFFF
+        and int.from_bytes(header[12:16], "little") == stat.st_size & 0xFFFFFFFF
+    )
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .admission import AdmissionRejected
+
+LATENCY_WINDOW = 50
+MIN_SAMPLES = 10
+BASELINE_DRIFT = 0.01
+DECREASE_INTERVAL_SECONDS = 1.0
+PRESSURE_INTERVAL_SECONDS = 1.0
+PRESSURE_FILES = {"cpu": "/proc/pressure/cpu", "memory": "/proc/pressure/memory"}
+
+
+def _read_pressure(path: str) -> Optional[float]:
+    try:
+        with open(path, "r", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("some "):
+                    for field in line.split()[1:]:
+                        name, _, value = field.partition("=")
+                        if name == "avg10":
+                            return float(value)
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _millis(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+class _SkillLatency:
+    def __init__(self) -> None:
+        self.samples: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.baseline: Optional[float] = None
+        self.p90: Optional[float] = None
+
+    def add(self, seconds: float) -> Optional[float]:
+        self.samples.append(seconds)
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        p90 = ordered[min(len(ordered) - 1, math.ceil(len(ordered) * 0.9) - 1)]
+        self.p90 = p90
+        # Follow improvements immediately, regressions only slowly, so the
+        # baseline approximates the skill's uncongested latency.
+        if self.baseline is None or p90 < self.baseline:
+            self.baseline = p90
+        else:
+            self.baseline += (p90 - self.baseline) * BASELINE_DRIFT
+        return p90
+
+
+class AdaptiveLimiter:
+    # AIMD limit on concurrent executions in this process: +1/limit per
+    # healthy completion while the limit is in use, x backoff when a skill's
+    # p90 drifts above its baseline, an execution times out, or CPU/memory
+    # pressure (PSI avg10) crosses its threshold. Excess requests are shed.
+
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        initial_limit: int = 8,
+        latency_tolerance: float = 2.0,
+        backoff: float = 0.9,
+        cpu_pressure: float = 80.0,
+        memory_pressure: float = 10.0,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(initial_limit)
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.thresholds = {"cpu": cpu_pressure, "memory": memory_pressure}
+        self.in_flight = 0
+        self.shed = 0
+        self._latency: Dict[str, _SkillLatency] = {}
+        self._pressure: Dict[str, Optional[float]] = {}
+        self._pressure_at = 0.0
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.shed += 1
+                raise AdmissionRejected("Runtime is overloaded, request shed", 1)
+            self.in_flight += 1
+
+    def release(self, skill_name: str, elapsed_seconds: float, timed_out: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            stats = self._latency.setdefault(skill_name, _SkillLatency())
+            p90 = None if timed_out else stats.add(elapsed_seconds)
+            slow = p90 is not None and p90 > stats.baseline * self.latency_tolerance
+            if timed_out or slow or self._under_pressure():
+                self._decrease()
+            elif (self.in_flight + 1) * 2 >= self.limit:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._under_pressure()
+            return {
+                "enabled": True,
+                "limit": int(self.limit),
+                "inFlight": self.in_flight,
+                "shed": self.shed,
+                "pressure": dict(self._pressure),
+                "skills": {
+                    name: {
+                        "samples": len(stats.samples),
+                        "p90Ms": _millis(stats.p90),
+                        "baselineMs": _millis(stats.baseline),
+                    }
+                    for name, stats in self._latency.items()
+                },
+            }
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._decreased_at < DECREASE_INTERVAL_SECONDS:
+            return
+        self._decreased_at = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+
+    def _under_pressure(self) -> bool:
+        now = time.monotonic()
+        if now - self._pressure_at >= PRESSURE_INTERVAL_SECONDS:
+            self._pressure_at = now
+            self._pressure = {name: _read_pressure(path) for name, path in PRESSURE_FILES.items()}
+        return any(
+            value is not None and value > self.thresholds[name]
+            for name, value in self._pressure.items()
+        )
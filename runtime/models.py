@@ -2,7 +2,17 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass
+class LaunchPlan:
+    # Compiled once per skill by the registry: resolved argv, the trimmed
+    # environment every execution starts from, and the working directory.
+    argv: Tuple[str, ...]
+    env: Dict[str, str]
+    cwd: str
+    error: Optional[str] = None
 
 
 @dataclass
@@ -14,6 +24,23 @@ class SkillSpec:
     artifacts: List[str]
     path: Path
     entrypoint: Path
+    standby: int = 0
+    fork_safe: bool = False
+    mode: str = "oneshot"
+    workers: int = 1
+    max_requests: int = 0
+    max_rss_mb: int = 0
+    cache_ttl_ms: int = 0
+    cache_key: Optional[List[str]] = None
+    coalesce: bool = False
+    max_concurrency: int = 0
+    queue_size: int = 0
+    queue_timeout_ms: int = 30_000
+    # runtime.pythonFlags; None means the registry-wide default.
+    python_flags: Optional[List[str]] = None
+    # Registry generation the spec was loaded in.
+    generation: int = 0
+    launch: Optional[LaunchPlan] = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -23,5 +50,9 @@ class ExecutionResult:
     output: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     artifacts: List[str] = field(default_factory=list)
+    artifact_details: List[Dict[str, Any]] = field(default_factory=list)
     stderr: Optional[str] = None
     exit_code: Optional[int] = None
+    leaked_processes: int = 0
+    cached: bool = False
+    coalesced: bool = False
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .models import SkillSpec
+
+SOURCE_SUFFIXES = {".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs", ".json"}
+SKIP_DIRS = {"node_modules", "__pycache__", "artifacts"}
+COMPILE_CACHE_SUBDIR = "compile-cache"
+TRANSPILE_TIMEOUT_SECONDS = 60
+
+
+class TranspileError(RuntimeError):
+    pass
+
+
+def prepare(
+    skill: SkillSpec,
+    cache_root: Path,
+    node: str,
+    search_path: Optional[str],
+) -> Tuple[Path, Optional[Path]]:
+    # Per skill and source digest: <cache_root>/<skill>/<digest>/ holds the
+    # transpiled entrypoint (TypeScript with esbuild available) and the V8
+    # compile cache. A new digest means a new directory; older ones are
+    # removed, so both caches follow the skill sources.
+    skill_root = cache_root / skill.name
+    digest = source_digest(skill.path, node)
+    entry_dir = skill_root / digest
+    (entry_dir / COMPILE_CACHE_SUBDIR).mkdir(parents=True, exist_ok=True)
+    _prune(skill_root, keep=digest)
+
+    if skill.entrypoint.suffix != ".ts":
+        return entry_dir, None
+    esbuild = _find_esbuild(skill, search_path)
+    if esbuild is None:
+        return entry_dir, None
+    module_format = _module_format(skill.path)
+    target = entry_dir / f"run.{'mjs' if module_format == 'esm' else 'cjs'}"
+    if not target.exists():
+        _transpile(skill, esbuild, node, module_format, target)
+    return entry_dir, target
+
+
+def compile_cache_env(entry_dir: Path) -> Dict[str, str]:
+    # Node >= 22.1 caches compiled code there; older versions ignore it.
+    return {"NODE_COMPILE_CACHE": str(entry_dir / COMPILE_CACHE_SUBDIR)}
+
+
+def source_digest(skill_dir: Path, node: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{node}\0{node_version(node)}\0".encode("utf-8"))
+    for dirpath, dirnames, filenames in os.walk(skill_dir):
+        dirnames[:] = sorted(
+            name for name in dirnames if name not in SKIP_DIRS and not name.startswith(".")
+        )
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] not in SOURCE_SUFFIXES:
+                continue
+            path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(path, skill_dir).encode("utf-8") + b"\0")
+            try:
+                with open(path, "rb") as fh:
+                    digest.update(fh.read())
+            except OSError:
+                continue
+            digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=8)
+def node_version(node: str) -> str:
+    try:
+        proc = subprocess.run([node, "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+    return proc.stdout.strip()
+
+
+def _find_esbuild(skill: SkillSpec, search_path: Optional[str]) -> Optional[str]:
+    local = skill.path / "node_modules" / ".bin" / "esbuild"
+    if local.is_file() and os.access(local, os.X_OK):
+        return str(local)
+    return shutil.which("esbuild", path=search_path)
+
+
+def _module_format(skill_dir: Path) -> str:
+    # Same rule node and tsx apply: "type": "module" in package.json.
+    try:
+        package = json.loads((skill_dir / "package.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return "cjs"
+    return "esm" if isinstance(package, dict) and package.get("type") == "module" else "cjs"
+
+
+def _transpile(
+    skill: SkillSpec,
+    esbuild: str,
+    node: str,
+    module_format: str,
+    target: Path,
+) -> None:
+    # Local imports are bundled; packages stay external and resolve through
+    # a node_modules link next to the output. __dirname and import.meta keep
+    # pointing at the skill directory, as they would under tsx.
+    entrypoint = str(skill.entrypoint)
+    if module_format == "esm":
+        defines = {
+            "import.meta.url": skill.entrypoint.resolve().as_uri(),
+            "import.meta.filename": entrypoint,
+            "import.meta.dirname": str(skill.path),
+        }
+    else:
+        defines = {"__filename": entrypoint, "__dirname": str(skill.path)}
+    major = node_version(node).lstrip("v").split(".")[0]
+    fd, tmp = tempfile.mkstemp(dir=target.parent, suffix=target.suffix + ".tmp")
+    os.close(fd)
+    argv = [
+        esbuild,
+        entrypoint,
+        "--bundle",
+        "--platform=node",
+        f"--format={module_format}",
+        "--packages=external",
+        f"--outfile={tmp}",
+        "--log-level=error",
+        "--allow-overwrite",
+        *(f"--define:{name}={json.dumps(value)}" for name, value in defines.items()),
+    ]
+    if major.isdigit():
+        argv.append(f"--target=node{major}")
+    try:
+        proc = subprocess.run(
+            argv,
+            cwd=str(skill.path),
+            capture_output=True,
+            text=True,
+            timeout=TRANSPILE_TIMEOUT_SECONDS,
+        )
+        if proc.returncode != 0:
+            raise TranspileError(proc.stderr.strip() or f"esbuild exited with {proc.returncode}")
+        _link_node_modules(skill.path, target.parent)
+        os.replace(tmp, target)
+    except subprocess.TimeoutExpired as exc:
+        raise TranspileError("esbuild timed out") from exc
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _link_node_modules(skill_dir: Path, entry_dir: Path) -> None:
+    source = skill_dir / "node_modules"
+    link = entry_dir / "node_modules"
+    if not source.is_dir() or link.is_symlink():
+        return
+    try:
+        link.symlink_to(source.resolve(), target_is_directory=True)
+    except FileExistsError:
+        pass
+
+
+def _prune(skill_root: Path, keep: str) -> None:
+    for entry in skill_root.iterdir():
+        if entry.name != keep and entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry, ignore_errors=True)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from .models import ExecutionResult
+
+
+def result_payload(result: ExecutionResult) -> Dict[str, Any]:
+    if result.success:
+        return {
+            "success": True,
+            "executionId": result.execution_id,
+            "output": result.output,
+            "artifacts": result.artifacts,
+            "artifactDetails": result.artifact_details,
+            "stderr": result.stderr,
+            "leakedProcesses": result.leaked_processes,
+            "cached": result.cached,
+            "coalesced": result.coalesced,
+        }
+    return {
+        "success": False,
+        "executionId": result.execution_id,
+        "error": result.error,
+        "stderr": result.stderr,
+        "leakedProcesses": result.leaked_processes,
+    }
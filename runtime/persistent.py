@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .models import SkillSpec
+from .process import terminate_session
+
+READ_CHUNK = 65536
+STOP_GRACE_SECONDS = 2
+_OVERSIZED = object()
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+@dataclass
+class WorkerReply:
+    stdout: bytes = b""
+    stderr: bytes = b""
+    exit_code: Optional[int] = None
+    timed_out: bool = False
+    stdout_exceeded: bool = False
+    output: Optional[Any] = None
+
+
+class _Worker:
+    def __init__(
+        self,
+        command: List[str],
+        cwd: str,
+        env: Dict[str, str],
+        max_line_bytes: int,
+        max_stderr_bytes: int,
+    ) -> None:
+        self.proc = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=cwd,
+            env=env,
+            start_new_session=True,
+        )
+        self.requests = 0
+        self.max_line_bytes = max_line_bytes
+        self.max_stderr_bytes = max_stderr_bytes
+        self.lines: "queue.Queue[Any]" = queue.Queue()
+        self.stderr_buf = bytearray()
+        self.stderr_total = 0
+        self._stderr_lock = threading.Lock()
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def stderr_since(self, mark: int) -> bytes:
+        with self._stderr_lock:
+            size = min(self.stderr_total - mark, len(self.stderr_buf))
+            return bytes(self.stderr_buf[len(self.stderr_buf) - size:]) if size > 0 else b""
+
+    def stderr_mark(self) -> int:
+        with self._stderr_lock:
+            return self.stderr_total
+
+    def send(self, frame: Dict[str, Any]) -> None:
+        self.proc.stdin.write(json.dumps(frame, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+
+    def stop(self) -> None:
+        try:
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=STOP_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            pass
+        self.kill()
+
+    def kill(self) -> None:
+        terminate_session(self.proc.pid, 0, self.proc.poll)
+        self.proc.wait()
+
+    def _read_stdout(self) -> None:
+        stream = self.proc.stdout
+        while True:
+            line = stream.readline(self.max_line_bytes + 1)
+            if not line:
+                self.lines.put(None)
+                return
+            if len(line) > self.max_line_bytes and not line.endswith(b"\n"):
+                self.lines.put(_OVERSIZED)
+                return
+            self.lines.put(line)
+
+    def _read_stderr(self) -> None:
+        while True:
+            chunk = os.read(self.proc.stderr.fileno(), READ_CHUNK)
+            if not chunk:
+                return
+            with self._stderr_lock:
+                self.stderr_total += len(chunk)
+                self.stderr_buf.extend(chunk)
+                overflow = len(self.stderr_buf) - self.max_stderr_bytes
+                if overflow > 0:
+                    del self.stderr_buf[:overflow]
+
+
+class _SkillWorkers:
+    def __init__(self, skill: SkillSpec) -> None:
+        self.skill = skill
+        self.idle: List[_Worker] = []
+        self.count = 0
+        self.cond = threading.Condition()
+
+
+class PersistentPool:
+    def __init__(self, max_stdout_bytes: int, max_stderr_bytes: int) -> None:
+        self.max_stdout_bytes = max_stdout_bytes
+        self.max_stderr_bytes = max_stderr_bytes
+        self._pools: Dict[str, _SkillWorkers] = {}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def run(
+        self,
+        skill: SkillSpec,
+        command: List[str],
+        env: Dict[str, str],
+        execution_id: str,
+        input_data: Dict[str, Any],
+        timeout_seconds: float,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> WorkerReply:
+        deadline = time.monotonic() + timeout_seconds
+        pool = self._pool(skill)
+        worker = self._checkout(pool, command, env, deadline)
+        if worker is None:
+            return WorkerReply(stderr=b"No persistent worker became available", timed_out=True)
+
+        mark = worker.stderr_mark()
+        try:
+            worker.send({"id": execution_id, "input": input_data, **(extra or {})})
+        except OSError:
+            self._retire(pool, worker, kill=True)
+            return WorkerReply(stderr=worker.stderr_since(mark), exit_code=worker.proc.poll())
+
+        try:
+            line = worker.lines.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            self._retire(pool, worker, kill=True)
+            return WorkerReply(stderr=worker.stderr_since(mark), timed_out=True)
+
+        if line is None:
+            self._retire(pool, worker, kill=True)
+            return WorkerReply(stderr=worker.stderr_since(mark), exit_code=worker.proc.poll())
+        if line is _OVERSIZED:
+            self._retire(pool, worker, kill=True)
+            return WorkerReply(stderr=worker.stderr_since(mark), exit_code=0, stdout_exceeded=True)
+
+        try:
+            frame = json.loads(line)
+        except json.JSONDecodeError as exc:
+            self._retire(pool, worker, kill=True)
+            error = f"Invalid response frame: {exc}".encode("utf-8")
+            return WorkerReply(stdout=line, stderr=worker.stderr_since(mark) + error, exit_code=1)
+        if not isinstance(frame, dict) or frame.get("id") != execution_id:
+            self._retire(pool, worker, kill=True)
+            error = b"Response frame does not match execution id"
+            return WorkerReply(stdout=line, stderr=worker.stderr_since(mark) + error, exit_code=1)
+
+        worker.requests += 1
+        self._checkin(pool, worker)
+        stderr = worker.stderr_since(mark)
+        if "error" in frame:
+            error = str(frame["error"]).encode("utf-8")
+            return WorkerReply(stdout=line, stderr=stderr + error, exit_code=1)
+        return WorkerReply(stdout=line, stderr=stderr, exit_code=0, output=frame.get("output"))
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            with pool.cond:
+                workers = list(pool.idle)
+                pool.idle.clear()
+            for worker in workers:
+                worker.stop()
+
+    def _pool(self, skill: SkillSpec) -> _SkillWorkers:
+        stale: Optional[_SkillWorkers] = None
+        with self._lock:
+            pool = self._pools.get(skill.name)
+            if pool is None or pool.skill != skill:
+                stale = pool
+                pool = _SkillWorkers(skill)
+                self._pools[skill.name] = pool
+        if stale is not None:
+            with stale.cond:
+                workers = list(stale.idle)
+                stale.idle.clear()
+            for worker in workers:
+                worker.stop()
+        return pool
+
+    def _checkout(
+        self,
+        pool: _SkillWorkers,
+        command: List[str],
+        env: Dict[str, str],
+        deadline: float,
+    ) -> Optional[_Worker]:
+        with pool.cond:
+            while True:
+                while pool.idle:
+                    worker = pool.idle.pop()
+                    if worker.alive():
+                        return worker
+                    pool.count -= 1
+                if pool.count < pool.skill.workers:
+                    pool.count += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                pool.cond.wait(remaining)
+        try:
+            return _Worker(
+                command,
+                str(pool.skill.path),
+                env,
+                self.max_stdout_bytes,
+                self.max_stderr_bytes,
+            )
+        except Exception:
+            with pool.cond:
+                pool.count -= 1
+                pool.cond.notify()
+            raise
+
+    def _checkin(self, pool: _SkillWorkers, worker: _Worker) -> None:
+        skill = pool.skill
+        rss = _rss_bytes(worker.proc.pid) if skill.max_rss_mb else None
+        exhausted = skill.max_requests and worker.requests >= skill.max_requests
+        bloated = rss is not None and rss > skill.max_rss_mb * 1024 * 1024
+        if exhausted or bloated or not worker.alive():
+            self._retire(pool, worker, kill=False)
+            return
+        with pool.cond:
+            # Checked under the pool's condition: _pool() drains a replaced
+            # pool under the same lock, so a worker that comes back to it
+            # (hot reload, close) is either drained there or retired here.
+            with self._lock:
+                current = self._pools.get(skill.name) is pool
+            if current:
+                pool.idle.append(worker)
+                pool.cond.notify()
+        if not current:
+            self._retire(pool, worker, kill=False)
+
+    def _retire(self, pool: _SkillWorkers, worker: _Worker, kill: bool) -> None:
+        if kill:
+            worker.kill()
+        else:
+            threading.Thread(target=worker.stop, daemon=True).start()
+        with pool.cond:
+            pool.count -= 1
+            pool.cond.notify()
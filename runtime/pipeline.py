@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from .admission import AdmissionRejected
+from .batch import parse_timeout_ms
+from .executor import SkillExecutor
+from .models import ExecutionResult, SkillSpec
+from .payload import result_payload
+from .registry import SkillRegistry
+
+REF_KEY = "$ref"
+
+
+class PipelineError(ValueError):
+    pass
+
+
+@dataclass
+class PipelineNode:
+    id: str
+    skill: SkillSpec
+    input_template: Any
+    timeout_ms: Optional[int]
+    depends_on: Set[str] = field(default_factory=set)
+
+
+def _refs(value: Any) -> Set[str]:
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            return {str(value[REF_KEY]).split(".", 1)[0]}
+        return set().union(*(_refs(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_refs(v) for v in value)) if value else set()
+    return set()
+
+
+def _resolve(value: Any, outputs: Dict[str, Any]) -> Any:
+    # {"$ref": "node.path.to.field"} is replaced by that field of the upstream
+    # node's output; list elements are addressed by index.
+    if isinstance(value, dict):
+        if set(value) == {REF_KEY}:
+            node_id, _, path = str(value[REF_KEY]).partition(".")
+            current = outputs[node_id]
+            for part in path.split(".") if path else []:
+                if isinstance(current, dict) and part in current:
+                    current = current[part]
+                elif isinstance(current, list) and part.lstrip("-").isdigit():
+                    try:
+                        current = current[int(part)]
+                    except IndexError:
+                        raise PipelineError(f"Unresolved reference {value[REF_KEY]}") from None
+                else:
+                    raise PipelineError(f"Unresolved reference {value[REF_KEY]}")
+            return current
+        return {k: _resolve(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, outputs) for v in value]
+    return value
+
+
+def parse_pipeline(registry: SkillRegistry, raw_nodes: Any, max_nodes: int) -> List[PipelineNode]:
+    if not isinstance(raw_nodes, list) or not raw_nodes:
+        raise PipelineError("nodes must be a non-empty list")
+    if len(raw_nodes) > max_nodes:
+        raise PipelineError(f"At most {max_nodes} nodes per pipeline")
+
+    nodes: Dict[str, PipelineNode] = {}
+    for raw in raw_nodes:
+        if not isinstance(raw, dict) or not raw.get("id"):
+            raise PipelineError("every node needs an id")
+        node_id = str(raw["id"])
+        if node_id in nodes:
+            raise PipelineError(f"duplicate node id '{node_id}'")
+        skill = registry.get(raw.get("skillName") or "")
+        if skill is None:
+            raise PipelineError(f"node '{node_id}': skill not found")
+        input_template = raw.get("input") or {}
+        if not isinstance(input_template, dict):
+            raise PipelineError(f"node '{node_id}': input must be an object")
+        options = raw.get("options") or {}
+        if not isinstance(options, dict):
+            raise PipelineError(f"node '{node_id}': options must be an object")
+        try:
+            timeout_ms = parse_timeout_ms(options.get("timeoutMs"))
+        except ValueError as exc:
+            raise PipelineError(f"node '{node_id}': {exc}") from exc
+        depends_on = _refs(input_template) | {str(d) for d in raw.get("dependsOn") or []}
+        nodes[node_id] = PipelineNode(
+            id=node_id,
+            skill=skill,
+            input_template=input_template,
+            timeout_ms=timeout_ms,
+            depends_on=depends_on,
+        )
+
+    for node in nodes.values():
+        unknown = node.depends_on - nodes.keys()
+        if unknown:
+            raise PipelineError(f"node '{node.id}' depends on unknown node(s) {sorted(unknown)}")
+
+    # Kahn's algorithm; anything left over sits on a cycle.
+    remaining = {node_id: set(node.depends_on) for node_id, node in nodes.items()}
+    ready = [node_id for node_id, deps in remaining.items() if not deps]
+    while ready:
+        done = ready.pop()
+        del remaining[done]
+        for node_id, deps in remaining.items():
+            if done in deps:
+                deps.discard(done)
+                if not deps:
+                    ready.append(node_id)
+    if remaining:
+        raise PipelineError(f"pipeline has a cycle through {sorted(remaining)}")
+    return list(nodes.values())
+
+
+class _Run:
+    # Scheduling state shared by the thread and asyncio drivers.
+
+    def __init__(self, nodes: List[PipelineNode]) -> None:
+        self.nodes = {node.id: node for node in nodes}
+        self.pending = dict(self.nodes)
+        self.outputs: Dict[str, Any] = {}
+        self.report: Dict[str, Dict[str, Any]] = {}
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def ready(self) -> List[PipelineNode]:
+        # Skipping a node can make its own dependants skippable, so repeat
+        # until nothing changes.
+        ready: List[PipelineNode] = []
+        with self._lock:
+            changed = True
+            while changed:
+                changed = False
+                for node in list(self.pending.values()):
+                    failed = [
+                        d for d in node.depends_on if d in self.report and d not in self.outputs
+                    ]
+                    if failed:
+                        del self.pending[node.id]
+                        self.report[node.id] = {
+                            "status": "skipped",
+                            "skillName": node.skill.name,
+                            "error": f"upstream node(s) {sorted(failed)} did not succeed",
+                        }
+                        changed = True
+                    elif node.depends_on <= self.outputs.keys():
+                        del self.pending[node.id]
+                        ready.append(node)
+        return ready
+
+    def input_for(self, node: PipelineNode) -> Dict[str, Any]:
+        with self._lock:
+            outputs = dict(self.outputs)
+        return _resolve(node.input_template, outputs)
+
+    def offset_ms(self, moment: float) -> float:
+        return round((moment - self.started) * 1000, 1)
+
+    def record(
+        self,
+        node: PipelineNode,
+        started: float,
+        result: Optional[ExecutionResult],
+        error: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        payload = result_payload(result) if result is not None else error or {}
+        succeeded = result is not None and result.success
+        entry = {
+            "status": "succeeded" if succeeded else "failed",
+            "skillName": node.skill.name,
+            "startMs": self.offset_ms(started),
+            "durationMs": round((time.monotonic() - started) * 1000, 1),
+            **payload,
+        }
+        with self._lock:
+            if succeeded:
+                self.outputs[node.id] = result.output
+            self.report[node.id] = entry
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "success": all(entry["status"] == "succeeded" for entry in self.report.values()),
+            "nodes": {node_id: self.report[node_id] for node_id in self.nodes},
+            "durationMs": self.offset_ms(time.monotonic()),
+        }
+
+
+def _error(exc: Exception) -> Dict[str, Any]:
+    if isinstance(exc, AdmissionRejected):
+        return {"success": False, "error": str(exc), "retryAfter": exc.retry_after}
+    return {"success": False, "error": str(exc)}
+
+
+def run_pipeline(
+    executor: SkillExecutor,
+    nodes: List[PipelineNode],
+    parallelism: int,
+) -> Dict[str, Any]:
+    run = _Run(nodes)
+
+    def execute(node: PipelineNode) -> None:
+        started = time.monotonic()
+        try:
+            result = executor.execute(
+                node.skill,
+                input_data=run.input_for(node),
+                timeout_ms=node.timeout_ms,
+            )
+        except Exception as exc:  # noqa: BLE001
+            run.record(node, started, None, _error(exc))
+            return
+        run.record(node, started, result)
+
+    in_flight: Set[Future] = set()
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+        while True:
+            in_flight.update(pool.submit(execute, node) for node in run.ready())
+            if not in_flight:
+                break
+            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+    return run.summary()
+
+
+async def run_pipeline_async(
+    executor: SkillExecutor,
+    nodes: List[PipelineNode],
+    parallelism: int,
+) -> Dict[str, Any]:
+    run = _Run(nodes)
+    semaphore = asyncio.Semaphore(max(1, parallelism))
+
+    async def execute(node: PipelineNode) -> None:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                result = await executor.execute_async(
+                    node.skill,
+                    input_data=run.input_for(node),
+                    timeout_ms=node.timeout_ms,
+                )
+            except Exception as exc:  # noqa: BLE001
+                run.record(node, started, None, _error(exc))
+                return
+            run.record(node, started, result)
+
+    in_flight: Set[asyncio.Future] = set()
+    while True:
+        in_flight.update(asyncio.ensure_future(execute(node)) for node in run.ready())
+        if not in_flight:
+            break
+        _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+    return run.summary()
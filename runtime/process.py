@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import os
+import signal
+import time
+from typing import Callable, List, Optional, Tuple
+
+POLL_INTERVAL_SECONDS = 0.02
+KILL_SETTLE_SECONDS = 0.5
+PROC_DIR = "/proc"
+
+
+def _stat_fields(pid: int) -> Optional[List[bytes]]:
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat", "rb") as fh:
+            raw = fh.read()
+    except OSError:
+        return None
+    # The command name may contain spaces and parentheses; fields after it are fixed.
+    return raw[raw.rfind(b")") + 2:].split()
+
+
+def _read_stat(pid: int) -> Optional[Tuple[str, int, int]]:
+    fields = _stat_fields(pid)
+    try:
+        return fields[0].decode("ascii"), int(fields[1]), int(fields[3])
+    except (TypeError, IndexError, ValueError):
+        return None
+
+
+def start_time(pid: int) -> Optional[int]:
+    # Clock ticks since boot; together with the pid this identifies a process
+    # even after the pid number has been reused. None once it has exited,
+    # including while it is a zombie waiting to be reaped.
+    fields = _stat_fields(pid)
+    try:
+        if fields[0] in (b"Z", b"X"):
+            return None
+        return int(fields[19])
+    except (TypeError, IndexError, ValueError):
+        return None
+
+
+def session_members(sid: int) -> List[Tuple[int, int, str]]:
+    members: List[Tuple[int, int, str]] = []
+    try:
+        entries = os.listdir(PROC_DIR)
+    except OSError:
+        return members
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        stat = _read_stat(int(entry))
+        if stat is not None and stat[2] == sid:
+            members.append((int(entry), stat[1], stat[0]))
+    return members
+
+
+def _live(sid: int) -> List[int]:
+    return [pid for pid, _, state in session_members(sid) if state not in ("Z", "X")]
+
+
+def _signal_session(sid: int, sig: int) -> None:
+    try:
+        os.killpg(sid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+    if sig == signal.SIGKILL:
+        # Members that moved to their own process group are still in the session.
+        for pid in _live(sid):
+            try:
+                os.kill(pid, sig)
+            except (ProcessLookupError, PermissionError):
+                continue
+
+
+def _wait_gone(sid: int, timeout_seconds: float, reap: Callable[[], None]) -> bool:
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        reap()
+        if not _live(sid):
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(POLL_INTERVAL_SECONDS)
+
+
+def has_group(sid: int) -> bool:
+    try:
+        os.killpg(sid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def terminate_session(
+    sid: int,
+    grace_seconds: float,
+    reap: Callable[[], None] = lambda: None,
+) -> int:
+    # SIGTERM the whole session, then SIGKILL whatever is left after the grace
+    # period. ``reap`` lets the caller collect its direct child while waiting;
+    # orphaned descendants are re-parented to init and reaped there. Returns
+    # the number of descendants (other than ``sid`` itself) that were still
+    # running and had to be terminated.
+    leaked = len([pid for pid in _live(sid) if pid != sid])
+    _signal_session(sid, signal.SIGTERM)
+    if not _wait_gone(sid, grace_seconds, reap):
+        _signal_session(sid, signal.SIGKILL)
+        _wait_gone(sid, KILL_SETTLE_SECONDS, reap)
+    return leaked
+
+
+def cleanup_session(
+    sid: int,
+    grace_seconds: float,
+    reap: Callable[[], None] = lambda: None,
+) -> int:
+    # Called after a skill exited normally: only pays for a /proc scan when
+    # something is still left in its process group.
+    if not has_group(sid):
+        return 0
+    return terminate_session(sid, grace_seconds, reap)
@@ -0,0 +1,37 @@
+# Started as ``python [flags] pyboot.py <run.py>`` for python skills.
+# ``python run.py`` always compiles the script from source; going through
+# SourceFileLoader lets the entrypoint use the bytecode the registry
+# precompiled into __pycache__. Standard library only: the runtime package is
+# not importable from the skill process.
+import os
+import sys
+import types
+from importlib.machinery import SourceFileLoader
+
+
+def main() -> None:
+    path = os.path.abspath(sys.argv[1])
+    sys.argv = sys.argv[1:]
+    # Same sys.path[0] as ``python run.py``; with -P/-I there is none.
+    if not getattr(sys.flags, "safe_path", False):
+        sys.path[0] = os.path.dirname(path)
+
+    loader = SourceFileLoader("__main__", path)
+    code = loader.get_code("__main__")
+    module = types.ModuleType("__main__")
+    module.__file__ = path
+    module.__cached__ = None
+    module.__loader__ = loader
+    module.__builtins__ = __builtins__
+    sys.modules["__main__"] = module
+    try:
+        exec(code, module.__dict__)
+    except Exception as exc:  # noqa: BLE001
+        # Report it the way ``python run.py`` would, without this frame.
+        exc.__traceback__ = exc.__traceback__.tb_next
+        sys.excepthook(type(exc), exc, exc.__traceback__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,116 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, List, Optional, Union
 
+from .launch import allowed_env, compile_launch, parse_python_flags, precompile
 from .models import SkillSpec
 
 SUPPORTED_RUNTIMES = {"python", "node", "shell"}
+SUPPORTED_MODES = {"oneshot", "persistent"}
 DEFAULT_TIMEOUT_MS = 10_000
+DEFAULT_QUEUE_TIMEOUT_MS = 30_000
 
 
 class SkillRegistry:
-    def __init__(self, skills_dir: Path) -> None:
+    def __init__(
+        self,
+        skills_dir: Path,
+        env_allowlist: Iterable[str] = (),
+        precompile: bool = False,
+        python_flags: Iterable[str] = (),
+        node_cache_dir: Optional[Path] = None,
+    ) -> None:
         self.skills_dir = skills_dir
+        self.env_allowlist = list(env_allowlist)
+        self.precompile = precompile
+        self.python_flags = parse_python_flags(list(python_flags))
+        self.node_cache_dir = node_cache_dir
+        # Readers use self.skills / self.errors without locking; reloads build
+        # new containers and swap them in. Bumped on every change.
         self.skills: Dict[str, SkillSpec] = {}
         self.errors: List[str] = []
+        self.generation = 0
+        # Skill directory name -> loaded spec, or the error that prevented it.
+        self._entries: Dict[str, Union[SkillSpec, str]] = {}
+        self._lock = threading.Lock()
         self.scan()
 
     def scan(self) -> None:
-        self.skills.clear()
-        self.errors.clear()
-        if not self.skills_dir.exists():
-            self.errors.append(f"Skills dir not found: {self.skills_dir}")
-            return
-
-        for entry in sorted(self.skills_dir.iterdir()):
-            if not entry.is_dir():
-                continue
-            yaml_path = entry / "skill.yaml"
-            if not yaml_path.exists():
-                continue
-            try:
-                spec = self._load_skill(entry, yaml_path)
-                self.skills[spec.name] = spec
-            except Exception as exc:  # noqa: BLE001
-                self.errors.append(f"{entry.name}: {exc}")
+        with self._lock:
+            if not self.skills_dir.exists():
+                self._entries = {}
+                self._publish([f"Skills dir not found: {self.skills_dir}"])
+                return
+            env = allowed_env(self.env_allowlist)
+            entries: Dict[str, Union[SkillSpec, str]] = {}
+            for entry in self.skills_dir.iterdir():
+                loaded = self._load_dir(entry, env)
+                if loaded is not None:
+                    entries[entry.name] = loaded
+            self._entries = entries
+            self._publish()
+
+    def reload(self, dir_names: Iterable[str]) -> int:
+        # Re-reads only the given skill directories; everything else keeps
+        # its spec (and therefore its warm pools).
+        with self._lock:
+            if not self.skills_dir.exists():
+                return 0
+            env = allowed_env(self.env_allowlist)
+            entries = dict(self._entries)
+            names = set(dir_names)
+            for name in names:
+                loaded = self._load_dir(self.skills_dir / name, env)
+                if loaded is None:
+                    entries.pop(name, None)
+                else:
+                    entries[name] = loaded
+            self._entries = entries
+            self._publish()
+            return len(names)
+
+    def _load_dir(
+        self,
+        skill_dir: Path,
+        env: Dict[str, str],
+    ) -> Optional[Union[SkillSpec, str]]:
+        yaml_path = skill_dir / "skill.yaml"
+        if not skill_dir.is_dir() or not yaml_path.exists():
+            return None
+        try:
+            spec = self._load_skill(skill_dir, yaml_path)
+            if spec.runtime_type == "python" and self.precompile:
+                precompile(spec, self.python_flags)
+            spec.launch = compile_launch(
+                spec,
+                env,
+                self.precompile,
+                self.python_flags,
+                self.node_cache_dir,
+            )
+            # Pools and zygotes compare specs, so a reloaded skill never
+            # reuses processes started from the previous version.
+            spec.generation = self.generation + 1
+            return spec
+        except Exception as exc:  # noqa: BLE001
+            return f"{skill_dir.name}: {exc}"
+
+    def _publish(self, errors: Optional[List[str]] = None) -> None:
+        # Caller holds self._lock.
+        skills: Dict[str, SkillSpec] = {}
+        collected = list(errors or [])
+        for name in sorted(self._entries):
+            loaded = self._entries[name]
+            if isinstance(loaded, str):
+                collected.append(loaded)
+            else:
+                skills[loaded.name] = loaded
+        self.generation += 1
+        self.skills = skills
+        self.errors = collected
 
     def _load_skill(self, skill_dir: Path, yaml_path: Path) -> SkillSpec:
         raw = yaml_path.read_text(encoding="utf-8")
@@ -51,14 +127,58 @@ class SkillRegistry:
         runtime_type = runtime.get("type")
         timeout_ms = int(data.get("timeout", DEFAULT_TIMEOUT_MS))
         artifacts = data.get("artifacts") or []
+        standby = int(runtime.get("standby", 0))
+        fork_safe = bool(runtime.get("fork", False))
+        mode = runtime.get("mode", "oneshot")
+        workers = int(runtime.get("workers", 1))
+        max_requests = int(runtime.get("maxRequests", 0))
+        max_rss_mb = int(runtime.get("maxRssMb", 0))
+        cache = data.get("cache") or {}
+        cache_ttl_ms = int(cache.get("ttl", 0))
+        cache_key = cache.get("key")
+        coalesce = bool(data.get("coalesce", False))
+        concurrency = data.get("concurrency") or {}
+        max_concurrency = int(concurrency.get("max", 0))
+        queue_size = int(concurrency.get("queue", 0))
+        queue_timeout_ms = int(concurrency.get("queueTimeoutMs", DEFAULT_QUEUE_TIMEOUT_MS))
+        python_flags = runtime.get("pythonFlags")
 
         if not name:
             raise ValueError("missing 'name'")
+        if standby < 0:
+            raise ValueError("runtime.standby must be >= 0")
         if runtime_type not in SUPPORTED_RUNTIMES:
             raise ValueError(
                 f"unsupported runtime.type '{runtime_type}'. Supported: {sorted(SUPPORTED_RUNTIMES)}"
             )
 
+        if fork_safe and runtime_type != "python":
+            raise ValueError("runtime.fork is only supported for python skills")
+        if mode not in SUPPORTED_MODES:
+            raise ValueError(
+                f"unsupported runtime.mode '{mode}'. Supported: {sorted(SUPPORTED_MODES)}"
+            )
+        if mode == "persistent" and fork_safe:
+            raise ValueError("runtime.fork cannot be combined with persistent mode")
+        if workers < 1:
+            raise ValueError("runtime.workers must be >= 1")
+        if cache_ttl_ms < 0:
+            raise ValueError("cache.ttl must be >= 0")
+        if cache_key is not None and (
+            not isinstance(cache_key, list) or not all(isinstance(k, str) for k in cache_key)
+        ):
+            raise ValueError("cache.key must be a list of input field names")
+        if max_concurrency < 0 or queue_size < 0 or queue_timeout_ms < 0:
+            raise ValueError("concurrency.max, queue and queueTimeoutMs must be >= 0")
+        if python_flags is not None:
+            if runtime_type != "python":
+                raise ValueError("runtime.pythonFlags is only supported for python skills")
+            if not isinstance(python_flags, list) or not all(
+                isinstance(flag, str) for flag in python_flags
+            ):
+                raise ValueError("runtime.pythonFlags must be a list of strings")
+            python_flags = parse_python_flags(python_flags)
+
         entrypoint = self._resolve_entrypoint(skill_dir, runtime_type)
         return SkillSpec(
             name=name,
@@ -68,6 +188,19 @@ class SkillRegistry:
             artifacts=artifacts,
             path=skill_dir,
             entrypoint=entrypoint,
+            standby=standby,
+            fork_safe=fork_safe,
+            mode=mode,
+            workers=workers,
+            max_requests=max_requests,
+            max_rss_mb=max_rss_mb,
+            cache_ttl_ms=cache_ttl_ms,
+            cache_key=cache_key,
+            coalesce=coalesce,
+            max_concurrency=max_concurrency,
+            queue_size=queue_size,
+            queue_timeout_ms=queue_timeout_ms,
+            python_flags=python_flags,
         )
 
     def _resolve_entrypoint(self, skill_dir: Path, runtime_type: str) -> Path:
@@ -97,5 +230,9 @@ class SkillRegistry:
     def get(self, name: str) -> SkillSpec | None:
         return self.skills.get(name)
 
+    def get_by_dir(self, dir_name: str) -> SkillSpec | None:
+        loaded = self._entries.get(dir_name)
+        return loaded if isinstance(loaded, SkillSpec) else None
+
     def get_errors(self) -> List[str]:
         return list(self.errors)
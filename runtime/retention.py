@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .blobs import BlobStore
+
+INDEX_NAME = "executions.ndjson"
+METRICS_NAME = "gc.json"
+EXECUTION_PREFIX = "exec-"
+# Blobs touched this recently may belong to an execution that is not indexed
+# yet, so GC leaves them alone.
+BLOB_GRACE_SECONDS = 600
+
+
+@dataclass
+class RetentionPolicy:
+    max_age_seconds: float = 0
+    max_total_bytes: int = 0
+    max_per_skill: int = 0
+
+    def enabled(self) -> bool:
+        return bool(self.max_age_seconds or self.max_total_bytes or self.max_per_skill)
+
+
+class ArtifactIndex:
+    # Append-only NDJSON log of finished executions, one short record each:
+    # {"id", "skill", "at", "bytes", "digests"}, plus "target" for coalesced
+    # aliases (symlinks to the execution that ran). Writers append under a shared
+    # flock; GC rewrites the file under the exclusive lock, so it never has to
+    # walk ARTIFACTS_DIR.
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = root / INDEX_NAME
+
+    def record(
+        self,
+        execution_id: str,
+        skill_name: str,
+        size: int,
+        digests: List[str],
+        at: Optional[float] = None,
+        target: Optional[str] = None,
+    ) -> None:
+        entry: Dict[str, Any] = {
+            "id": execution_id,
+            "skill": skill_name,
+            "at": round(at if at is not None else time.time(), 3),
+            "bytes": size,
+            "digests": digests,
+        }
+        if target is not None:
+            entry["target"] = target
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self.locked(fcntl.LOCK_SH):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+    def load(self) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def rewrite(self, entries: List[Dict[str, Any]]) -> None:
+        # Caller holds the exclusive lock.
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(tmp, self.path)
+
+    @contextmanager
+    def locked(self, operation: int) -> Iterator[None]:
+        fd = os.open(self.root / "index.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            os.close(fd)
+
+
+class ArtifactGC:
+    def __init__(
+        self,
+        artifacts_dir: Path,
+        index: ArtifactIndex,
+        blobs: BlobStore,
+        policy: RetentionPolicy,
+    ) -> None:
+        self.artifacts_dir = artifacts_dir
+        self.index = index
+        self.blobs = blobs
+        self.policy = policy
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def collect(self, now: Optional[float] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        now = now if now is not None else time.time()
+        # Only one GC runs host-wide; the others skip this round.
+        fd = os.open(self.index.root / "gc.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return {"skipped": True}
+            with self.index.locked(fcntl.LOCK_EX):
+                entries = self.index.load()
+                expired = self._expired(entries, now)
+                survivors = [entry for entry in entries if entry["id"] not in expired]
+                self.index.rewrite(survivors)
+            run = self._remove(entries, expired, survivors, now)
+            run["durationMs"] = round((time.monotonic() - started) * 1000, 1)
+            self._update_metrics(run, now)
+            return run
+        finally:
+            os.close(fd)
+
+    def rebuild(self) -> int:
+        # One-off walk for executions that finished before the index existed.
+        with self.index.locked(fcntl.LOCK_EX):
+            known = {entry["id"] for entry in self.index.load()}
+            added: List[Dict[str, Any]] = []
+            for exec_dir in self.artifacts_dir.iterdir():
+                if not exec_dir.name.startswith(EXECUTION_PREFIX) or exec_dir.name in known:
+                    continue
+                if exec_dir.is_symlink() or not (exec_dir / "stdout.txt").exists():
+                    continue
+                manifest = self.blobs.read_manifest(exec_dir)
+                added.append(
+                    {
+                        "id": exec_dir.name,
+                        "skill": "",
+                        "at": round(exec_dir.stat().st_mtime, 3),
+                        "bytes": directory_size(exec_dir),
+                        "digests": sorted({item.digest for item in manifest.values()}),
+                    }
+                )
+            entries = self.index.load() + added
+            entries.sort(key=lambda entry: entry["at"])
+            self.index.rewrite(entries)
+        return len(added)
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self.index.load()
+        return {
+            "policy": {
+                "maxAgeSeconds": self.policy.max_age_seconds,
+                "maxTotalBytes": self.policy.max_total_bytes,
+                "maxPerSkill": self.policy.max_per_skill,
+            },
+            "executions": len(entries),
+            "bytes": sum(entry.get("bytes", 0) for entry in entries),
+            "gc": self._read_metrics(),
+        }
+
+    def start(self, interval_seconds: float) -> None:
+        if interval_seconds <= 0 or not self.policy.enabled() or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._loop,
+            args=(interval_seconds,),
+            name="artifact-gc",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _loop(self, interval_seconds: float) -> None:
+        while not self._stop.wait(interval_seconds):
+            try:
+                self.collect()
+            except OSError:
+                continue
+
+    def _expired(self, entries: List[Dict[str, Any]], now: float) -> Set[str]:
+        policy = self.policy
+        expired: Set[str] = set()
+        ordered = sorted(entries, key=lambda entry: entry["at"])
+        if policy.max_age_seconds:
+            cutoff = now - policy.max_age_seconds
+            expired.update(entry["id"] for entry in ordered if entry["at"] < cutoff)
+        if policy.max_per_skill:
+            per_skill: Dict[str, List[Dict[str, Any]]] = {}
+            for entry in ordered:
+                if entry["id"] not in expired:
+                    per_skill.setdefault(entry.get("skill", ""), []).append(entry)
+            for kept in per_skill.values():
+                expired.update(entry["id"] for entry in kept[: -policy.max_per_skill])
+        if policy.max_total_bytes:
+            live = [entry for entry in ordered if entry["id"] not in expired]
+            total = sum(entry.get("bytes", 0) for entry in live)
+            for entry in live:
+                if total <= policy.max_total_bytes:
+                    break
+                expired.add(entry["id"])
+                total -= entry.get("bytes", 0)
+        # Aliases go with the execution they point to; they would only dangle.
+        # Records written before "target" existed are matched on the link.
+        for entry in entries:
+            if entry.get("target") in expired:
+                expired.add(entry["id"])
+            elif "target" not in entry and not entry.get("bytes"):
+                path = self.artifacts_dir / entry["id"]
+                if path.is_symlink() and os.readlink(path) in expired:
+                    expired.add(entry["id"])
+        return expired
+
+    def _remove(
+        self,
+        entries: List[Dict[str, Any]],
+        expired: Set[str],
+        survivors: List[Dict[str, Any]],
+        now: float,
+    ) -> Dict[str, Any]:
+        reclaimed = 0
+        removed = 0
+        candidates: Set[str] = set()
+        for entry in entries:
+            if entry["id"] not in expired:
+                continue
+            candidates.update(entry.get("digests") or [])
+            exec_dir = self.artifacts_dir / entry["id"]
+            if exec_dir.is_symlink():
+                exec_dir.unlink()
+                removed += 1
+                continue
+            # Hardlinked artifacts only free space once their blob goes too.
+            reclaimed += directory_size(exec_dir, exclusive=True)
+            shutil.rmtree(exec_dir, ignore_errors=True)
+            removed += 1
+
+        live = {digest for entry in survivors for digest in entry.get("digests") or []}
+        blobs_removed = 0
+        for digest in candidates - live:
+            for blob in (self.blobs.blob_path(digest), self.blobs.blob_path(digest, "gzip")):
+                try:
+                    stat = blob.stat()
+                except FileNotFoundError:
+                    continue
+                # A plain blob still linked from an unindexed execution stays.
+                if stat.st_nlink > 1 or now - stat.st_mtime < BLOB_GRACE_SECONDS:
+                    continue
+                try:
+                    blob.unlink()
+                except OSError:
+                    continue
+                reclaimed += stat.st_size
+                blobs_removed += 1
+        return {
+            "removedExecutions": removed,
+            "removedBlobs": blobs_removed,
+            "reclaimedBytes": reclaimed,
+        }
+
+    def _update_metrics(self, run: Dict[str, Any], now: float) -> None:
+        metrics = self._read_metrics()
+        metrics["runs"] = metrics.get("runs", 0) + 1
+        metrics["lastRunAt"] = now
+        metrics["lastRun"] = run
+        for key in ("removedExecutions", "removedBlobs", "reclaimedBytes"):
+            metrics[key] = metrics.get(key, 0) + run[key]
+        fd, tmp = tempfile.mkstemp(dir=self.index.root, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(metrics, fh)
+        os.replace(tmp, self.index.root / METRICS_NAME)
+
+    def _read_metrics(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.index.root / METRICS_NAME).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+
+def directory_size(path: Path, exclusive: bool = False) -> int:
+    # With exclusive=True, files that share an inode with another link (blob
+    # store hardlinks) are not counted.
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                stat = os.lstat(os.path.join(dirpath, filename))
+            except OSError:
+                continue
+            if exclusive and stat.st_nlink > 1:
+                continue
+            total += stat.st_size
+    return total
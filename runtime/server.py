@@ -2,26 +2,58 @@ from __future__ import annotations
 
 import argparse
 import json
+import shlex
 import sys
+import time
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from urllib.parse import unquote, urlsplit
 
+from .admission import AdmissionRejected
+from .batch import parse_items, parse_timeout_ms, run_batch
+from .downloads import (
+    find_artifact,
+    iter_content,
+    iter_zip,
+    list_artifacts,
+    plan_download,
+    send_span,
+    sendfile_span,
+)
 from .executor import SkillExecutor
+from .fanout import parse_map, run_map
+from .limiter import AdaptiveLimiter
+from .models import SkillSpec
+from .payload import result_payload
+from .pipeline import PipelineError, parse_pipeline, run_pipeline
 from .registry import SkillRegistry
+from .retention import RetentionPolicy
+from .spawner import SpawnerUnavailable
+from .watcher import SkillsWatcher
 
 MIN_PYTHON = (3, 10)
+BATCH_MAX_ITEMS = 100
+PIPELINE_MAX_NODES = 50
 
 
 class RuntimeHandler(BaseHTTPRequestHandler):
     registry: SkillRegistry
     executor: SkillExecutor
+    batch_parallelism: int = 8
 
-    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+    def _send_json(
+        self,
+        status: int,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
         data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
         self.send_response(status)
         self.send_header("Content-Type", "application/json; charset=utf-8")
         self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(data)
 
@@ -45,12 +77,88 @@ class RuntimeHandler(BaseHTTPRequestHandler):
             payload = {
                 "skills": self.registry.list_metadata(),
                 "errors": self.registry.get_errors(),
+                "generation": self.registry.generation,
             }
             self._send_json(200, payload)
             return
+        if self.path == "/api/runtime/stats":
+            self._send_json(200, self.executor.stats())
+            return
+        if self.path.startswith("/api/executions/"):
+            self._download()
+            return
         self._send_json(404, {"error": "Not Found"})
 
+    def do_HEAD(self) -> None:  # noqa: N802
+        if self.path.startswith("/api/executions/"):
+            self._download(head=True)
+            return
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _download(self, head: bool = False) -> None:
+        parts = unquote(urlsplit(self.path).path).split("/", 5)
+        # ['', 'api', 'executions', <id>, 'artifacts.zip' | 'artifacts', <path>]
+        if len(parts) == 5 and parts[4] == "artifacts.zip" and not head:
+            self._download_zip(parts[3])
+            return
+        artifact = None
+        if len(parts) == 6 and parts[4] == "artifacts":
+            artifact = find_artifact(
+                self.executor.artifacts_dir, self.executor.blobs, parts[3], parts[5]
+            )
+        if artifact is None:
+            self._send_json(404, {"success": False, "error": "Artifact not found"})
+            return
+
+        plan = plan_download(
+            artifact,
+            range_header=self.headers.get("Range"),
+            if_range=self.headers.get("If-Range"),
+            if_none_match=self.headers.get("If-None-Match"),
+            accept_encoding=self.headers.get("Accept-Encoding"),
+        )
+        self.send_response(plan.status)
+        for name, value in plan.headers.items():
+            self.send_header(name, value)
+        if plan.status in (304, 416):
+            self.send_header("Content-Length", "0")
+        self.end_headers()
+        if head or plan.status not in (200, 206):
+            return
+        span = sendfile_span(artifact, plan)
+        if span is not None:
+            send_span(self.connection.fileno(), *span)
+            return
+        for chunk in iter_content(artifact, plan):
+            self.wfile.write(chunk)
+
+    def _download_zip(self, execution_id: str) -> None:
+        artifacts = list_artifacts(self.executor.artifacts_dir, self.executor.blobs, execution_id)
+        if artifacts is None:
+            self._send_json(404, {"success": False, "error": "Artifact not found"})
+            return
+        # The archive size is unknown up front, so the body is terminated by
+        # closing the connection.
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/zip")
+        self.send_header(
+            "Content-Disposition", f'attachment; filename="{execution_id}-artifacts.zip"'
+        )
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for chunk in iter_zip(artifacts):
+            self.wfile.write(chunk)
+
     def do_POST(self) -> None:  # noqa: N802
+        if self.path == "/api/skills/execute-batch":
+            self._execute_batch()
+            return
+        if self.path == "/api/pipelines/execute":
+            self._execute_pipeline()
+            return
         if self.path != "/api/skills/execute":
             self._send_json(404, {"error": "Not Found"})
             return
@@ -63,45 +171,107 @@ class RuntimeHandler(BaseHTTPRequestHandler):
         skill_name = body.get("skillName")
         input_data = body.get("input") or {}
         options = body.get("options") or {}
-        timeout_ms = options.get("timeoutMs")
 
         if not skill_name:
             self._send_json(400, {"success": False, "error": "skillName is required"})
             return
+        try:
+            timeout_ms = parse_timeout_ms(options.get("timeoutMs"))
+        except ValueError as exc:
+            self._send_json(400, {"success": False, "error": str(exc)})
+            return
 
         skill = self.registry.get(skill_name)
         if not skill:
             self._send_json(404, {"success": False, "error": "Skill not found"})
             return
 
+        if options.get("map"):
+            self._execute_map(skill, input_data, timeout_ms, options["map"])
+            return
+
         try:
             result = self.executor.execute(skill, input_data=input_data, timeout_ms=timeout_ms)
+        except AdmissionRejected as exc:
+            self._send_json(
+                429,
+                {"success": False, "error": str(exc), "retryAfter": exc.retry_after},
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            return
+        except SpawnerUnavailable as exc:
+            self._send_json(503, {"success": False, "error": str(exc)})
+            return
         except Exception as exc:  # noqa: BLE001
             self._send_json(500, {"success": False, "error": str(exc)})
             return
 
-        if result.success:
+        self._send_json(200 if result.success else 500, result_payload(result))
+
+    def _execute_map(
+        self,
+        skill: SkillSpec,
+        input_data: Dict[str, Any],
+        timeout_ms: Optional[int],
+        raw_map: Any,
+    ) -> None:
+        try:
+            spec = parse_map(self.registry, raw_map, self.batch_parallelism)
+            payload = run_map(self.executor, skill, input_data, timeout_ms, spec, BATCH_MAX_ITEMS)
+        except (TypeError, ValueError) as exc:
+            self._send_json(400, {"success": False, "error": str(exc)})
+            return
+        self._send_json(200 if payload["success"] else 500, payload)
+
+    def _execute_pipeline(self) -> None:
+        body = self._read_json()
+        options = body.get("options") or {}
+        try:
+            nodes = parse_pipeline(self.registry, body.get("nodes"), PIPELINE_MAX_NODES)
+            parallelism = int(options.get("parallelism") or self.batch_parallelism)
+        except (PipelineError, ValueError) as exc:
+            self._send_json(400, {"success": False, "error": str(exc)})
+            return
+        parallelism = max(1, min(parallelism, self.batch_parallelism))
+        self._send_json(200, run_pipeline(self.executor, nodes, parallelism))
+
+    def _execute_batch(self) -> None:
+        body = self._read_json()
+        options = body.get("options") or {}
+        try:
+            items = parse_items(self.registry, body.get("items"))
+            parallelism = int(options.get("parallelism") or self.batch_parallelism)
+        except ValueError as exc:
+            self._send_json(400, {"success": False, "error": str(exc)})
+            return
+        if not items or len(items) > BATCH_MAX_ITEMS:
             self._send_json(
-                200,
-                {
-                    "success": True,
-                    "executionId": result.execution_id,
-                    "output": result.output,
-                    "artifacts": result.artifacts,
-                    "stderr": result.stderr,
-                },
+                400,
+                {"success": False, "error": f"items must contain 1 to {BATCH_MAX_ITEMS} entries"},
             )
             return
 
-        self._send_json(
-            500,
-            {
-                "success": False,
-                "executionId": result.execution_id,
-                "error": result.error,
-                "stderr": result.stderr,
-            },
-        )
+        parallelism = max(1, min(parallelism, self.batch_parallelism))
+        started = time.monotonic()
+        results = run_batch(self.executor, items, parallelism)
+        stream = bool(options.get("stream")) or "application/x-ndjson" in self.headers.get("Accept", "")
+        if not stream:
+            ordered = sorted(results, key=lambda item: item["index"])
+            payload = {
+                "success": all(item["success"] for item in ordered),
+                "results": ordered,
+                "durationMs": round((time.monotonic() - started) * 1000, 1),
+            }
+            self._send_json(200, payload)
+            return
+
+        # HTTP/1.0 without Content-Length: the stream ends when the connection closes.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.end_headers()
+        for item in results:
+            self.wfile.write(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -111,6 +281,24 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--skills-dir", default="skills")
     parser.add_argument("--artifacts-dir", default="artifacts")
     parser.add_argument("--timeout-ms", type=int, default=10_000)
+    parser.add_argument("--spawner-socket", default=None)
+    parser.add_argument("--env-allow", action="append", default=[])
+    parser.add_argument("--no-precompile", action="store_true")
+    parser.add_argument("--python-flags", default="")
+    parser.add_argument("--node-cache-dir", default=None)
+    parser.add_argument("--no-node-cache", action="store_true")
+    parser.add_argument("--no-watch", action="store_true")
+    parser.add_argument("--watch-poll-interval", type=float, default=2.0)
+    parser.add_argument("--kill-grace-ms", type=int, default=1_000)
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument("--cache-max-mb", type=int, default=256)
+    parser.add_argument("--compress-artifacts", action="store_true")
+    parser.add_argument("--artifact-max-age-hours", type=float, default=168)
+    parser.add_argument("--artifact-max-total-mb", type=int, default=0)
+    parser.add_argument("--artifact-max-per-skill", type=int, default=0)
+    parser.add_argument("--artifact-gc-interval", type=int, default=600)
+    parser.add_argument("--adaptive-limit", action="store_true")
+    parser.add_argument("--batch-parallelism", type=int, default=8)
     return parser
 
 
@@ -129,11 +317,37 @@ def main() -> None:
     artifacts_dir = Path(args.artifacts_dir).resolve()
     artifacts_dir.mkdir(parents=True, exist_ok=True)
 
-    registry = SkillRegistry(skills_dir)
-    executor = SkillExecutor(artifacts_dir, default_timeout_ms=args.timeout_ms)
+    node_cache_dir = Path(args.node_cache_dir or artifacts_dir / ".node-cache").resolve()
+    registry = SkillRegistry(
+        skills_dir,
+        env_allowlist=args.env_allow,
+        precompile=not args.no_precompile,
+        python_flags=shlex.split(args.python_flags),
+        node_cache_dir=None if args.no_node_cache else node_cache_dir,
+    )
+    executor = SkillExecutor(
+        artifacts_dir,
+        default_timeout_ms=args.timeout_ms,
+        kill_grace_ms=args.kill_grace_ms,
+        cache_dir=Path(args.cache_dir).resolve() if args.cache_dir else None,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        compress_artifacts=args.compress_artifacts,
+        retention=RetentionPolicy(
+            max_age_seconds=args.artifact_max_age_hours * 3600,
+            max_total_bytes=args.artifact_max_total_mb * 1024 * 1024,
+            max_per_skill=args.artifact_max_per_skill,
+        ),
+        limiter=AdaptiveLimiter() if args.adaptive_limit else None,
+        spawner_socket=Path(args.spawner_socket) if args.spawner_socket else None,
+    )
+
+    executor.gc.start(args.artifact_gc_interval)
+    if not args.no_watch:
+        SkillsWatcher(registry, poll_interval_seconds=args.watch_poll_interval).start()
 
     RuntimeHandler.registry = registry
     RuntimeHandler.executor = executor
+    RuntimeHandler.batch_parallelism = args.batch_parallelism
 
     server = ThreadingHTTPServer((args.host, args.port), RuntimeHandler)
     print(
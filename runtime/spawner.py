@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .capture import OutputCapture
+from .process import cleanup_session, terminate_session
+
+FRAME = struct.Struct(">cI")
+FRAME_REQUEST = b"h"
+FRAME_STDIN = b"i"
+FRAME_STDOUT = b"o"
+FRAME_STDERR = b"e"
+FRAME_EXIT = b"x"
+READ_CHUNK = 65536
+CLIENT_GRACE_SECONDS = 5
+
+
+class SpawnerUnavailable(Exception):
+    pass
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks: List[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, READ_CHUNK))
+        if not chunk:
+            raise ConnectionError("spawner connection closed")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes) -> None:
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[bytes, bytes]:
+    kind, length = FRAME.unpack(_recv_exact(sock, FRAME.size))
+    return kind, _recv_exact(sock, length)
+
+
+class SpawnerClient:
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+
+    def connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def run(
+        self,
+        sock: socket.socket,
+        command: List[str],
+        cwd: str,
+        env: Dict[str, str],
+        stdin: bytes,
+        timeout_seconds: float,
+        kill_grace_seconds: float,
+        capture: OutputCapture,
+    ) -> Tuple[Optional[int], bool, int]:
+        header = {
+            "command": command,
+            "cwd": cwd,
+            "env": env,
+            "timeout": timeout_seconds,
+            "killGrace": kill_grace_seconds,
+        }
+        try:
+            with sock:
+                sock.settimeout(timeout_seconds + kill_grace_seconds + CLIENT_GRACE_SECONDS)
+                send_frame(sock, FRAME_REQUEST, json.dumps(header).encode("utf-8"))
+                send_frame(sock, FRAME_STDIN, stdin)
+                while True:
+                    kind, payload = recv_frame(sock)
+                    if kind == FRAME_STDOUT:
+                        if not capture.feed_stdout(payload):
+                            # Closing the connection makes the spawner kill the child.
+                            return None, False, 0
+                    elif kind == FRAME_STDERR:
+                        capture.feed_stderr(payload)
+                    elif kind == FRAME_EXIT:
+                        status = json.loads(payload.decode("utf-8"))
+                        return (
+                            status.get("exitCode"),
+                            bool(status.get("timedOut")),
+                            int(status.get("leaked") or 0),
+                        )
+        except OSError as exc:
+            # The child may already have run, so a silent local retry could
+            # run it twice; surface the failure instead.
+            raise SpawnerUnavailable(f"skill spawner unavailable: {exc}") from exc
+
+
+class SpawnHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        sock: socket.socket = self.request
+        try:
+            kind, raw_header = recv_frame(sock)
+            if kind != FRAME_REQUEST:
+                return
+            _, stdin = recv_frame(sock)
+            header: Dict[str, Any] = json.loads(raw_header.decode("utf-8"))
+        except (ConnectionError, ValueError, struct.error):
+            return
+
+        try:
+            proc = subprocess.Popen(
+                header["command"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=header.get("cwd"),
+                env=header.get("env"),
+                start_new_session=True,
+            )
+        except OSError as exc:
+            send_frame(sock, FRAME_STDERR, f"spawn failed: {exc}".encode("utf-8"))
+            send_frame(sock, FRAME_EXIT, json.dumps({"exitCode": 127}).encode("utf-8"))
+            return
+
+        grace = float(header.get("killGrace") or 0)
+        try:
+            timed_out = self._pump(sock, proc, stdin, float(header.get("timeout") or 0))
+        except OSError:
+            terminate_session(proc.pid, grace, proc.poll)
+            proc.wait()
+            return
+
+        if timed_out:
+            leaked = terminate_session(proc.pid, grace, proc.poll)
+        else:
+            leaked = cleanup_session(proc.pid, grace)
+        proc.wait()
+        status = {
+            "exitCode": None if timed_out else proc.returncode,
+            "timedOut": timed_out,
+            "leaked": leaked,
+        }
+        try:
+            send_frame(sock, FRAME_EXIT, json.dumps(status).encode("utf-8"))
+        except OSError:
+            return
+
+    def _pump(
+        self,
+        sock: socket.socket,
+        proc: subprocess.Popen,
+        stdin: bytes,
+        timeout_seconds: float,
+    ) -> bool:
+        writer = threading.Thread(target=self._feed_stdin, args=(proc, stdin), daemon=True)
+        writer.start()
+        deadline = time.monotonic() + timeout_seconds if timeout_seconds > 0 else None
+        kinds = {proc.stdout: FRAME_STDOUT, proc.stderr: FRAME_STDERR}
+        with selectors.DefaultSelector() as selector:
+            for stream in kinds:
+                selector.register(stream, selectors.EVENT_READ)
+            selector.register(sock, selectors.EVENT_READ)
+            while len(selector.get_map()) > 1:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return True
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is sock:
+                        if not sock.recv(1):
+                            raise ConnectionError("client went away")
+                        continue
+                    chunk = os.read(key.fd, READ_CHUNK)
+                    if not chunk:
+                        selector.unregister(key.fileobj)
+                        continue
+                    send_frame(sock, kinds[key.fileobj], chunk)
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        try:
+            proc.wait(timeout=remaining)
+        except subprocess.TimeoutExpired:
+            return True
+        return False
+
+    @staticmethod
+    def _feed_stdin(proc: subprocess.Popen, stdin: bytes) -> None:
+        try:
+            if stdin:
+                proc.stdin.write(stdin)
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            return
+
+
+class SpawnServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Skills Runtime spawner")
+    parser.add_argument("--socket", required=True)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    socket_path = Path(args.socket)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        socket_path.unlink()
+
+    # bind() creates the socket with the process umask; keep it private from
+    # the start instead of narrowing it afterwards.
+    umask = os.umask(0o177)
+    try:
+        server = SpawnServer(str(socket_path), SpawnHandler)
+    finally:
+        os.umask(umask)
+    print(f"Skills spawner listening on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import atexit
+import queue
+import subprocess
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .models import SkillSpec
+from .process import terminate_session
+
+Launched = Tuple[str, subprocess.Popen]
+
+
+class _SkillPool:
+    def __init__(self, skill: SkillSpec) -> None:
+        self.skill = skill
+        self.ready: Deque[Launched] = deque()
+        self.pending = 0
+
+
+class StandbyPool:
+    def __init__(
+        self,
+        launch: Callable[[SkillSpec], Launched],
+        release: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self._launch = launch
+        # Called with the execution id of every process that is thrown away
+        # without being acquired, so the launcher can drop its workdir.
+        self._release = release
+        self._pools: Dict[str, _SkillPool] = {}
+        self._lock = threading.Lock()
+        self._refills: "queue.Queue[SkillSpec]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def acquire(self, skill: SkillSpec) -> Optional[Launched]:
+        if skill.standby <= 0 or self._closed:
+            return None
+
+        acquired: Optional[Launched] = None
+        stale: List[Launched] = []
+        with self._lock:
+            pool = self._pools.get(skill.name)
+            if pool is None or pool.skill != skill:
+                if pool is not None:
+                    stale.extend(pool.ready)
+                pool = _SkillPool(skill)
+                self._pools[skill.name] = pool
+            while pool.ready:
+                launched = pool.ready.popleft()
+                if launched[1].poll() is None:
+                    acquired = launched
+                    break
+                stale.append(launched)
+
+        self._discard(stale)
+        self._schedule_refill(skill)
+        return acquired
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            self._discard(list(pool.ready))
+
+    def _schedule_refill(self, skill: SkillSpec) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._refill_loop,
+                    name="skill-standby-refill",
+                    daemon=True,
+                )
+                self._thread.start()
+        self._refills.put(skill)
+
+    def _refill_loop(self) -> None:
+        while not self._closed:
+            skill = self._refills.get()
+            while not self._closed:
+                with self._lock:
+                    pool = self._pools.get(skill.name)
+                    if pool is None or pool.skill != skill:
+                        break
+                    if len(pool.ready) + pool.pending >= skill.standby:
+                        break
+                    pool.pending += 1
+                try:
+                    launched: Optional[Launched] = self._launch(skill)
+                except Exception:  # noqa: BLE001
+                    launched = None
+                with self._lock:
+                    pool.pending -= 1
+                    keep = (
+                        launched is not None
+                        and not self._closed
+                        and self._pools.get(skill.name) is pool
+                    )
+                    if keep:
+                        pool.ready.append(launched)
+                if not keep:
+                    if launched is not None:
+                        self._discard([launched])
+                    break
+
+    def _discard(self, launched: List[Launched]) -> None:
+        for execution_id, proc in launched:
+            terminate_session(proc.pid, 0, proc.poll)
+            try:
+                proc.communicate(timeout=1)
+            except (subprocess.TimeoutExpired, OSError, ValueError):
+                pass
+            if self._release is not None:
+                self._release(execution_id)
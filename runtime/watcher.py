@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .registry import SkillRegistry
+
+# Only files that can change what a skill is or how it launches trigger a
+# reload; outputs and caches written next to the sources do not. That
+# includes a skill's declared artifacts: legacy skills still write them into
+# their own directory, once per execution.
+WATCHED_SUFFIXES = {
+    ".yaml",
+    ".json",
+    ".py",
+    ".sh",
+    ".js",
+    ".mjs",
+    ".cjs",
+    ".ts",
+    ".tsx",
+    ".mts",
+    ".cts",
+}
+SKIP_DIRS = {"__pycache__", "node_modules", "artifacts"}
+DEBOUNCE_SECONDS = 0.2
+MAX_DELAY_SECONDS = 2.0
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (
+    _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    def __init__(self, libc: ctypes.CDLL, fd: int) -> None:
+        self._libc = libc
+        self.fd = fd
+
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def add(self, path: Path) -> Optional[int]:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        return wd if wd >= 0 else None
+
+    def read(self, timeout: float) -> List[Tuple[int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: List[Tuple[int, int, str]] = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class SkillsWatcher:
+    # Keeps a SkillRegistry in sync with SKILLS_DIR: inotify where the
+    # kernel offers it, mtime polling otherwise. Changes are debounced and
+    # only the affected skill directories are reloaded.
+
+    def __init__(
+        self,
+        registry: SkillRegistry,
+        poll_interval_seconds: float = 2.0,
+        use_inotify: bool = True,
+    ) -> None:
+        self.registry = registry
+        self.poll_interval_seconds = poll_interval_seconds
+        self.use_inotify = use_inotify
+        self.mode: Optional[str] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="skills-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        inotify = _Inotify.create() if self.use_inotify else None
+        if inotify is not None:
+            try:
+                self.mode = "inotify"
+                if self._watch(inotify):
+                    return
+            finally:
+                inotify.close()
+        self.mode = "poll"
+        self._poll()
+
+    def _watch(self, inotify: _Inotify) -> bool:
+        # Returns False when SKILLS_DIR itself cannot be watched (missing,
+        # moved away), so the caller falls back to polling.
+        root = self.registry.skills_dir
+        root_wd = inotify.add(root)
+        if root_wd is None:
+            return False
+        # wd -> (skill directory name, watched path); None marks SKILLS_DIR.
+        watches: Dict[int, Tuple[Optional[str], Path]] = {root_wd: (None, root)}
+
+        def add_tree(skill: str, path: Path) -> None:
+            for dirpath, dirnames, _ in os.walk(path):
+                dirnames[:] = [name for name in dirnames if _watched_dir(name)]
+                wd = inotify.add(Path(dirpath))
+                if wd is not None:
+                    watches[wd] = (skill, Path(dirpath))
+
+        for entry in root.iterdir():
+            if entry.is_dir() and _watched_dir(entry.name):
+                add_tree(entry.name, entry)
+
+        dirty: Set[str] = set()
+        rescan = False
+        first_change = 0.0
+        while not self._stop.is_set():
+            events = inotify.read(DEBOUNCE_SECONDS if dirty or rescan else 1.0)
+            for wd, mask, name in events:
+                if mask & _IN_Q_OVERFLOW:
+                    rescan = True
+                    continue
+                owner = watches.get(wd)
+                if mask & _IN_IGNORED:
+                    watches.pop(wd, None)
+                if owner is None:
+                    continue
+                skill, path = owner
+                if skill is None:
+                    if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                        self.registry.scan()
+                        return False
+                    if not (mask & _IN_ISDIR) or not _watched_dir(name):
+                        continue
+                    dirty.add(name)
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        add_tree(name, root / name)
+                    continue
+                if mask & _IN_ISDIR:
+                    if not name or not _watched_dir(name):
+                        continue
+                    dirty.add(skill)
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        add_tree(skill, path / name)
+                elif os.path.splitext(name)[1] in WATCHED_SUFFIXES:
+                    rel_path = os.path.relpath(path / name, root / skill)
+                    if not self._is_artifact(skill, rel_path):
+                        dirty.add(skill)
+            if (dirty or rescan) and not first_change:
+                first_change = time.monotonic()
+            quiet = not events
+            overdue = first_change and time.monotonic() - first_change >= MAX_DELAY_SECONDS
+            if (dirty or rescan) and (quiet or overdue):
+                self._apply(dirty, rescan)
+                dirty = set()
+                rescan = False
+                first_change = 0.0
+        return True
+
+    def _poll(self) -> None:
+        root = self.registry.skills_dir
+        previous = _snapshot(root, self._is_artifact)
+        while not self._stop.wait(self.poll_interval_seconds):
+            current = _snapshot(root, self._is_artifact)
+            dirty = {
+                name
+                for name in previous.keys() | current.keys()
+                if previous.get(name) != current.get(name)
+            }
+            if dirty:
+                self._apply(dirty, rescan=False)
+            previous = current
+
+    def _is_artifact(self, dir_name: str, rel_path: str) -> bool:
+        skill = self.registry.get_by_dir(dir_name)
+        if skill is None:
+            return False
+        rel_path = rel_path.replace(os.sep, "/")
+        return any(fnmatch.fnmatchcase(rel_path, pattern) for pattern in skill.artifacts)
+
+    def _apply(self, dirty: Set[str], rescan: bool) -> None:
+        try:
+            if rescan:
+                self.registry.scan()
+            else:
+                self.registry.reload(dirty)
+        except OSError:
+            pass
+
+
+def _watched_dir(name: str) -> bool:
+    return bool(name) and name not in SKIP_DIRS and not name.startswith(".")
+
+
+def _snapshot(
+    root: Path,
+    ignore: Callable[[str, str], bool],
+) -> Dict[str, Tuple[Tuple[str, int, int], ...]]:
+    snapshot: Dict[str, Tuple[Tuple[str, int, int], ...]] = {}
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return snapshot
+    for entry in entries:
+        if entry.is_dir() and _watched_dir(entry.name):
+            snapshot[entry.name] = _signature(
+                entry.path, lambda rel_path, name=entry.name: ignore(name, rel_path)
+            )
+    return snapshot
+
+
+def _signature(
+    path: str,
+    ignore: Callable[[str], bool],
+) -> Tuple[Tuple[str, int, int], ...]:
+    files: List[Tuple[str, int, int]] = []
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = [name for name in dirnames if _watched_dir(name)]
+        for filename in filenames:
+            if os.path.splitext(filename)[1] not in WATCHED_SUFFIXES:
+                continue
+            full = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(full, path)
+            if ignore(rel_path):
+                continue
+            try:
+                stat = os.stat(full)
+            except OSError:
+                continue
+            files.append((rel_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(files))
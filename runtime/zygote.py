@@ -0,0 +1,317 @@
+from __future__ import annotations
+
+import argparse
+import atexit
+import importlib.util
+import json
+import os
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .capture import OutputCapture
+from .launch import allowed_env
+from .models import SkillSpec
+from .process import cleanup_session, terminate_session
+
+READ_CHUNK = 65536
+START_TIMEOUT_SECONDS = 10
+ABNORMAL_EXIT_CODE = -1
+
+
+def _exit_code(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value
+    print(value, file=sys.stderr)
+    return 1
+
+
+def _run_child(conn: socket.socket, fds: List[int], request: Dict[str, Any], module: Any) -> None:
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.setsid()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.environ.clear()
+    os.environ.update(request.get("env") or {})
+    sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+    sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    sys.stderr = open(2, "w", encoding="utf-8", closefd=False)
+    conn.sendall(json.dumps({"pid": os.getpid()}).encode("utf-8") + b"\n")
+
+    code = 0
+    try:
+        module.main()
+    except SystemExit as exc:
+        code = _exit_code(exc.code)
+    except BaseException:  # noqa: BLE001
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        conn.sendall(json.dumps({"exitCode": code}).encode("utf-8") + b"\n")
+    finally:
+        os._exit(code)
+
+
+def serve(entrypoint: Path, socket_path: Path) -> None:
+    sys.path.insert(0, str(entrypoint.parent))
+    sys.argv = [str(entrypoint)]
+    spec = importlib.util.spec_from_file_location("skill_entrypoint", entrypoint)
+    if spec is None or spec.loader is None:
+        raise SystemExit(f"Cannot import {entrypoint}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "main", None)):
+        raise SystemExit(f"{entrypoint} does not define main()")
+
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(64)
+    print("ready", flush=True)
+
+    with selectors.DefaultSelector() as selector:
+        selector.register(server, selectors.EVENT_READ)
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        while True:
+            for key, _ in selector.select():
+                if key.fileobj is not server:
+                    if not os.read(key.fd, READ_CHUNK):
+                        return
+                    continue
+                conn, _ = server.accept()
+                try:
+                    raw, fds, _, _ = socket.recv_fds(conn, READ_CHUNK, 3)
+                    request = json.loads(raw.decode("utf-8"))
+                except (OSError, ValueError):
+                    conn.close()
+                    continue
+                if len(fds) != 3:
+                    for fd in fds:
+                        os.close(fd)
+                    conn.close()
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    selector.close()
+                    server.close()
+                    _run_child(conn, fds, request, module)
+                for fd in fds:
+                    os.close(fd)
+                conn.close()
+
+
+class _Zygote:
+    def __init__(self, skill: SkillSpec, socket_path: Path) -> None:
+        self.skill = skill
+        self.socket_path = socket_path
+        self.proc = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "runtime.zygote",
+                "--entrypoint",
+                str(skill.entrypoint),
+                "--socket",
+                str(socket_path),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=str(skill.path),
+            # The module is imported here, so it gets the same trimmed
+            # environment as a regular execution.
+            env={**_base_env(skill), "PYTHONPATH": _pythonpath()},
+        )
+        if self._wait_ready(START_TIMEOUT_SECONDS) != b"ready":
+            self.close()
+            raise RuntimeError(f"Zygote for '{skill.name}' failed to start")
+
+    def _wait_ready(self, timeout_seconds: float) -> bytes:
+        # The module import runs before "ready"; a skill that hangs there
+        # must not hold up the caller forever.
+        deadline = time.monotonic() + timeout_seconds
+        fd = self.proc.stdout.fileno()
+        line = b""
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while b"\n" not in line:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return b""
+                chunk = os.read(fd, READ_CHUNK)
+                if not chunk:
+                    break
+                line += chunk
+        return line.split(b"\n", 1)[0].strip()
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def close(self) -> None:
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+class ZygoteManager:
+    def __init__(self) -> None:
+        self._zygotes: Dict[str, _Zygote] = {}
+        self._lock = threading.Lock()
+        # One lock per skill: starting a zygote imports the skill module,
+        # which must not block executions of other skills.
+        self._skill_locks: Dict[str, threading.Lock] = {}
+        self._socket_dir: Optional[Path] = None
+        atexit.register(self.close)
+
+    def run(
+        self,
+        skill: SkillSpec,
+        env: Dict[str, str],
+        stdin: bytes,
+        timeout_seconds: float,
+        kill_grace_seconds: float,
+        capture: OutputCapture,
+    ) -> Tuple[Optional[int], bool, int]:
+        zygote = self._get(skill)
+        pipes = [os.pipe(), os.pipe(), os.pipe()]
+        child_fds = [pipes[0][0], pipes[1][1], pipes[2][1]]
+        stdin_fd, stdout_fd, stderr_fd = pipes[0][1], pipes[1][0], pipes[2][0]
+
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(str(zygote.socket_path))
+            socket.send_fds(conn, [json.dumps({"env": env}).encode("utf-8")], child_fds)
+        except OSError:
+            conn.close()
+            for fd in child_fds + [stdin_fd, stdout_fd, stderr_fd]:
+                os.close(fd)
+            raise
+        for fd in child_fds:
+            os.close(fd)
+
+        conn.settimeout(START_TIMEOUT_SECONDS)
+        reader = conn.makefile("rb")
+        try:
+            hello = reader.readline()
+            pid = json.loads(hello)["pid"] if hello else None
+            threading.Thread(target=_feed, args=(stdin_fd, stdin), daemon=True).start()
+            timed_out = _drain(stdout_fd, stderr_fd, timeout_seconds, capture)
+            if pid is None:
+                return ABNORMAL_EXIT_CODE, timed_out, 0
+            if timed_out or capture.stdout_exceeded:
+                return None, timed_out, terminate_session(pid, kill_grace_seconds)
+            status = reader.readline()
+            exit_code = json.loads(status)["exitCode"] if status else ABNORMAL_EXIT_CODE
+            leaked = cleanup_session(pid, kill_grace_seconds)
+        finally:
+            reader.close()
+            conn.close()
+        return exit_code, False, leaked
+
+    def close(self) -> None:
+        with self._lock:
+            zygotes = list(self._zygotes.values())
+            self._zygotes.clear()
+        for zygote in zygotes:
+            zygote.close()
+
+    def _get(self, skill: SkillSpec) -> _Zygote:
+        with self._lock:
+            skill_lock = self._skill_locks.setdefault(skill.name, threading.Lock())
+            if self._socket_dir is None:
+                self._socket_dir = Path(tempfile.mkdtemp(prefix="skills-zygote-"))
+            socket_path = self._socket_dir / f"{skill.name}.sock"
+        with skill_lock:
+            with self._lock:
+                zygote = self._zygotes.get(skill.name)
+            if zygote is not None and zygote.skill == skill and zygote.alive():
+                return zygote
+            if zygote is not None:
+                zygote.close()
+            zygote = _Zygote(skill, socket_path)
+            with self._lock:
+                self._zygotes[skill.name] = zygote
+            return zygote
+
+
+def _base_env(skill: SkillSpec) -> Dict[str, str]:
+    return dict(skill.launch.env) if skill.launch is not None else allowed_env()
+
+
+def _pythonpath() -> str:
+    root = str(Path(__file__).resolve().parent.parent)
+    current = os.environ.get("PYTHONPATH")
+    return os.pathsep.join([root, current]) if current else root
+
+
+def _feed(fd: int, data: bytes) -> None:
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _drain(
+    stdout_fd: int,
+    stderr_fd: int,
+    timeout_seconds: float,
+    capture: OutputCapture,
+) -> bool:
+    deadline = time.monotonic() + timeout_seconds
+    timed_out = False
+    stop = False
+    with selectors.DefaultSelector() as selector:
+        selector.register(stdout_fd, selectors.EVENT_READ)
+        selector.register(stderr_fd, selectors.EVENT_READ)
+        while selector.get_map() and not stop:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, READ_CHUNK)
+                if not chunk:
+                    selector.unregister(key.fd)
+                elif key.fd == stderr_fd:
+                    capture.feed_stderr(chunk)
+                elif not capture.feed_stdout(chunk):
+                    stop = True
+                    break
+    os.close(stdout_fd)
+    os.close(stderr_fd)
+    return timed_out
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Skills Runtime python zygote")
+    parser.add_argument("--entrypoint", required=True)
+    parser.add_argument("--socket", required=True)
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    serve(Path(args.entrypoint), Path(args.socket))
+
+
+if __name__ == "__main__":
+    main()
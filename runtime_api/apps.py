@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+def _configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # WAL lets job workers write while API workers keep reading.
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
 
 
 class RuntimeApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "runtime_api"
+
+    def ready(self):
+        connection_created.connect(_configure_sqlite)
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+STALE_HEARTBEAT_SECONDS = 60
+MAX_ATTEMPTS = 3
+
+# (job id, new status, result payload) as reported by a job worker.
+Completion = Tuple[str, str, Optional[Dict[str, Any]]]
+
+
+def job_payload(job: Job) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "jobId": job.id,
+        "skillName": job.skill_name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "createdAt": job.created_at.isoformat() if job.created_at else None,
+        "startedAt": job.started_at.isoformat() if job.started_at else None,
+        "finishedAt": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.result:
+        payload["result"] = job.result
+    return payload
+
+
+def claim(worker: str, limit: int) -> List[Job]:
+    # The conditional UPDATE is atomic under SQLite's write lock, so two
+    # workers selecting the same ids cannot both claim them.
+    ids = list(
+        Job.objects.filter(status=Job.QUEUED)
+        .order_by("created_at")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    now = timezone.now()
+    Job.objects.filter(id__in=ids, status=Job.QUEUED).update(
+        status=Job.RUNNING,
+        worker=worker,
+        started_at=now,
+        heartbeat_at=now,
+        attempts=F("attempts") + 1,
+    )
+    return list(
+        Job.objects.filter(id__in=ids, status=Job.RUNNING, worker=worker).order_by("created_at")
+    )
+
+
+def heartbeat(worker: str, job_ids: Iterable[str]) -> None:
+    job_ids = list(job_ids)
+    if job_ids:
+        Job.objects.filter(id__in=job_ids, worker=worker, status=Job.RUNNING).update(
+            heartbeat_at=timezone.now()
+        )
+
+
+def finish(worker: str, completions: List[Completion]) -> None:
+    if not completions:
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        for job_id, status, result in completions:
+            running = Job.objects.filter(id=job_id, worker=worker, status=Job.RUNNING)
+            if status == Job.QUEUED:
+                # Put back without spending an attempt (e.g. admission was full).
+                running.update(
+                    status=Job.QUEUED,
+                    worker="",
+                    started_at=None,
+                    heartbeat_at=None,
+                    attempts=F("attempts") - 1,
+                )
+            else:
+                running.update(status=status, result=result, finished_at=now)
+
+
+def requeue_stale() -> int:
+    # Jobs whose worker stopped sending heartbeats (crash, restart, SIGKILL)
+    # go back to the queue until they run out of attempts.
+    cutoff = timezone.now() - timedelta(seconds=STALE_HEARTBEAT_SECONDS)
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff)
+    exhausted = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=Job.FAILED,
+        result={"success": False, "error": "Job worker was lost too many times"},
+        finished_at=timezone.now(),
+    )
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(
+        status=Job.QUEUED,
+        worker="",
+        started_at=None,
+        heartbeat_at=None,
+    )
+    return exhausted + requeued
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from runtime_api.services import build_executor
+
+
+class Command(BaseCommand):
+    help = "Apply the artifact retention policy once and report what was reclaimed."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild-index",
+            action="store_true",
+            help="Index execution directories created before the index existed.",
+        )
+
+    def handle(self, *args, **options):
+        executor = build_executor()
+        if options["rebuild_index"]:
+            added = executor.gc.rebuild()
+            self.stdout.write(f"Indexed {added} existing execution(s)")
+        run = executor.gc.collect()
+        if run.get("skipped"):
+            self.stdout.write("Another GC is running; nothing done")
+            return
+        self.stdout.write(json.dumps(run))
@@ -0,0 +1,85 @@
+import os
+import signal
+import socket
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from runtime.admission import AdmissionRejected
+from runtime_api import jobs
+from runtime_api.models import Job
+from runtime.payload import result_payload
+from runtime_api.views import executor, registry
+
+HEARTBEAT_INTERVAL_SECONDS = 10
+REQUEUE_INTERVAL_SECONDS = 30
+
+
+def _run_job(job: Job) -> jobs.Completion:
+    skill = registry.get(job.skill_name)
+    if skill is None:
+        return job.id, Job.FAILED, {"success": False, "error": "Skill not found"}
+    try:
+        result = executor.execute(skill, input_data=job.input, timeout_ms=job.timeout_ms)
+    except AdmissionRejected:
+        return job.id, Job.QUEUED, None
+    except Exception as exc:  # noqa: BLE001
+        return job.id, Job.FAILED, {"success": False, "error": str(exc)}
+    status = Job.SUCCEEDED if result.success else Job.FAILED
+    return job.id, status, result_payload(result)
+
+
+class Command(BaseCommand):
+    help = "Run a job worker that drains the queued skill executions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+        parser.add_argument("--poll-interval-ms", type=int, default=500)
+
+    def handle(self, *args, **options):
+        concurrency = max(1, options["concurrency"])
+        poll_seconds = options["poll_interval_ms"] / 1000
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(f"Job worker {worker} started (concurrency {concurrency})")
+        running: Dict[str, Future] = {}
+        last_heartbeat = last_requeue = 0.0
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while not stopping or running:
+                now = time.monotonic()
+                if now - last_requeue >= REQUEUE_INTERVAL_SECONDS:
+                    jobs.requeue_stale()
+                    last_requeue = now
+                if running and now - last_heartbeat >= HEARTBEAT_INTERVAL_SECONDS:
+                    jobs.heartbeat(worker, running)
+                    last_heartbeat = now
+
+                # Completed jobs are written back in one transaction per pass.
+                done: List[jobs.Completion] = []
+                for job_id, future in list(running.items()):
+                    if future.done():
+                        del running[job_id]
+                        done.append(future.result())
+                jobs.finish(worker, done)
+
+                claimed: List[Job] = []
+                if not stopping and len(running) < concurrency:
+                    claimed = jobs.claim(worker, concurrency - len(running))
+                    for job in claimed:
+                        running[job.id] = pool.submit(_run_job, job)
+                # Jobs handed back by admission control are retried after a pause.
+                requeued = any(status == Job.QUEUED for _, status, _ in done)
+                if requeued or not (claimed or done):
+                    time.sleep(poll_seconds)
+        self.stdout.write(f"Job worker {worker} stopped")
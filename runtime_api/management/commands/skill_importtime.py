@@ -0,0 +1,32 @@
+import json
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+
+from runtime.importtime import profile_startup
+from runtime_api.services import build_registry
+
+
+class Command(BaseCommand):
+    help = "Run a python skill once under -X importtime and report where its startup time goes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("skill")
+        parser.add_argument("--input", default="{}", help="JSON input passed on stdin.")
+        parser.add_argument("--top", type=int, default=15)
+
+    def handle(self, *args, **options):
+        skill = build_registry().get(options["skill"])
+        if skill is None:
+            raise CommandError(f"Skill not found: {options['skill']}")
+        try:
+            payload = json.loads(options["input"])
+        except json.JSONDecodeError as exc:
+            raise CommandError(f"--input must be JSON: {exc}") from exc
+        try:
+            report = profile_startup(skill, payload, skill.timeout_ms / 1000, options["top"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        except subprocess.TimeoutExpired as exc:
+            raise CommandError(f"Skill timed out after {exc.timeout}s") from exc
+        self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
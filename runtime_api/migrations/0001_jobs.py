@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:29
+
+import runtime_api.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.CharField(default=runtime_api.models._new_job_id, editable=False, max_length=32, primary_key=True, serialize=False)),
+                ('skill_name', models.CharField(max_length=200)),
+                ('input', models.JSONField(default=dict)),
+                ('timeout_ms', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='runtime_api_status_dc2f28_idx')],
+            },
+        ),
+    ]
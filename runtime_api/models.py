@@ -1,3 +1,37 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+def _new_job_id() -> str:
+    return f"job-{uuid.uuid4().hex[:12]}"
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+    FINISHED = (SUCCEEDED, FAILED)
+
+    id = models.CharField(primary_key=True, max_length=32, default=_new_job_id, editable=False)
+    skill_name = models.CharField(max_length=200)
+    input = models.JSONField(default=dict)
+    timeout_ms = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    result = models.JSONField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    attempts = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
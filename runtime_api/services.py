@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+
+from runtime.executor import SkillExecutor
+from runtime.limiter import AdaptiveLimiter
+from runtime.registry import SkillRegistry
+from runtime.retention import RetentionPolicy
+
+# Builds the runtime from settings without starting any background thread;
+# the views start GC and the watcher, one-shot commands do not.
+
+
+def build_registry() -> SkillRegistry:
+    return SkillRegistry(
+        Path(settings.SKILLS_DIR).resolve(),
+        env_allowlist=settings.SKILL_ENV_ALLOWLIST,
+        precompile=settings.SKILL_PRECOMPILE,
+        python_flags=settings.SKILL_PYTHON_FLAGS,
+        node_cache_dir=Path(settings.NODE_CACHE_DIR).resolve() if settings.NODE_CACHE_DIR else None,
+    )
+
+
+def build_executor() -> SkillExecutor:
+    artifacts_dir = Path(settings.ARTIFACTS_DIR).resolve()
+    artifacts_dir.mkdir(parents=True, exist_ok=True)
+    return SkillExecutor(
+        artifacts_dir,
+        default_timeout_ms=settings.DEFAULT_TIMEOUT_MS,
+        kill_grace_ms=settings.KILL_GRACE_MS,
+        cache_dir=Path(settings.RESULT_CACHE_DIR),
+        cache_max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+        compress_artifacts=settings.ARTIFACT_COMPRESS,
+        retention=RetentionPolicy(
+            max_age_seconds=settings.ARTIFACT_MAX_AGE_HOURS * 3600,
+            max_total_bytes=settings.ARTIFACT_MAX_TOTAL_MB * 1024 * 1024,
+            max_per_skill=settings.ARTIFACT_MAX_PER_SKILL,
+        ),
+        spawner_socket=Path(settings.SKILL_SPAWNER_SOCKET) if settings.SKILL_SPAWNER_SOCKET else None,
+        limiter=AdaptiveLimiter(
+            min_limit=settings.ADAPTIVE_LIMIT_MIN,
+            max_limit=settings.ADAPTIVE_LIMIT_MAX,
+            initial_limit=settings.ADAPTIVE_LIMIT_INITIAL,
+        )
+        if settings.ADAPTIVE_LIMIT
+        else None,
+    )
@@ -1,3 +1,1918 @@
-from django.test import TestCase
+import asyncio
+import dataclasses
+import gzip
+import hashlib
+import http.client
+import importlib.util
+import json
+import os
+import re
+import shutil
+import socketserver
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from http.server import ThreadingHTTPServer
+from importlib.util import cache_from_source
+from pathlib import Path
+from unittest import mock
+from urllib.parse import quote
 
-# Create your tests here.
+from django.conf import settings
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from runtime import nodecache
+from runtime.admission import AdmissionControl, AdmissionRejected
+from runtime.batch import parse_items, run_batch
+from runtime.blobs import BlobStore
+from runtime.cache import ResultCache
+from runtime.capture import OutputCapture
+from runtime.coalesce import Coalescer
+from runtime.downloads import (
+    ArtifactFile,
+    _parse_range,
+    content_disposition,
+    iter_content,
+    plan_download,
+)
+from runtime.executor import SkillExecutor
+from runtime.fanout import _concat, parse_map, run_map, run_map_async, split_input
+from runtime.launch import allowed_env, compile_launch, parse_python_flags, precompile
+from runtime.limiter import DECREASE_INTERVAL_SECONDS, MIN_SAMPLES, AdaptiveLimiter
+from runtime.models import ExecutionResult, LaunchPlan
+from runtime.pipeline import PipelineError, parse_pipeline, run_pipeline, run_pipeline_async
+from runtime.process import cleanup_session, session_members, start_time, terminate_session
+from runtime.registry import SkillRegistry
+from runtime.retention import ArtifactGC, ArtifactIndex, RetentionPolicy
+from runtime.server import RuntimeHandler
+from runtime.spawner import SpawnerUnavailable, SpawnHandler, SpawnServer
+from runtime.watcher import SkillsWatcher
+
+from . import jobs, views
+from .models import Job
+
+ECHO_SKILL = """import json, sys
+data = json.load(sys.stdin)
+print(json.dumps(data))
+"""
+
+
+class SkillsTestCase(SimpleTestCase):
+    # Temporary SKILLS_DIR/ARTIFACTS_DIR with a registry and an executor.
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.skills_dir = self.root / "skills"
+        self.skills_dir.mkdir()
+        self.artifacts_dir = self.root / "artifacts"
+
+    def add_skill(self, name, code=ECHO_SKILL, runtime=None, **fields):
+        skill_dir = self.skills_dir / name
+        skill_dir.mkdir()
+        config = {"name": name, "runtime": {"type": "python", **(runtime or {})}, **fields}
+        (skill_dir / "skill.yaml").write_text(json.dumps(config))
+        (skill_dir / "run.py").write_text(code)
+        return skill_dir
+
+    def make_registry(self):
+        return SkillRegistry(self.skills_dir)
+
+    def make_executor(self, **options):
+        executor = SkillExecutor(self.artifacts_dir, **options)
+        self.addCleanup(executor.zygotes.close)
+        self.addCleanup(executor.persistent.close)
+        self.addCleanup(executor.standby.close)
+        return executor
+
+    def serve(self, registry, executor):
+        # Standalone server on an ephemeral port; returns an HTTP connection.
+        handler = type(
+            "Handler",
+            (RuntimeHandler,),
+            {"registry": registry, "executor": executor, "log_message": lambda *args: None},
+        )
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=30)
+        self.addCleanup(connection.close)
+        return connection
+
+    def wait_for(self, condition, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                self.fail("condition not met in time")
+            time.sleep(0.02)
+
+
+# Writes its pid to input.pidfile, leaves a grandchild in its session and
+# then hangs until it is killed.
+HANG_SKILL = """import json, os, subprocess, sys, time
+data = json.load(sys.stdin)
+subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+with open(data["pidfile"], "w") as fh:
+    fh.write(str(os.getpid()))
+time.sleep(60)
+"""
+
+
+def _session_alive(sid):
+    return [pid for pid, _, state in session_members(sid) if state not in ("Z", "X")]
+
+
+# Writes stdout forever; with input.stderr it first writes that much to stderr.
+FLOOD_SKILL = """import json, sys
+data = json.load(sys.stdin)
+sys.stderr.write("x" * data.get("stderr", 0) + "tail")
+sys.stderr.flush()
+if data.get("flood"):
+    while True:
+        sys.stdout.write("y" * 4096)
+print(json.dumps({"ok": True}))
+"""
+
+
+class OutputCaptureTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("flood", FLOOD_SKILL)
+        self.skill = self.make_registry().get("flood")
+        self.executor = self.make_executor(
+            max_stdout_bytes=64 * 1024, max_stderr_bytes=1024, kill_grace_ms=100
+        )
+
+    def execute(self, input_data):
+        return self.executor.execute(self.skill, input_data, 10_000)
+
+    def execute_async(self, input_data):
+        return asyncio.run(self.executor.execute_async(self.skill, input_data, 10_000))
+
+    def test_stdout_limit_rejects_the_overflowing_chunk(self):
+        capture = OutputCapture(10, 10)
+        self.assertTrue(capture.feed_stdout(b"12345"))
+        self.assertFalse(capture.feed_stdout(b"123456"))
+        self.assertTrue(capture.stdout_exceeded)
+        self.assertEqual(bytes(capture.stdout), b"12345")
+
+    def test_stderr_keeps_the_tail(self):
+        capture = OutputCapture(10, 4)
+        capture.feed_stderr(b"abc")
+        capture.feed_stderr(b"defg")
+        self.assertTrue(capture.stderr_truncated)
+        self.assertEqual(capture.stderr_text(), "defg")
+
+    def test_truncated_stderr_starts_on_a_character_boundary(self):
+        capture = OutputCapture(10, 5)
+        capture.feed_stderr("ééé".encode("utf-8"))
+        self.assertEqual(capture.stderr_text(), "éé")
+
+    def test_flooding_skill_is_stopped_early(self):
+        for execute in (self.execute, self.execute_async):
+            with self.subTest(execute=execute.__name__):
+                started = time.monotonic()
+                result = execute({"flood": True})
+                self.assertFalse(result.success)
+                self.assertEqual(result.error, "stdout exceeded limit")
+                self.assertLess(time.monotonic() - started, 5)
+
+    def test_large_stderr_is_reduced_to_its_tail(self):
+        for execute in (self.execute, self.execute_async):
+            with self.subTest(execute=execute.__name__):
+                result = execute({"stderr": 100_000})
+                self.assertTrue(result.success, result.error)
+                self.assertEqual(len(result.stderr), 1024)
+                self.assertTrue(result.stderr.endswith("tail"))
+
+
+# Starts input.children sleepers in its own session (one of them in a
+# separate process group), prints their pids and then exits or hangs.
+SPAWNING_SKILL = """import json, os, subprocess, sys, time
+data = json.load(sys.stdin)
+code = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); time.sleep(60)"
+pids = [
+    subprocess.Popen(
+        [sys.executable, "-c", code],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        process_group=0 if n == 0 else None,
+    ).pid
+    for n in range(data["children"])
+]
+print(json.dumps({"pids": pids}), flush=True)
+if data.get("hang"):
+    time.sleep(60)
+"""
+
+
+class SessionCleanupTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.skill_dir = self.add_skill("spawning", SPAWNING_SKILL)
+        self.skill = self.make_registry().get("spawning")
+        self.executor = self.make_executor(kill_grace_ms=100)
+
+    def test_terminate_session_counts_and_kills_descendants(self):
+        proc = subprocess.Popen(
+            [sys.executable, str(self.skill_dir / "run.py")],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            start_new_session=True,
+        )
+        self.addCleanup(proc.stdout.close)
+        proc.stdin.write(json.dumps({"children": 2, "hang": True}).encode())
+        proc.stdin.close()
+        pids = json.loads(proc.stdout.readline())["pids"]
+
+        leaked = terminate_session(proc.pid, 0.1, proc.poll)
+        proc.wait()
+        self.assertEqual(leaked, 2)
+        self.assertEqual(_session_alive(proc.pid), [])
+        self.assertEqual([pid for pid in pids if start_time(pid) is not None], [])
+
+    def test_cleanup_session_is_free_when_nothing_is_left(self):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"], start_new_session=True)
+        proc.wait()
+        with mock.patch("runtime.process.session_members") as members:
+            self.assertEqual(cleanup_session(proc.pid, 0.1), 0)
+        members.assert_not_called()
+
+    def test_leftover_processes_are_reported_after_a_normal_exit(self):
+        result = self.executor.execute(self.skill, {"children": 2}, 10_000)
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.leaked_processes, 2)
+        self.assertEqual([pid for pid in result.output["pids"] if start_time(pid) is not None], [])
+
+    def test_timed_out_session_is_killed(self):
+        result = self.executor.execute(self.skill, {"children": 1, "hang": True}, 500)
+        self.assertFalse(result.success)
+        self.assertEqual(result.leaked_processes, 1)
+
+
+RANDOM_SKILL = """import json, sys, uuid
+data = json.load(sys.stdin)
+if data.get("fail"):
+    sys.exit(1)
+print(json.dumps({"run": uuid.uuid4().hex, "echo": data}))
+"""
+
+
+class ResultCacheTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ResultCache(self.root / "cache")
+
+    def test_key_is_canonical_and_tracks_the_skill_source(self):
+        skill_dir = self.add_skill("keyed", artifacts=["out.txt"])
+        skill = self.make_registry().get("keyed")
+        key = self.cache.key(skill, {"a": 1, "b": [1, 2]})
+        self.assertEqual(key, self.cache.key(skill, {"b": [1, 2], "a": 1}))
+        self.assertNotEqual(key, self.cache.key(skill, {"a": 2, "b": [1, 2]}))
+        self.assertEqual(
+            self.cache.key(skill, {"a": 1, "b": 1}, ["a"]),
+            self.cache.key(skill, {"a": 1, "b": 2}, ["a"]),
+        )
+
+        # Declared artifacts do not count as source; run.py does.
+        (skill_dir / "out.txt").write_text("generated")
+        self.assertEqual(key, self.cache.key(skill, {"a": 1, "b": [1, 2]}))
+        (skill_dir / "run.py").write_text(ECHO_SKILL + "# changed\n")
+        self.assertNotEqual(key, self.cache.key(skill, {"a": 1, "b": [1, 2]}))
+
+    def test_entries_expire(self):
+        result = ExecutionResult(success=True, execution_id="e1", output={"v": 1})
+        self.cache.put("ab" * 32, result, 50)
+        self.assertEqual(self.cache.get("ab" * 32).output, {"v": 1})
+        self.assertTrue(ResultCache(self.cache.root).get("ab" * 32).cached)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("ab" * 32))
+        self.assertEqual(list(self.cache.root.glob("*/*.json")), [])
+
+    def test_disk_usage_is_bounded(self):
+        cache = ResultCache(self.root / "small", max_bytes=1000, memory_entries=1)
+        result = ExecutionResult(success=True, execution_id="e", output={"pad": "x" * 200})
+        for n in range(10):
+            cache.put(f"{n:02d}" + "0" * 62, result, 60_000)
+        remaining = list(cache.root.glob("*/*.json"))
+        self.assertLessEqual(sum(path.stat().st_size for path in remaining), 1000)
+        self.assertIn(cache.root / "09" / ("09" + "0" * 62 + ".json"), remaining)
+
+    def test_executor_serves_repeated_calls_from_the_cache(self):
+        self.add_skill("random", RANDOM_SKILL, cache={"ttl": 60_000, "key": ["x"]})
+        skill = self.make_registry().get("random")
+        executor = self.make_executor()
+
+        first = executor.execute(skill, {"x": 1, "noise": 1})
+        second = executor.execute(skill, {"x": 1, "noise": 2})
+        third = asyncio.run(executor.execute_async(skill, {"x": 2}))
+        self.assertFalse(first.cached)
+        self.assertTrue(second.cached)
+        self.assertEqual(second.output, first.output)
+        self.assertEqual(second.execution_id, first.execution_id)
+        self.assertFalse(third.cached)
+
+    def test_failures_are_not_cached(self):
+        self.add_skill("random", RANDOM_SKILL, cache={"ttl": 60_000})
+        skill = self.make_registry().get("random")
+        executor = self.make_executor()
+        self.assertFalse(executor.execute(skill, {"fail": True}).success)
+        self.assertFalse(executor.execute(skill, {"fail": True}).cached)
+
+
+# Appends a line to input.log for every real run, then waits for input.gate.
+GATED_SKILL = """import json, os, sys, time
+data = json.load(sys.stdin)
+with open(data["log"], "a") as fh:
+    fh.write("run\\n")
+while not os.path.exists(data["gate"]):
+    time.sleep(0.01)
+print(json.dumps({"pid": os.getpid()}))
+"""
+
+
+class CoalesceTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("gated", GATED_SKILL, coalesce=True)
+        self.skill = self.make_registry().get("gated")
+        self.executor = self.make_executor()
+        self.log = self.root / "runs.log"
+        self.gate = self.root / "gate"
+        self.input = {"log": str(self.log), "gate": str(self.gate)}
+
+    def runs(self):
+        return self.log.read_text().count("run") if self.log.exists() else 0
+
+    def test_identical_concurrent_calls_run_once(self):
+        results = []
+
+        def call():
+            results.append(self.executor.execute(self.skill, self.input))
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        self.wait_for(self.runs)
+        time.sleep(0.2)
+        self.gate.touch()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.runs(), 1)
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual(len({result.output["pid"] for result in results}), 1)
+        self.assertEqual(len({result.execution_id for result in results}), 4)
+        leaders = [result for result in results if not result.coalesced]
+        self.assertEqual(len(leaders), 1)
+        for result in results:
+            if result.coalesced:
+                alias = self.artifacts_dir / result.execution_id
+                self.assertEqual(os.readlink(alias), leaders[0].execution_id)
+
+    def test_later_calls_run_again(self):
+        self.gate.touch()
+        self.executor.execute(self.skill, self.input)
+        self.executor.execute(self.skill, self.input)
+        self.assertEqual(self.runs(), 2)
+
+    def test_leader_result_is_handed_across_processes(self):
+        leader, follower = Coalescer(self.root / "inflight"), Coalescer(self.root / "inflight")
+        fd, shared = leader.acquire("k")
+        self.assertIsNone(shared)
+        handed = []
+        thread = threading.Thread(target=lambda: handed.append(follower.acquire("k")))
+        thread.start()
+        time.sleep(0.1)
+        self.assertEqual(handed, [])
+        leader.publish("k", fd, ExecutionResult(success=True, execution_id="e1", output={"v": 1}))
+        thread.join(5)
+        self.assertEqual(handed[0][0], None)
+        self.assertEqual(handed[0][1].output, {"v": 1})
+
+    def test_released_lock_makes_the_next_caller_leader(self):
+        leader, follower = Coalescer(self.root / "inflight"), Coalescer(self.root / "inflight")
+        fd, _ = leader.acquire("k")
+        handed = []
+        thread = threading.Thread(target=lambda: handed.append(follower.acquire("k")))
+        thread.start()
+        time.sleep(0.1)
+        leader.release("k", fd)
+        thread.join(5)
+        next_fd, shared = handed[0]
+        self.assertIsNone(shared)
+        self.assertIsNotNone(next_fd)
+        follower.release("k", next_fd)
+
+
+class AdmissionTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admission = AdmissionControl(self.root / "admission")
+
+    def limited(self, queue=0, queue_timeout_ms=30_000):
+        self.add_skill(
+            "limited",
+            concurrency={"max": 1, "queue": queue, "queueTimeoutMs": queue_timeout_ms},
+        )
+        return self.make_registry().get("limited")
+
+    def state(self):
+        return json.loads((self.admission.root / "limited.json").read_text())
+
+    def test_excess_requests_are_rejected(self):
+        skill = self.limited()
+        ticket = self.admission.acquire(skill)
+        with self.assertRaises(AdmissionRejected) as caught:
+            self.admission.acquire(skill)
+        self.assertGreaterEqual(caught.exception.retry_after, 1)
+        self.admission.release(skill, ticket, 0.1)
+        self.admission.release(skill, self.admission.acquire(skill), 0.1)
+
+    def test_queued_request_is_admitted_on_release(self):
+        skill = self.limited(queue=1)
+        ticket = self.admission.acquire(skill)
+        admitted = []
+        thread = threading.Thread(target=lambda: admitted.append(self.admission.acquire(skill)))
+        thread.start()
+        self.wait_for(lambda: self.state()["queue"])
+        with self.assertRaises(AdmissionRejected):
+            self.admission.acquire(skill)
+        self.admission.release(skill, ticket, 0.1)
+        thread.join(5)
+        self.assertEqual([entry["ticket"] for entry in self.state()["running"]], admitted)
+
+    def test_queue_timeout(self):
+        skill = self.limited(queue=1, queue_timeout_ms=100)
+        self.admission.acquire(skill)
+        with self.assertRaisesRegex(AdmissionRejected, "Timed out"):
+            self.admission.acquire(skill)
+        self.assertEqual(self.state()["queue"], [])
+
+    def test_slots_of_dead_processes_are_reclaimed(self):
+        skill = self.limited()
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.kill)
+        self.admission.root.mkdir()
+        entry = {"ticket": "t", "pid": proc.pid, "start": start_time(proc.pid)}
+        (self.admission.root / "limited.json").write_text(
+            json.dumps({"running": [entry], "queue": []})
+        )
+        with self.assertRaises(AdmissionRejected):
+            self.admission.acquire(skill)
+        proc.kill()
+        proc.wait()
+        self.assertIsNotNone(self.admission.acquire(skill))
+
+    def test_cancelled_async_waiter_leaves_the_queue(self):
+        skill = self.limited(queue=1)
+        self.admission.acquire(skill)
+
+        async def scenario():
+            task = asyncio.ensure_future(self.admission.acquire_async(skill))
+            while not self.state()["queue"]:
+                await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        self.assertEqual(self.state()["queue"], [])
+
+    def test_rejection_is_a_429_with_retry_after(self):
+        skill = self.limited()
+        executor = self.make_executor()
+        executor.admission.acquire(skill)
+        connection = self.serve(self.make_registry(), executor)
+        connection.request("POST", "/api/skills/execute", json.dumps({"skillName": "limited"}))
+        response = connection.getresponse()
+        self.assertEqual(response.status, 429)
+        self.assertGreaterEqual(int(response.getheader("Retry-After")), 1)
+        self.assertIn("capacity", json.loads(response.read())["error"])
+
+
+class AdaptiveLimiterTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        # No PSI readings unless a test provides them.
+        patcher = mock.patch.dict("runtime.limiter.PRESSURE_FILES", {}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_requests_over_the_limit_are_shed(self):
+        limiter = AdaptiveLimiter(initial_limit=2)
+        limiter.acquire()
+        limiter.acquire()
+        with self.assertRaises(AdmissionRejected):
+            limiter.acquire()
+        snapshot = limiter.snapshot()
+        self.assertEqual((snapshot["limit"], snapshot["inFlight"], snapshot["shed"]), (2, 2, 1))
+
+    def test_limit_only_grows_while_in_use(self):
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=3)
+        for _ in range(6):
+            limiter.acquire()
+            limiter.release("skill", 0.01, False)
+        self.assertEqual(limiter.limit, 2.5)
+
+        for _ in range(4):
+            limiter.acquire()
+            limiter.acquire()
+            limiter.release("skill", 0.01, False)
+            limiter.release("skill", 0.01, False)
+        self.assertEqual(limiter.limit, 3)
+
+    def test_timeouts_back_off_at_most_once_per_interval(self):
+        limiter = AdaptiveLimiter(initial_limit=10, backoff=0.5, min_limit=2)
+        limiter.acquire()
+        limiter.release("skill", 1.0, True)
+        limiter.acquire()
+        limiter.release("skill", 1.0, True)
+        self.assertEqual(limiter.limit, 5)
+        limiter._decreased_at -= DECREASE_INTERVAL_SECONDS
+        for _ in range(2):
+            limiter.acquire()
+            limiter.release("skill", 1.0, True)
+            limiter._decreased_at -= DECREASE_INTERVAL_SECONDS
+        self.assertEqual(limiter.limit, 2)
+
+    def test_latency_regression_backs_off(self):
+        limiter = AdaptiveLimiter(initial_limit=10, max_limit=10, backoff=0.5)
+        for _ in range(MIN_SAMPLES):
+            limiter.acquire()
+            limiter.release("skill", 0.01, False)
+        self.assertEqual(limiter.limit, 10)
+        for _ in range(MIN_SAMPLES):
+            limiter.acquire()
+            limiter.release("skill", 0.5, False)
+        self.assertEqual(limiter.limit, 5)
+        stats = limiter.snapshot()["skills"]["skill"]
+        self.assertEqual(stats["p90Ms"], 500.0)
+        self.assertLess(stats["baselineMs"], 100.0)
+
+    def test_pressure_backs_off(self):
+        pressure = self.root / "cpu"
+        pressure.write_text("some avg10=95.00 avg60=50.00 avg300=10.00 total=1\n")
+        limiter = AdaptiveLimiter(initial_limit=10, backoff=0.5)
+        with mock.patch.dict("runtime.limiter.PRESSURE_FILES", {"cpu": str(pressure)}):
+            limiter.acquire()
+            limiter.release("skill", 0.01, False)
+            self.assertEqual(limiter.snapshot()["pressure"], {"cpu": 95.0})
+        self.assertEqual(limiter.limit, 5)
+
+    def test_executor_sheds_with_the_limiter(self):
+        self.add_skill("gated", GATED_SKILL)
+        skill = self.make_registry().get("gated")
+        gate = self.root / "gate"
+        data = {"log": str(self.root / "log"), "gate": str(gate)}
+        executor = self.make_executor(limiter=AdaptiveLimiter(initial_limit=1, max_limit=1))
+        thread = threading.Thread(target=executor.execute, args=(skill, data))
+        thread.start()
+        self.wait_for(lambda: executor.limiter.in_flight)
+        with self.assertRaises(AdmissionRejected):
+            executor.execute(skill, {})
+        gate.touch()
+        thread.join(10)
+        self.assertEqual(executor.stats()["adaptive"]["shed"], 1)
+
+
+class InterruptedRunTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("hang", HANG_SKILL)
+        self.skill = self.make_registry().get("hang")
+        self.executor = self.make_executor(kill_grace_ms=100)
+        self.pidfile = self.root / "pid"
+
+    def _pid(self):
+        text = self.pidfile.read_text() if self.pidfile.exists() else ""
+        return int(text) if text else 0
+
+    def test_cancelled_async_run_terminates_the_session(self):
+        async def scenario():
+            task = asyncio.ensure_future(
+                self.executor.execute_async(self.skill, {"pidfile": str(self.pidfile)}, 30_000)
+            )
+            while not self._pid():
+                await asyncio.sleep(0.02)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        pid = self._pid()
+        self.wait_for(lambda: not _session_alive(pid))
+
+    def test_interrupted_sync_run_terminates_the_session(self):
+        def interrupted_pump(proc, stdin, timeout_seconds, capture):
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+            self.wait_for(self._pid)
+            raise RuntimeError("interrupted")
+
+        with mock.patch("runtime.executor.pump", interrupted_pump):
+            with self.assertRaises(RuntimeError):
+                self.executor.execute(self.skill, {"pidfile": str(self.pidfile)}, 30_000)
+        self.assertEqual(_session_alive(self._pid()), [])
+
+
+# Persistent worker: reports its pid; with "started"/"gate" it announces the
+# request and blocks until the gate file exists.
+WORKER_SKILL = """import json, os, sys, time
+for line in sys.stdin:
+    request = json.loads(line)
+    data = request["input"]
+    if data.get("started"):
+        open(data["started"], "w").close()
+        while not os.path.exists(data["gate"]):
+            time.sleep(0.01)
+    reply = {"id": request["id"], "output": {"pid": os.getpid(), "echo": data}}
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+def _pid_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class PersistentWorkerTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("worker", WORKER_SKILL, {"mode": "persistent", "workers": 1})
+        self.skill = self.make_registry().get("worker")
+        self.executor = self.make_executor()
+
+    def test_worker_is_reused(self):
+        first = self.executor.execute(self.skill, {"n": 1})
+        second = self.executor.execute(self.skill, {"n": 2})
+        self.assertTrue(first.success)
+        self.assertEqual(second.output["echo"], {"n": 2})
+        self.assertEqual(first.output["pid"], second.output["pid"])
+
+    def test_worker_checked_in_after_reload_is_retired(self):
+        started, gate = self.root / "started", self.root / "gate"
+        results = []
+        busy = threading.Thread(
+            target=lambda: results.append(
+                self.executor.execute(self.skill, {"started": str(started), "gate": str(gate)})
+            )
+        )
+        busy.start()
+        self.wait_for(started.exists)
+
+        reloaded = dataclasses.replace(self.skill, generation=self.skill.generation + 1)
+        fresh = self.executor.execute(reloaded, {})
+        gate.touch()
+        busy.join()
+
+        old_pid = results[0].output["pid"]
+        self.assertNotEqual(old_pid, fresh.output["pid"])
+        self.wait_for(lambda: not _pid_running(old_pid))
+        self.assertEqual(self.executor.execute(reloaded, {}).output["pid"], fresh.output["pid"])
+
+
+# Legacy skill: writes its declared artifact into its own directory.
+LEGACY_SKILL = """import json, os
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_result.json"), "w") as fh:
+    json.dump({"ok": True}, fh)
+print(json.dumps({"ok": True}))
+"""
+
+
+class RegistryReloadTests(SkillsTestCase):
+    def test_reload_swaps_only_changed_skills(self):
+        self.add_skill("one")
+        self.add_skill("two")
+        registry = self.make_registry()
+        one, two = registry.get("one"), registry.get("two")
+        (self.skills_dir / "one" / "run.py").write_text(ECHO_SKILL + "\n")
+
+        self.assertEqual(registry.reload({"one"}), 1)
+        self.assertIsNot(registry.get("one"), one)
+        self.assertGreater(registry.get("one").generation, one.generation)
+        self.assertNotEqual(registry.get("one"), one)
+        self.assertIs(registry.get("two"), two)
+
+    def test_reload_drops_removed_and_reports_broken_skills(self):
+        self.add_skill("one")
+        self.add_skill("two")
+        registry = self.make_registry()
+        (self.skills_dir / "one" / "skill.yaml").unlink()
+        (self.skills_dir / "two" / "skill.yaml").write_text('{"runtime": {"type": "cobol"}}')
+
+        registry.reload({"one", "two"})
+        self.assertIsNone(registry.get("one"))
+        self.assertIsNone(registry.get("two"))
+        self.assertEqual(len(registry.get_errors()), 1)
+
+
+class WatcherTests(SkillsTestCase):
+    def _check_artifact_writes_do_not_reload(self, use_inotify):
+        self.add_skill("legacy", LEGACY_SKILL, artifacts=["last_result.json"])
+        registry = self.make_registry()
+        watcher = SkillsWatcher(registry, poll_interval_seconds=0.1, use_inotify=use_inotify)
+        self.addCleanup(watcher.stop)
+        watcher.start()
+        self.wait_for(lambda: watcher.mode is not None)
+        time.sleep(0.3)
+        generation = registry.generation
+
+        result = self.make_executor().execute(registry.get("legacy"), {})
+        self.assertTrue(result.success)
+        self.assertEqual(len(result.artifacts), 1)
+        time.sleep(0.8)
+        self.assertEqual(registry.generation, generation)
+
+        (self.skills_dir / "legacy" / "run.py").write_text(LEGACY_SKILL + "\n")
+        self.wait_for(lambda: registry.generation > generation)
+
+    def test_artifact_writes_do_not_reload_inotify(self):
+        self._check_artifact_writes_do_not_reload(use_inotify=True)
+
+    def test_artifact_writes_do_not_reload_polling(self):
+        self._check_artifact_writes_do_not_reload(use_inotify=False)
+
+
+class BatchTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.registry = self.make_registry()
+
+    def test_parse_items(self):
+        items = parse_items(
+            self.registry,
+            [
+                {"skillName": "echo", "input": {"n": 1}, "options": {"timeoutMs": 500}},
+                {"skillName": "missing"},
+                "not an object",
+            ],
+        )
+        self.assertEqual([item.index for item in items], [0, 1, 2])
+        self.assertEqual(items[0].skill, self.registry.get("echo"))
+        self.assertEqual((items[0].input_data, items[0].timeout_ms), ({"n": 1}, 500))
+        self.assertIsNone(items[1].skill)
+        self.assertIsNone(items[2].skill_name)
+
+    def test_parse_items_rejects_bad_shapes(self):
+        bad = [
+            {"skillName": "echo"},
+            [{"skillName": "echo", "options": "fast"}],
+            [{"skillName": "echo", "options": {"timeoutMs": "abc"}}],
+        ]
+        for raw in bad:
+            with self.assertRaises(ValueError):
+                parse_items(self.registry, raw)
+
+    def test_run_batch_reports_every_item(self):
+        items = parse_items(
+            self.registry,
+            [{"skillName": "echo", "input": {"n": n}} for n in range(3)]
+            + [{}, {"skillName": "nope"}],
+        )
+        payloads = sorted(run_batch(self.make_executor(), items, 2), key=lambda p: p["index"])
+        self.assertEqual([p["status"] for p in payloads], [200, 200, 200, 400, 404])
+        self.assertEqual([p["output"] for p in payloads[:3]], [{"n": 0}, {"n": 1}, {"n": 2}])
+
+
+class PipelineTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.add_skill("fails", "import sys\nsys.exit(3)\n")
+        self.registry = self.make_registry()
+
+    def parse(self, nodes):
+        return parse_pipeline(self.registry, nodes, 10)
+
+    def test_dependencies_come_from_refs_and_depends_on(self):
+        nodes = self.parse(
+            [
+                {"id": "a", "skillName": "echo"},
+                {"id": "b", "skillName": "echo", "input": {"x": [{"$ref": "a.items.0"}]}},
+                {"id": "c", "skillName": "echo", "dependsOn": ["a", "b"]},
+            ]
+        )
+        self.assertEqual([node.depends_on for node in nodes], [set(), {"a"}, {"a", "b"}])
+
+    def test_invalid_graphs_are_rejected(self):
+        cases = {
+            "non-empty": [],
+            "duplicate": [{"id": "a", "skillName": "echo"}, {"id": "a", "skillName": "echo"}],
+            "skill not found": [{"id": "a", "skillName": "missing"}],
+            "unknown node": [{"id": "a", "skillName": "echo", "dependsOn": ["z"]}],
+            "options must be an object": [{"id": "a", "skillName": "echo", "options": 1}],
+            "cycle through ['a', 'b']": [
+                {"id": "a", "skillName": "echo", "input": {"v": {"$ref": "b.v"}}},
+                {"id": "b", "skillName": "echo", "input": {"v": {"$ref": "a.v"}}},
+                {"id": "c", "skillName": "echo"},
+            ],
+            "At most 10": [{"id": str(n), "skillName": "echo"} for n in range(11)],
+        }
+        for message, nodes in cases.items():
+            with self.subTest(message):
+                with self.assertRaisesRegex(PipelineError, re.escape(message)):
+                    self.parse(nodes)
+
+    def test_outputs_flow_downstream_and_failures_skip_dependants(self):
+        nodes = self.parse(
+            [
+                {"id": "a", "skillName": "echo", "input": {"items": ["first", "second"]}},
+                {"id": "b", "skillName": "echo", "input": {"x": {"$ref": "a.items.1"}}},
+                {"id": "c", "skillName": "echo", "input": {"x": {"$ref": "a.missing"}}},
+                {"id": "d", "skillName": "fails"},
+                {"id": "e", "skillName": "echo", "dependsOn": ["d"]},
+                {"id": "f", "skillName": "echo", "dependsOn": ["e"]},
+            ]
+        )
+        executor = self.make_executor()
+        for run in (
+            lambda: run_pipeline(executor, nodes, 4),
+            lambda: asyncio.run(run_pipeline_async(executor, nodes, 4)),
+        ):
+            report = run()
+            statuses = {node_id: entry["status"] for node_id, entry in report["nodes"].items()}
+            self.assertFalse(report["success"])
+            self.assertEqual(
+                statuses,
+                {
+                    "a": "succeeded",
+                    "b": "succeeded",
+                    "c": "failed",
+                    "d": "failed",
+                    "e": "skipped",
+                    "f": "skipped",
+                },
+            )
+            self.assertEqual(report["nodes"]["b"]["output"], {"x": "second"})
+            self.assertIn("Unresolved reference a.missing", report["nodes"]["c"]["error"])
+
+
+ENV_SKILL = """import json, os
+print(json.dumps(dict(os.environ)))
+"""
+
+
+class LaunchPlanTests(SkillsTestCase):
+    def test_allowed_env_matches_exact_names_and_prefixes(self):
+        environ = {
+            "PATH": "/bin",
+            "LC_ALL": "C",
+            "DJANGO_SECRET_KEY": "secret",
+            "LCX": "no",
+            "MY_TOKEN": "t",
+        }
+        self.assertEqual(allowed_env(environ=environ), {"PATH": "/bin", "LC_ALL": "C"})
+        self.assertEqual(
+            allowed_env(["MY_*"], environ=environ),
+            {"PATH": "/bin", "LC_ALL": "C", "MY_TOKEN": "t"},
+        )
+
+    def test_compile_launch_resolves_the_interpreter_once(self):
+        self.add_skill("py")
+        self.add_skill("sh", runtime={"type": "shell"})
+        (self.skills_dir / "sh" / "run.sh").write_text("echo '{}'\n")
+        registry = self.make_registry()
+        py = compile_launch(registry.get("py"), {"PATH": os.environ["PATH"]})
+        self.assertEqual(py.argv, (sys.executable, str(registry.get("py").entrypoint)))
+        self.assertEqual(py.cwd, str(self.skills_dir / "py"))
+        sh = compile_launch(registry.get("sh"), {"PATH": os.environ["PATH"]})
+        self.assertTrue(os.path.isabs(sh.argv[0]))
+        self.assertEqual(sh.argv[1], str(registry.get("sh").entrypoint))
+
+    def test_skills_only_see_allowed_variables(self):
+        self.add_skill("env", ENV_SKILL)
+        secrets = {"DJANGO_SECRET_KEY": "secret", "EXTRA_VISIBLE": "yes", "LANG": "C.UTF-8"}
+        with mock.patch.dict(os.environ, secrets):
+            registry = SkillRegistry(self.skills_dir, env_allowlist=["EXTRA_*"])
+        result = self.make_executor().execute(registry.get("env"), {})
+        self.assertTrue(result.success, result.error)
+        env = result.output
+        self.assertNotIn("DJANGO_SECRET_KEY", env)
+        self.assertEqual((env["EXTRA_VISIBLE"], env["LANG"]), ("yes", "C.UTF-8"))
+        self.assertEqual(env["SKILL_EXECUTION_ID"], result.execution_id)
+        self.assertEqual(env["SKILL_NAME"], "env")
+
+
+BOOT_SKILL = """import json, sys
+data = json.load(sys.stdin)
+if data.get("fail"):
+    raise ValueError("broken input")
+print(json.dumps({"name": __name__, "file": __file__, "argv": sys.argv, "path0": sys.path[0]}))
+"""
+
+
+class PythonLaunchTests(SkillsTestCase):
+    def test_parse_python_flags(self):
+        self.assertEqual(
+            parse_python_flags(["-S", "-X", "frozen_modules=on", "-W", "ignore", "-OO"]),
+            ["-S", "-X", "frozen_modules=on", "-W", "ignore", "-OO"],
+        )
+        for flags in (["-c"], ["-mhttp.server"], ["-m", "x"], ["run.py"], ["-X"]):
+            with self.subTest(flags=flags):
+                with self.assertRaises(ValueError):
+                    parse_python_flags(flags)
+
+    def test_skill_flags_are_validated(self):
+        self.add_skill("bad", runtime={"pythonFlags": ["-c", "print(1)"]})
+        registry = self.make_registry()
+        self.assertIsNone(registry.get("bad"))
+        self.assertIn("unsupported python flag '-c'", registry.get_errors()[0])
+
+    def test_precompile_writes_bytecode_once(self):
+        skill_dir = self.add_skill("compiled")
+        (skill_dir / "helper.py").write_text("VALUE = 1\n")
+        skill = self.make_registry().get("compiled")
+        self.assertEqual(precompile(skill), 2)
+        self.assertEqual(precompile(skill), 0)
+        self.assertTrue(Path(cache_from_source(str(skill_dir / "helper.py"))).exists())
+
+        (skill_dir / "helper.py").write_text("VALUE = 22\n")
+        self.assertEqual(precompile(skill), 1)
+        self.assertEqual(precompile(skill, ["-O"]), 2)
+        self.assertTrue(Path(cache_from_source(str(skill_dir / "run.py"), optimization=1)).exists())
+
+    def test_bootstrapped_skill_behaves_like_a_script(self):
+        skill_dir = self.add_skill("boot", BOOT_SKILL)
+        registry = SkillRegistry(self.skills_dir, precompile=True, python_flags=["-S"])
+        skill = registry.get("boot")
+        self.assertEqual(skill.launch.argv[:2], (sys.executable, "-S"))
+        self.assertTrue(Path(cache_from_source(str(skill_dir / "run.py"))).exists())
+
+        executor = self.make_executor()
+        result = executor.execute(skill, {})
+        self.assertTrue(result.success, result.error)
+        entrypoint = str(skill_dir / "run.py")
+        self.assertEqual(
+            result.output,
+            {"name": "__main__", "file": entrypoint, "argv": [entrypoint], "path0": str(skill_dir)},
+        )
+
+        failed = executor.execute(skill, {"fail": True})
+        self.assertEqual(failed.exit_code, 1)
+        self.assertIn("ValueError: broken input", failed.stderr)
+        self.assertNotIn("pyboot", failed.stderr)
+
+
+NODE_SKILL = """const chunks = [];
+process.stdin.on("data", (chunk) => chunks.push(chunk));
+process.stdin.on("end", () => {
+  const data = JSON.parse(Buffer.concat(chunks).toString() || "{}");
+  console.log(JSON.stringify({ echo: data, cache: process.env.NODE_COMPILE_CACHE || null }));
+});
+"""
+
+# Stands in for esbuild: copies the entrypoint to --outfile, or fails when
+# the source contains "syntax error".
+FAKE_ESBUILD = """#!/bin/sh
+src="$1"
+for arg in "$@"; do
+  case "$arg" in --outfile=*) out="${arg#--outfile=}" ;; esac
+done
+if grep -q "syntax error" "$src"; then
+  echo "run.ts: syntax error" >&2
+  exit 1
+fi
+{ echo "// transpiled"; cat "$src"; } > "$out"
+"""
+
+
+@unittest.skipUnless(shutil.which("node"), "node is not installed")
+class NodeCacheTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_root = self.root / "node-cache"
+        self.node = shutil.which("node")
+
+    def add_node_skill(self, name, filename="run.js", code=NODE_SKILL, esbuild=False):
+        skill_dir = self.skills_dir / name
+        skill_dir.mkdir()
+        config = {"name": name, "runtime": {"type": "node"}}
+        (skill_dir / "skill.yaml").write_text(json.dumps(config))
+        (skill_dir / filename).write_text(code)
+        if esbuild:
+            bin_dir = skill_dir / "node_modules" / ".bin"
+            bin_dir.mkdir(parents=True)
+            (bin_dir / "esbuild").write_text(FAKE_ESBUILD)
+            (bin_dir / "esbuild").chmod(0o755)
+        return skill_dir
+
+    def registry(self):
+        return SkillRegistry(self.skills_dir, node_cache_dir=self.cache_root)
+
+    def test_source_digest_follows_sources_only(self):
+        skill_dir = self.add_node_skill("js")
+        digest = nodecache.source_digest(skill_dir, self.node)
+        (skill_dir / "notes.txt").write_text("ignored")
+        (skill_dir / "artifacts").mkdir()
+        (skill_dir / "artifacts" / "out.json").write_text("{}")
+        self.assertEqual(nodecache.source_digest(skill_dir, self.node), digest)
+        (skill_dir / "lib.js").write_text("module.exports = 1;\n")
+        self.assertNotEqual(nodecache.source_digest(skill_dir, self.node), digest)
+
+    def test_javascript_skill_gets_a_compile_cache_per_digest(self):
+        skill_dir = self.add_node_skill("js")
+        skill = self.registry().get("js")
+        self.assertEqual(skill.launch.argv, (self.node, str(skill_dir / "run.js")))
+        cache_dir = skill.launch.env["NODE_COMPILE_CACHE"]
+        self.assertTrue(os.path.isdir(cache_dir))
+
+        result = self.make_executor().execute(skill, {"n": 1})
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.output, {"echo": {"n": 1}, "cache": cache_dir})
+
+        (skill_dir / "run.js").write_text(NODE_SKILL + "\n")
+        changed = self.registry().get("js")
+        self.assertNotEqual(changed.launch.env["NODE_COMPILE_CACHE"], cache_dir)
+        self.assertFalse(os.path.exists(cache_dir))
+
+    def test_typescript_is_transpiled_once(self):
+        self.add_node_skill("ts", "run.ts", esbuild=True)
+        skill = self.registry().get("ts")
+        transpiled = Path(skill.launch.argv[1])
+        self.assertEqual(transpiled.name, "run.cjs")
+        self.assertTrue(transpiled.read_text().startswith("// transpiled"))
+        self.assertTrue(transpiled.is_relative_to(self.cache_root / "ts"))
+
+        result = self.make_executor().execute(skill, {"n": 2})
+        self.assertTrue(result.success, result.error)
+        self.assertEqual(result.output["echo"], {"n": 2})
+
+        mtime = transpiled.stat().st_mtime_ns
+        self.assertEqual(Path(self.registry().get("ts").launch.argv[1]), transpiled)
+        self.assertEqual(transpiled.stat().st_mtime_ns, mtime)
+
+    def test_transpile_failure_is_reported(self):
+        self.add_node_skill("ts", "run.ts", code="syntax error\n", esbuild=True)
+        skill = self.registry().get("ts")
+        if shutil.which("tsx") or shutil.which("ts-node"):
+            self.skipTest("a TypeScript runner is installed")
+        self.assertIn("TypeScript transpile failed: run.ts: syntax error", skill.launch.error)
+
+
+def _load_script_runner():
+    path = Path(settings.BASE_DIR) / "skills" / "_shared" / "script_runner.py"
+    spec = importlib.util.spec_from_file_location("script_runner", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ScriptRunnerTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.runner = _load_script_runner()
+
+    def _script(self, skill, filename, code):
+        scripts_dir = self.root / skill / "scripts"
+        scripts_dir.mkdir(parents=True, exist_ok=True)
+        (scripts_dir / filename).write_text(code)
+        return scripts_dir
+
+    def test_run_script_captures_output_and_restores_state(self):
+        scripts_dir = self._script(
+            "one",
+            "show.py",
+            "import os, sys\n"
+            "def main(argv):\n"
+            "    print(os.getcwd(), os.environ['RUNNER_TEST'], *argv)\n"
+            "    print('warn', file=sys.stderr)\n"
+            "    return 3\n",
+        )
+        cwd = os.getcwd()
+        result = self.runner.run_script(
+            scripts_dir, "show.py", ["a"], cwd=self.root, env={"RUNNER_TEST": "x"}
+        )
+        self.assertEqual(result["exit_code"], 3)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["stdout"], f"{self.root} x a")
+        self.assertEqual(result["stderr"], "warn")
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertNotIn("RUNNER_TEST", os.environ)
+
+    def test_system_exit_and_errors_become_exit_codes(self):
+        scripts_dir = self._script(
+            "one", "exits.py", "import sys\ndef main(argv):\n    sys.exit(argv[0])\n"
+        )
+        self._script("one", "broken.py", "def main(argv):\n    raise KeyError('x')\n")
+        self._script("one", "notes.txt", "")
+        exited = self.runner.run_script(scripts_dir, "exits.py", ["msg"], self.root)
+        self.assertEqual((exited["exit_code"], exited["stderr"]), (1, "msg"))
+        broken = self.runner.run_script(scripts_dir, "broken.py", [], self.root)
+        self.assertEqual(broken["exit_code"], 1)
+        self.assertIn("KeyError", broken["stderr"])
+        unloadable = self.runner.run_script(scripts_dir, "notes.txt", [], self.root)
+        self.assertEqual(unloadable["exit_code"], 1)
+        self.assertIn("cannot load", unloadable["stderr"])
+
+    def test_scripts_are_namespaced_per_skill(self):
+        first = self._script("one", "json.py", "def main(argv):\n    print('one')\n")
+        second = self._script("two", "json.py", "def main(argv):\n    print('two')\n")
+        self.assertEqual(self.runner.run_script(first, "json.py", [], self.root)["stdout"], "one")
+        self.assertEqual(self.runner.run_script(second, "json.py", [], self.root)["stdout"], "two")
+        self.assertIs(sys.modules["json"], json)
+
+    def test_concurrent_runs_do_not_see_each_others_environment(self):
+        scripts_dir = self._script(
+            "one",
+            "env.py",
+            "import os, time\n"
+            "def main(argv):\n"
+            "    time.sleep(0.05)\n"
+            "    print(os.environ['RUNNER_TEST'])\n",
+        )
+        results = {}
+
+        def run(value):
+            results[value] = self.runner.run_script(
+                scripts_dir, "env.py", [], self.root, env={"RUNNER_TEST": value}
+            )["stdout"]
+
+        threads = [threading.Thread(target=run, args=(str(n),)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {str(n): str(n) for n in range(4)})
+
+
+# Writes input.text to artifacts/out.txt.
+ARTIFACT_SKILL = """import json, os, sys
+data = json.load(sys.stdin)
+with open(os.path.join(os.environ["SKILL_ARTIFACTS_DIR"], "out.txt"), "w") as fh:
+    fh.write(data["text"])
+print(json.dumps({"ok": True}))
+"""
+
+
+# Writes several files into its workdir and one next to itself.
+WORKDIR_SKILL = """import json, os
+workdir = os.environ["SKILL_WORKDIR"]
+os.makedirs(os.path.join(workdir, "artifacts", "nested"), exist_ok=True)
+for name in ("artifacts/a.txt", "artifacts/b.txt", "artifacts/nested/c.txt", "notes.md"):
+    with open(os.path.join(workdir, name), "w") as fh:
+        fh.write(name)
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "legacy.txt"), "w") as fh:
+    fh.write("legacy")
+with open(os.path.join(workdir, "..", "escape.txt"), "w") as fh:
+    fh.write("outside")
+print(json.dumps({"ok": True}))
+"""
+
+
+class ExecutionArtifactsTests(SkillsTestCase):
+    def run_skill(self, artifacts):
+        skill_dir = self.add_skill("workdir", WORKDIR_SKILL, artifacts=artifacts)
+        result = self.make_executor().execute(self.make_registry().get("workdir"), {})
+        self.assertTrue(result.success, result.error)
+        return skill_dir, result
+
+    def test_declared_patterns_are_collected_from_the_workdir(self):
+        _, result = self.run_skill(["artifacts/*.txt", "artifacts/**/*.txt", "notes.md"])
+        exec_dir = f"artifacts/{result.execution_id}"
+        self.assertEqual(
+            result.artifacts,
+            [
+                f"{exec_dir}/artifacts/a.txt",
+                f"{exec_dir}/artifacts/b.txt",
+                f"{exec_dir}/artifacts/nested/c.txt",
+                f"{exec_dir}/notes.md",
+            ],
+        )
+        self.assertEqual(
+            (self.artifacts_dir / result.execution_id / "notes.md").read_text(), "notes.md"
+        )
+
+    def test_reserved_files_and_escaping_paths_are_ignored(self):
+        _, result = self.run_skill(["stdout.txt", "output.json", "../escape.txt", "../*.txt"])
+        self.assertEqual(result.artifacts, [])
+
+    def test_files_written_next_to_the_skill_are_adopted(self):
+        skill_dir, result = self.run_skill(["legacy.txt"])
+        self.assertEqual(result.artifacts, [f"artifacts/{result.execution_id}/legacy.txt"])
+        self.assertEqual(
+            (self.artifacts_dir / result.execution_id / "legacy.txt").read_text(), "legacy"
+        )
+        self.assertFalse((skill_dir / "legacy.txt").exists())
+
+
+class BlobStoreTests(SkillsTestCase):
+    def write(self, execution_id, text, name="out.txt"):
+        exec_dir = self.artifacts_dir / execution_id
+        exec_dir.mkdir(parents=True)
+        (exec_dir / name).write_text(text)
+        return exec_dir
+
+    def test_identical_artifacts_share_one_blob(self):
+        blobs = BlobStore(self.artifacts_dir / ".blobs")
+        first, second = self.write("exec-1", "same"), self.write("exec-2", "same")
+        a, b = blobs.ingest(first, "out.txt"), blobs.ingest(second, "out.txt")
+        self.assertEqual(a.digest, b.digest)
+        self.assertEqual(a.digest, hashlib.sha256(b"same").hexdigest())
+        self.assertEqual((a.size, a.encoding), (4, None))
+        blob = blobs.blob_path(a.digest)
+        self.assertTrue(os.path.samefile(first / "out.txt", blob))
+        self.assertTrue(os.path.samefile(second / "out.txt", blob))
+        self.assertEqual(stat.S_IMODE(blob.stat().st_mode), 0o444)
+        self.assertIsNone(blobs.ingest(first, "missing.txt"))
+
+    def test_compressed_artifacts_live_in_the_manifest(self):
+        blobs = BlobStore(self.artifacts_dir / ".blobs", compress=True)
+        exec_dir = self.write("exec-1", "payload " * 100)
+        item = blobs.ingest(exec_dir, "out.txt")
+        self.assertEqual(item.encoding, "gzip")
+        self.assertFalse((exec_dir / "out.txt").exists())
+        blob = blobs.blob_path(item.digest, "gzip")
+        self.assertEqual(gzip.decompress(blob.read_bytes()), b"payload " * 100)
+        self.assertTrue(blobs.has(item.digest))
+
+        blobs.write_manifest(exec_dir, [item])
+        self.assertEqual(blobs.read_manifest(exec_dir), {"out.txt": item})
+
+        # A later identical artifact reuses the gzip blob.
+        again = blobs.ingest(self.write("exec-2", "payload " * 100), "out.txt")
+        self.assertEqual((again.digest, again.encoding), (item.digest, "gzip"))
+
+    def test_compressed_execution_is_downloadable(self):
+        self.add_skill("writer", ARTIFACT_SKILL, artifacts=["artifacts/out.txt"])
+        registry = self.make_registry()
+        executor = self.make_executor(compress_artifacts=True)
+        result = executor.execute(registry.get("writer"), {"text": "hello " * 50})
+        self.assertTrue(result.success, result.error)
+        digest = hashlib.sha256(("hello " * 50).encode()).hexdigest()
+        self.assertEqual(result.artifact_details[0]["digest"], f"sha256:{digest}")
+        exec_dir = self.artifacts_dir / result.execution_id
+        self.assertFalse((exec_dir / "artifacts" / "out.txt").exists())
+
+        connection = self.serve(registry, executor)
+        url = f"/api/executions/{result.execution_id}/artifacts/artifacts/out.txt"
+        connection.request("GET", url)
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.read().decode(), "hello " * 50)
+
+
+class RetentionTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("writer", ARTIFACT_SKILL, artifacts=["artifacts/out.txt"])
+        self.skill = self.make_registry().get("writer")
+
+    def test_max_per_skill_removes_old_executions_and_their_blobs(self):
+        executor = self.make_executor(retention=RetentionPolicy(max_per_skill=1))
+        results = [executor.execute(self.skill, {"text": f"run {n}"}) for n in range(3)]
+        digests = [result.artifact_details[0]["digest"].split(":")[1] for result in results]
+        self.assertEqual(executor.stats()["artifacts"]["executions"], 3)
+
+        run = executor.gc.collect(now=time.time() + 3600)
+        self.assertEqual(run["removedExecutions"], 2)
+        self.assertEqual(run["removedBlobs"], 2)
+        self.assertFalse((self.artifacts_dir / results[0].execution_id).exists())
+        self.assertTrue((self.artifacts_dir / results[2].execution_id).is_dir())
+        self.assertFalse(executor.blobs.has(digests[0]))
+        self.assertTrue(executor.blobs.has(digests[2]))
+        stats = executor.stats()["artifacts"]
+        self.assertEqual((stats["executions"], stats["gc"]["runs"]), (1, 1))
+
+    def test_shared_blobs_survive_while_referenced(self):
+        executor = self.make_executor(retention=RetentionPolicy(max_per_skill=1))
+        first = executor.execute(self.skill, {"text": "same"})
+        second = executor.execute(self.skill, {"text": "same"})
+        digest = second.artifact_details[0]["digest"].split(":")[1]
+        run = executor.gc.collect(now=time.time() + 3600)
+        self.assertEqual((run["removedExecutions"], run["removedBlobs"]), (1, 0))
+        self.assertFalse((self.artifacts_dir / first.execution_id).exists())
+        self.assertTrue(executor.blobs.has(digest))
+
+    def test_max_total_bytes_keeps_newest(self):
+        executor = self.make_executor(retention=RetentionPolicy(max_total_bytes=1))
+        results = [executor.execute(self.skill, {"text": f"run {n}"}) for n in range(2)]
+        executor.gc.collect()
+        self.assertFalse((self.artifacts_dir / results[0].execution_id).exists())
+        self.assertFalse((self.artifacts_dir / results[1].execution_id).exists())
+
+    def _gc(self, policy):
+        index = ArtifactIndex(self.artifacts_dir / ".index")
+        blobs = BlobStore(self.artifacts_dir / ".blobs")
+        return index, ArtifactGC(self.artifacts_dir, index, blobs, policy)
+
+    def test_aliases_expire_with_their_target(self):
+        index, gc = self._gc(RetentionPolicy(max_age_seconds=60))
+        now = time.time()
+        leader, alias, legacy_alias = "exec-00000000000a", "exec-00000000000b", "exec-00000000000c"
+        (self.artifacts_dir / leader).mkdir()
+        (self.artifacts_dir / leader / "stdout.txt").write_text("x")
+        os.symlink(leader, self.artifacts_dir / alias)
+        os.symlink(leader, self.artifacts_dir / legacy_alias)
+        index.record(leader, "writer", 1, [], at=now - 120)
+        index.record(alias, "writer", 0, [], at=now, target=leader)
+        index.record(legacy_alias, "writer", 0, [], at=now)
+
+        run = gc.collect(now=now)
+        self.assertEqual(run["removedExecutions"], 3)
+        for execution_id in (leader, alias, legacy_alias):
+            self.assertFalse(os.path.lexists(self.artifacts_dir / execution_id))
+        self.assertEqual(index.load(), [])
+
+
+# Fork-mode skill: the module records the zygote's pid at import time.
+FORK_SKILL = """import json, os, sys, time
+ZYGOTE_PID = os.getpid()
+
+
+def main():
+    data = json.load(sys.stdin)
+    if data.get("sleep"):
+        time.sleep(data["sleep"])
+    print(json.dumps({"zygote": ZYGOTE_PID, "pid": os.getpid(), "parent": os.getppid()}))
+    if data.get("exit"):
+        sys.exit(data["exit"])
+"""
+
+
+class ZygoteTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.executor = self.make_executor(kill_grace_ms=100)
+
+    def fork_skill(self, name, code=FORK_SKILL):
+        self.add_skill(name, code, runtime={"fork": True})
+        return self.make_registry().get(name)
+
+    def test_children_are_forked_from_one_zygote(self):
+        skill = self.fork_skill("forked")
+        first = self.executor.execute(skill, {}, 10_000)
+        second = self.executor.execute(skill, {}, 10_000)
+        self.assertTrue(first.success, first.error)
+        self.assertTrue(second.success, second.error)
+        self.assertEqual(first.output["zygote"], second.output["zygote"])
+        self.assertEqual(first.output["parent"], first.output["zygote"])
+        self.assertNotEqual(first.output["pid"], second.output["pid"])
+
+    def test_system_exit_sets_the_exit_code(self):
+        skill = self.fork_skill("forked")
+        result = self.executor.execute(skill, {"exit": 3}, 10_000)
+        self.assertFalse(result.success)
+        self.assertEqual(result.exit_code, 3)
+
+    def test_timed_out_child_is_killed(self):
+        skill = self.fork_skill("forked")
+        started = time.monotonic()
+        result = self.executor.execute(skill, {"sleep": 60}, 300)
+        self.assertFalse(result.success)
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertIn("timed out", result.error.lower())
+
+    def test_hanging_import_does_not_block_forever(self):
+        skill = self.fork_skill("stuck", "import time\ntime.sleep(60)\n\n\ndef main():\n    pass\n")
+        started = time.monotonic()
+        with mock.patch("runtime.zygote.START_TIMEOUT_SECONDS", 0.5):
+            with self.assertRaisesRegex(RuntimeError, "failed to start"):
+                self.executor.execute(skill, {}, 10_000)
+        self.assertLess(time.monotonic() - started, 10)
+
+
+PID_SKILL = """import json, os, sys
+data = json.load(sys.stdin)
+print(json.dumps({"pid": os.getpid(), "echo": data}))
+"""
+
+
+class StandbyPoolTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("warm", PID_SKILL, runtime={"standby": 1})
+        self.skill = self.make_registry().get("warm")
+        self.executor = self.make_executor()
+
+    def ready(self):
+        pool = self.executor.standby._pools.get("warm")
+        return list(pool.ready) if pool is not None else []
+
+    def test_runs_on_a_prewarmed_process(self):
+        first = self.executor.execute(self.skill, {"n": 1}, 10_000)
+        self.assertTrue(first.success)
+        self.wait_for(self.ready)
+        execution_id, proc = self.ready()[0]
+
+        second = self.executor.execute(self.skill, {"n": 2}, 10_000)
+        self.assertTrue(second.success)
+        self.assertEqual(second.execution_id, execution_id)
+        self.assertEqual(second.output, {"pid": proc.pid, "echo": {"n": 2}})
+        # The pool is topped up again in the background.
+        self.wait_for(lambda: self.ready() and self.ready()[0][0] != execution_id)
+
+    def test_discarded_process_loses_its_workdir(self):
+        self.executor.execute(self.skill, {}, 10_000)
+        self.wait_for(self.ready)
+        execution_id, proc = self.ready()[0]
+        self.assertTrue((self.artifacts_dir / execution_id).is_dir())
+
+        self.executor.standby.close()
+        self.assertIsNotNone(proc.poll())
+        self.assertFalse((self.artifacts_dir / execution_id).exists())
+
+    def test_changed_spec_replaces_the_warm_processes(self):
+        self.executor.execute(self.skill, {}, 10_000)
+        self.wait_for(self.ready)
+        execution_id, proc = self.ready()[0]
+
+        changed = dataclasses.replace(self.skill, timeout_ms=self.skill.timeout_ms + 1)
+        result = self.executor.execute(changed, {}, 10_000)
+        self.assertTrue(result.success)
+        self.assertNotEqual(result.execution_id, execution_id)
+        self.wait_for(lambda: proc.poll() is not None)
+        self.assertFalse((self.artifacts_dir / execution_id).exists())
+
+
+class _DroppingHandler(socketserver.BaseRequestHandler):
+    # Accepts the request and hangs up, like a spawner that died mid-run.
+    def handle(self):
+        self.request.recv(1)
+
+
+class SpawnerTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.registry = self.make_registry()
+        self.socket_path = self.root / "spawner.sock"
+
+    def start_server(self, handler):
+        server = SpawnServer(str(self.socket_path), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+    def test_runs_through_the_spawner(self):
+        self.start_server(SpawnHandler)
+        executor = self.make_executor(spawner_socket=self.socket_path)
+        result = executor.execute(self.registry.get("echo"), {"value": 1}, 10_000)
+        self.assertTrue(result.success)
+        self.assertEqual(result.output, {"value": 1})
+
+    def test_missing_spawner_falls_back_to_a_local_launch(self):
+        executor = self.make_executor(spawner_socket=self.socket_path)
+        result = executor.execute(self.registry.get("echo"), {"value": 2}, 10_000)
+        self.assertTrue(result.success)
+        self.assertEqual(result.output, {"value": 2})
+
+    def test_dropped_connection_is_reported_as_unavailable(self):
+        self.start_server(_DroppingHandler)
+        executor = self.make_executor(spawner_socket=self.socket_path)
+        with self.assertRaises(SpawnerUnavailable):
+            executor.execute(self.registry.get("echo"), {}, 10_000)
+
+        connection = self.serve(self.registry, executor)
+        body = json.dumps({"skillName": "echo", "input": {}})
+        connection.request("POST", "/api/skills/execute", body)
+        response = connection.getresponse()
+        self.assertEqual(response.status, 503)
+        self.assertIn("spawner unavailable", json.loads(response.read())["error"])
+
+    def test_socket_is_created_private(self):
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "runtime.spawner", "--socket", str(self.socket_path)],
+            cwd=settings.BASE_DIR,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.terminate)
+        self.wait_for(self.socket_path.exists)
+        self.assertEqual(stat.S_IMODE(self.socket_path.stat().st_mode), 0o600)
+
+
+# Fails with exit code 4 when its chunk contains "bad".
+PICKY_SKILL = """import json, sys
+data = json.load(sys.stdin)
+if "bad" in data["data"]["items"]:
+    sys.exit(4)
+print(json.dumps(data))
+"""
+
+
+class MapTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.add_skill("picky", PICKY_SKILL)
+        self.registry = self.make_registry()
+
+    def spec(self, **raw):
+        return parse_map(self.registry, {"path": "data.items", **raw}, 4)
+
+    def test_split_input_copies_everything_but_the_list(self):
+        data = {"data": {"items": [1, 2, 3], "keep": True}, "x": 1}
+        chunks = split_input(data, self.spec(chunkSize=2), 10)
+        self.assertEqual(
+            chunks,
+            [
+                {"data": {"items": [1, 2], "keep": True}, "x": 1},
+                {"data": {"items": [3], "keep": True}, "x": 1},
+            ],
+        )
+        with self.assertRaisesRegex(ValueError, "must be a list"):
+            split_input({"data": {}}, self.spec(), 10)
+        with self.assertRaisesRegex(ValueError, "at most 2 allowed"):
+            split_input({"data": {"items": [1, 2, 3]}}, self.spec(), 2)
+
+    def test_concat(self):
+        spec = self.spec(outputPath="result.values")
+        self.assertEqual(_concat([[1], [2, 3]], spec), [1, 2, 3])
+        outputs = [{"result": {"values": [1]}, "n": 0}, {"result": {"values": [2]}, "n": 1}]
+        merged = _concat(outputs, spec)
+        self.assertEqual(merged, {"result": {"values": [1, 2]}, "n": 0})
+        with self.assertRaisesRegex(ValueError, "chunk 1 output has no list at result.values"):
+            _concat([{"result": {"values": []}}, {"result": {}}], spec)
+
+    def test_run_map_merges_chunk_outputs(self):
+        executor = self.make_executor()
+        skill = self.registry.get("echo")
+        data = {"data": {"items": list(range(5))}}
+        for run in (run_map, lambda *args: asyncio.run(run_map_async(*args))):
+            payload = run(executor, skill, data, None, self.spec(chunkSize=2), 10)
+            self.assertTrue(payload["success"], payload.get("error"))
+            self.assertEqual(payload["output"], data)
+            self.assertEqual(len(payload["chunks"]), 3)
+
+    def test_run_map_with_a_reducer(self):
+        spec = self.spec(chunkSize=2, reducer="echo")
+        data = {"data": {"items": [1, 2, 3]}}
+        payload = run_map(self.make_executor(), self.registry.get("echo"), data, None, spec, 10)
+        self.assertTrue(payload["success"], payload.get("error"))
+        self.assertEqual(
+            payload["output"],
+            {"outputs": [{"data": {"items": [1, 2]}}, {"data": {"items": [3]}}]},
+        )
+        self.assertTrue(payload["reducer"]["success"])
+
+    def test_failed_chunk_fails_the_map(self):
+        spec = self.spec(chunkSize=1, parallelism=1)
+        data = {"data": {"items": ["ok", "bad", "ok"]}}
+        payload = run_map(self.make_executor(), self.registry.get("picky"), data, None, spec, 10)
+        self.assertFalse(payload["success"])
+        self.assertEqual(payload["error"], "chunk 1 failed: Skill exited with code 4")
+        self.assertTrue(payload["chunks"][2]["skipped"])
+
+
+class MapReducerTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.add_skill("reduce")
+        self.registry = self.make_registry()
+        self.executor = self.make_executor()
+        self.spec = parse_map(self.registry, {"path": "items", "reducer": "reduce"}, 2)
+        # A launch failure raises out of execute(), like a spawner error would.
+        self.spec.reducer.launch = LaunchPlan((), {}, str(self.root), error="cannot launch")
+        self.skill = self.registry.get("echo")
+
+    def test_reducer_exception_becomes_failed_payload(self):
+        payload = run_map(self.executor, self.skill, {"items": [1, 2]}, None, self.spec, 10)
+        self.assertFalse(payload["success"])
+        self.assertEqual(payload["error"], "reducer failed: cannot launch")
+        self.assertEqual([chunk["success"] for chunk in payload["chunks"]], [True, True])
+
+    def test_reducer_exception_becomes_failed_payload_async(self):
+        payload = asyncio.run(
+            run_map_async(self.executor, self.skill, {"items": [1, 2]}, None, self.spec, 10)
+        )
+        self.assertFalse(payload["success"])
+        self.assertEqual(payload["error"], "reducer failed: cannot launch")
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_explicit_range(self):
+        self.assertEqual(_parse_range("bytes=0-9", 100), (0, 9))
+
+    def test_open_ended_range(self):
+        self.assertEqual(_parse_range("bytes=90-", 100), (90, 99))
+
+    def test_end_is_clamped_to_size(self):
+        self.assertEqual(_parse_range("bytes=90-500", 100), (90, 99))
+
+    def test_suffix_range(self):
+        self.assertEqual(_parse_range("bytes=-10", 100), (90, 99))
+
+    def test_suffix_longer_than_file(self):
+        self.assertEqual(_parse_range("bytes=-500", 100), (0, 99))
+
+    def test_zero_suffix_is_unsatisfiable(self):
+        self.assertEqual(_parse_range("bytes=-0", 100), (-1, -1))
+
+    def test_start_past_end_is_unsatisfiable(self):
+        self.assertEqual(_parse_range("bytes=100-", 100), (-1, -1))
+
+    def test_reversed_range_is_unsatisfiable(self):
+        self.assertEqual(_parse_range("bytes=9-3", 100), (-1, -1))
+
+    def test_empty_file_is_unsatisfiable(self):
+        self.assertEqual(_parse_range("bytes=0-", 0), (-1, -1))
+        self.assertEqual(_parse_range("bytes=-10", 0), (-1, -1))
+
+    def test_unsupported_forms_are_ignored(self):
+        self.assertIsNone(_parse_range("bytes=-", 100))
+        self.assertIsNone(_parse_range("bytes=0-1,5-6", 100))
+        self.assertIsNone(_parse_range("items=0-1", 100))
+
+
+class PlanDownloadTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        self.data = bytes(range(256)) * 4
+        path = self.dir / "out.bin"
+        path.write_bytes(self.data)
+        self.artifact = ArtifactFile("artifacts/out.bin", path, len(self.data), '"abc"')
+
+    def _read(self, artifact, plan):
+        return b"".join(iter_content(artifact, plan))
+
+    def test_full_download(self):
+        plan = plan_download(self.artifact)
+        self.assertEqual(plan.status, 200)
+        self.assertEqual(plan.headers["Content-Length"], str(len(self.data)))
+        self.assertEqual(plan.headers["ETag"], '"abc"')
+        self.assertEqual(self._read(self.artifact, plan), self.data)
+
+    def test_if_none_match(self):
+        self.assertEqual(plan_download(self.artifact, if_none_match='"x", "abc"').status, 304)
+        self.assertEqual(plan_download(self.artifact, if_none_match='"x"').status, 200)
+
+    def test_if_none_match_star(self):
+        self.assertEqual(plan_download(self.artifact, if_none_match="*").status, 304)
+
+    def test_if_none_match_uses_weak_comparison(self):
+        weak = ArtifactFile(self.artifact.name, self.artifact.path, self.artifact.size, 'W/"abc"')
+        self.assertEqual(plan_download(weak, if_none_match='W/"abc"').status, 304)
+        self.assertEqual(plan_download(weak, if_none_match='"abc"').status, 304)
+        self.assertEqual(plan_download(self.artifact, if_none_match='W/"abc"').status, 304)
+        self.assertEqual(plan_download(weak, if_none_match='W/"abd"').status, 200)
+
+    def test_content_disposition_plain_name(self):
+        headers = plan_download(self.artifact).headers
+        self.assertEqual(headers["Content-Disposition"], 'inline; filename="out.bin"')
+
+    def test_content_disposition_escapes_unsafe_names(self):
+        self.assertEqual(
+            content_disposition("inline", 'a"b\\c.txt'),
+            "inline; filename=\"a_b_c.txt\"; filename*=UTF-8''a%22b%5Cc.txt",
+        )
+        header = content_disposition("inline", "报告 naïve.pdf")
+        header.encode("latin-1")
+        self.assertEqual(
+            header,
+            "inline; filename=\"__ naive.pdf\"; "
+            "filename*=UTF-8''%E6%8A%A5%E5%91%8A%20na%C3%AFve.pdf",
+        )
+
+    def test_partial_download(self):
+        plan = plan_download(self.artifact, range_header="bytes=10-19")
+        self.assertEqual(plan.status, 206)
+        self.assertEqual(plan.headers["Content-Range"], f"bytes 10-19/{len(self.data)}")
+        self.assertEqual(plan.headers["Content-Length"], "10")
+        self.assertEqual(self._read(self.artifact, plan), self.data[10:20])
+
+    def test_suffix_download(self):
+        plan = plan_download(self.artifact, range_header="bytes=-16")
+        self.assertEqual(plan.status, 206)
+        self.assertEqual(self._read(self.artifact, plan), self.data[-16:])
+
+    def test_unsatisfiable_range(self):
+        plan = plan_download(self.artifact, range_header=f"bytes={len(self.data)}-")
+        self.assertEqual(plan.status, 416)
+        self.assertEqual(plan.headers["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_empty_file_range_is_416(self):
+        path = self.dir / "empty.txt"
+        path.write_bytes(b"")
+        empty = ArtifactFile("artifacts/empty.txt", path, 0, '"e"')
+        plan = plan_download(empty, range_header="bytes=0-")
+        self.assertEqual(plan.status, 416)
+        self.assertEqual(plan.headers["Content-Range"], "bytes */0")
+        self.assertEqual(plan_download(empty).status, 200)
+
+    def test_if_range_matching_etag(self):
+        plan = plan_download(self.artifact, range_header="bytes=0-3", if_range='"abc"')
+        self.assertEqual(plan.status, 206)
+
+    def test_if_range_stale_etag_sends_full_file(self):
+        plan = plan_download(self.artifact, range_header="bytes=0-3", if_range='"old"')
+        self.assertEqual(plan.status, 200)
+        self.assertNotIn("Content-Range", plan.headers)
+
+    def test_if_range_ignores_weak_etag(self):
+        weak = ArtifactFile(self.artifact.name, self.artifact.path, self.artifact.size, 'W/"abc"')
+        plan = plan_download(weak, range_header="bytes=0-3", if_range='W/"abc"')
+        self.assertEqual(plan.status, 200)
+
+    def _gzip_artifact(self):
+        blob = self.dir / "blob.gz"
+        blob.write_bytes(gzip.compress(self.data))
+        return ArtifactFile("artifacts/out.bin", blob, len(self.data), '"abc"', "gzip")
+
+    def test_gzip_sent_as_is_when_accepted(self):
+        artifact = self._gzip_artifact()
+        plan = plan_download(artifact, accept_encoding="br, gzip")
+        self.assertEqual(plan.status, 200)
+        self.assertTrue(plan.raw)
+        self.assertEqual(plan.headers["Content-Encoding"], "gzip")
+        self.assertEqual(plan.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(plan.headers["Content-Length"], str(artifact.path.stat().st_size))
+        self.assertEqual(gzip.decompress(self._read(artifact, plan)), self.data)
+
+    def test_gzip_decompressed_when_not_accepted(self):
+        artifact = self._gzip_artifact()
+        plan = plan_download(artifact)
+        self.assertFalse(plan.raw)
+        self.assertNotIn("Content-Encoding", plan.headers)
+        self.assertEqual(plan.headers["Content-Length"], str(len(self.data)))
+        self.assertEqual(self._read(artifact, plan), self.data)
+
+    def test_gzip_range_is_served_from_decompressed_bytes(self):
+        artifact = self._gzip_artifact()
+        plan = plan_download(artifact, range_header="bytes=100-199", accept_encoding="gzip")
+        self.assertEqual(plan.status, 206)
+        self.assertNotIn("Content-Encoding", plan.headers)
+        self.assertEqual(self._read(artifact, plan), self.data[100:200])
+
+
+UNICODE_ARTIFACT_SKILL = """import json, os
+path = os.path.join(os.environ["SKILL_ARTIFACTS_DIR"], "报告.txt")
+with open(path, "w", encoding="utf-8") as fh:
+    fh.write("结果")
+print(json.dumps({"ok": True}))
+"""
+
+
+class ServerDownloadTests(SkillsTestCase):
+    def test_non_latin1_artifact_name(self):
+        self.add_skill("report", UNICODE_ARTIFACT_SKILL, artifacts=["artifacts/*.txt"])
+        registry = self.make_registry()
+        executor = self.make_executor()
+        result = executor.execute(registry.get("report"), {})
+        self.assertTrue(result.artifacts[0].endswith("/artifacts/报告.txt"))
+
+        connection = self.serve(registry, executor)
+        path = quote("artifacts/报告.txt")
+        connection.request("GET", f"/api/executions/{result.execution_id}/artifacts/{path}")
+        response = connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.read().decode("utf-8"), "结果")
+        disposition = response.getheader("Content-Disposition")
+        self.assertIn("filename*=UTF-8''%E6%8A%A5%E5%91%8A.txt", disposition)
+
+
+class AsyncViewTests(SkillsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_skill("echo")
+        self.add_skill("fails", "import sys\nsys.stderr.write('boom')\nsys.exit(2)\n")
+        for name, value in (("registry", self.make_registry()), ("executor", self.make_executor())):
+            patcher = mock.patch.object(views, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.factory = AsyncRequestFactory()
+
+    def post(self, view, body):
+        request = self.factory.post("/", json.dumps(body), content_type="application/json")
+        response = asyncio.run(view(request))
+        return response.status_code, json.loads(response.content)
+
+    def test_execute(self):
+        status, payload = self.post(
+            views.execute_skill_async, {"skillName": "echo", "input": {"value": 1}}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["output"], {"value": 1})
+
+    def test_execute_failure_and_unknown_skill(self):
+        status, payload = self.post(views.execute_skill_async, {"skillName": "fails"})
+        self.assertEqual(status, 500)
+        self.assertIn("boom", payload["stderr"])
+        status, _ = self.post(views.execute_skill_async, {"skillName": "missing"})
+        self.assertEqual(status, 404)
+
+    def test_execute_batch(self):
+        items = [{"skillName": "echo", "input": {"n": n}} for n in range(3)]
+        status, payload = self.post(views.execute_batch_async, {"items": items})
+        self.assertEqual(status, 200)
+        outputs = [item["output"] for item in payload["results"]]
+        self.assertEqual(outputs, [{"n": n} for n in range(3)])
+
+    def test_rejects_other_methods(self):
+        response = asyncio.run(views.execute_skill_async(self.factory.get("/")))
+        self.assertEqual(response.status_code, 405)
+        response = asyncio.run(views.health_async(self.factory.post("/")))
+        self.assertEqual(response.status_code, 405)
+
+
+class JobStateTests(TestCase):
+    def _job(self, **fields):
+        return Job.objects.create(skill_name="add", input={"a": 1}, **fields)
+
+    def test_claim_marks_jobs_running_in_order(self):
+        first, second, third = self._job(), self._job(), self._job()
+        claimed = jobs.claim("w1", 2)
+        self.assertEqual([job.id for job in claimed], [first.id, second.id])
+        for job in claimed:
+            self.assertEqual(job.status, Job.RUNNING)
+            self.assertEqual(job.worker, "w1")
+            self.assertEqual(job.attempts, 1)
+            self.assertIsNotNone(job.started_at)
+            self.assertIsNotNone(job.heartbeat_at)
+        third.refresh_from_db()
+        self.assertEqual(third.status, Job.QUEUED)
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        self._job()
+        self.assertEqual(len(jobs.claim("w1", 5)), 1)
+        self.assertEqual(jobs.claim("w2", 5), [])
+
+    def test_finish_records_result(self):
+        job = self._job()
+        jobs.claim("w1", 1)
+        jobs.finish("w1", [(job.id, Job.SUCCEEDED, {"success": True})])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {"success": True})
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(job.attempts, 1)
+
+    def test_finish_ignores_jobs_of_other_workers(self):
+        job = self._job()
+        jobs.claim("w1", 1)
+        jobs.finish("w2", [(job.id, Job.FAILED, {"success": False})])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+
+    def test_admission_requeue_does_not_spend_an_attempt(self):
+        job = self._job()
+        jobs.claim("w1", 1)
+        jobs.finish("w1", [(job.id, Job.QUEUED, None)])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(job.worker, "")
+        self.assertIsNone(job.started_at)
+        self.assertIsNone(job.heartbeat_at)
+
+        jobs.claim("w2", 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (Job.RUNNING, "w2", 1))
+
+    def test_requeue_stale_returns_lost_jobs_to_the_queue(self):
+        job = self._job()
+        fresh = self._job()
+        jobs.claim("w1", 2)
+        stale_at = timezone.now() - timedelta(seconds=jobs.STALE_HEARTBEAT_SECONDS + 1)
+        Job.objects.filter(id=job.id).update(heartbeat_at=stale_at)
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.worker, "")
+        self.assertEqual(job.attempts, 1)
+        self.assertEqual(fresh.status, Job.RUNNING)
+
+    def test_requeue_stale_fails_exhausted_jobs(self):
+        job = self._job(attempts=jobs.MAX_ATTEMPTS - 1)
+        jobs.claim("w1", 1)
+        stale_at = timezone.now() - timedelta(seconds=jobs.STALE_HEARTBEAT_SECONDS + 1)
+        Job.objects.filter(id=job.id).update(heartbeat_at=stale_at)
+
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, jobs.MAX_ATTEMPTS)
+        self.assertFalse(job.result["success"])
+        self.assertIsNotNone(job.finished_at)
+
+    def test_heartbeat_keeps_running_jobs_fresh(self):
+        job = self._job()
+        jobs.claim("w1", 1)
+        stale_at = timezone.now() - timedelta(seconds=jobs.STALE_HEARTBEAT_SECONDS + 1)
+        Job.objects.filter(id=job.id).update(heartbeat_at=stale_at)
+        jobs.heartbeat("w1", [job.id])
+
+        self.assertEqual(jobs.requeue_stale(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
@@ -1,9 +1,45 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
-urlpatterns = [
-    path("health", views.health),
-    path("skills", views.list_skills),
-    path("skills/execute", views.execute_skill),
-]
+if settings.RUNTIME_ASYNC_VIEWS:
+    urlpatterns = [
+        path("health", views.health_async),
+        path("skills", views.list_skills_async),
+        path("skills/execute", views.execute_skill_async),
+        path("skills/execute-batch", views.execute_batch_async),
+        path("pipelines/execute", views.execute_pipeline_async),
+        path("runtime/stats", views.runtime_stats_async),
+        path(
+            "executions/<str:execution_id>/artifacts.zip",
+            views.download_artifacts_zip_async,
+        ),
+        path(
+            "executions/<str:execution_id>/artifacts/<path:artifact_path>",
+            views.download_artifact_async,
+        ),
+        path("jobs", views.create_job_async),
+        path("jobs/<str:job_id>", views.get_job_async),
+        path("jobs/<str:job_id>/wait", views.wait_job_async),
+    ]
+else:
+    urlpatterns = [
+        path("health", views.health),
+        path("skills", views.list_skills),
+        path("skills/execute", views.execute_skill),
+        path("skills/execute-batch", views.execute_batch),
+        path("pipelines/execute", views.execute_pipeline),
+        path("runtime/stats", views.runtime_stats),
+        path(
+            "executions/<str:execution_id>/artifacts.zip",
+            views.download_artifacts_zip,
+        ),
+        path(
+            "executions/<str:execution_id>/artifacts/<path:artifact_path>",
+            views.download_artifact,
+        ),
+        path("jobs", views.create_job),
+        path("jobs/<str:job_id>", views.get_job),
+        path("jobs/<str:job_id>/wait", views.wait_job),
+    ]
@@ -1,22 +1,53 @@
+import asyncio
 import json
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 from django.conf import settings
-from django.http import JsonResponse
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotAllowed,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from runtime.executor import SkillExecutor
-from runtime.registry import SkillRegistry
+from runtime.admission import AdmissionRejected
+from runtime.batch import BatchItem, parse_items, parse_timeout_ms, run_batch, run_batch_async
+from runtime.downloads import (
+    ArtifactFile,
+    DownloadPlan,
+    find_artifact,
+    iter_content,
+    iter_zip,
+    list_artifacts,
+    plan_download,
+)
+from runtime.fanout import MapSpec, parse_map, run_map, run_map_async
+from runtime.models import ExecutionResult, SkillSpec
+from runtime.payload import result_payload
+from runtime.pipeline import PipelineError, PipelineNode, parse_pipeline, run_pipeline, run_pipeline_async
+from runtime.spawner import SpawnerUnavailable
+from runtime.watcher import SkillsWatcher
+
+from .jobs import job_payload
+from .models import Job
+from .services import build_executor, build_registry
 
 
-SKILLS_DIR = Path(settings.SKILLS_DIR).resolve()
 ARTIFACTS_DIR = Path(settings.ARTIFACTS_DIR).resolve()
 ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+JOB_POLL_SECONDS = 0.25
 
-registry = SkillRegistry(SKILLS_DIR)
-executor = SkillExecutor(ARTIFACTS_DIR, default_timeout_ms=settings.DEFAULT_TIMEOUT_MS)
+registry = build_registry()
+executor = build_executor()
+executor.gc.start(settings.ARTIFACT_GC_INTERVAL_SECONDS)
+watcher = SkillsWatcher(registry, poll_interval_seconds=settings.SKILLS_WATCH_POLL_SECONDS)
+if settings.SKILLS_WATCH:
+    watcher.start()
 
 
 def _read_json_body(raw: bytes) -> Dict[str, Any]:
@@ -28,6 +59,157 @@ def _read_json_body(raw: bytes) -> Dict[str, Any]:
         return {}
 
 
+def _parse_execute_request(
+    request,
+) -> Tuple[Optional[JsonResponse], Optional[SkillSpec], Dict[str, Any], Optional[int], Dict[str, Any]]:
+    body = _read_json_body(request.body)
+    if not body:
+        error = JsonResponse({"success": False, "error": "Invalid JSON body"}, status=400)
+        return error, None, {}, None, {}
+
+    skill_name = body.get("skillName")
+    input_data = body.get("input") or {}
+    options = body.get("options") or {}
+
+    if not skill_name:
+        error = JsonResponse({"success": False, "error": "skillName is required"}, status=400)
+        return error, None, {}, None, {}
+
+    try:
+        timeout_ms = parse_timeout_ms(options.get("timeoutMs"))
+    except ValueError as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=400), None, {}, None, {}
+
+    skill = registry.get(skill_name)
+    if not skill:
+        error = JsonResponse({"success": False, "error": "Skill not found"}, status=404)
+        return error, None, {}, None, {}
+
+    return None, skill, input_data, timeout_ms, options
+
+
+def _parse_batch_request(
+    request,
+) -> Tuple[Optional[JsonResponse], List[BatchItem], int, bool]:
+    body = _read_json_body(request.body)
+    options = body.get("options") or {}
+    try:
+        items = parse_items(registry, body.get("items"))
+        parallelism = int(options.get("parallelism") or settings.BATCH_MAX_PARALLELISM)
+    except ValueError as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=400), [], 0, False
+    if not items:
+        error = JsonResponse({"success": False, "error": "items must not be empty"}, status=400)
+        return error, [], 0, False
+    if len(items) > settings.BATCH_MAX_ITEMS:
+        error = JsonResponse(
+            {"success": False, "error": f"At most {settings.BATCH_MAX_ITEMS} items per batch"},
+            status=400,
+        )
+        return error, [], 0, False
+    parallelism = max(1, min(parallelism, settings.BATCH_MAX_PARALLELISM))
+    stream = bool(options.get("stream")) or "application/x-ndjson" in request.headers.get("Accept", "")
+    return None, items, parallelism, stream
+
+
+def _parse_pipeline_request(
+    request,
+) -> Tuple[Optional[JsonResponse], List[PipelineNode], int]:
+    body = _read_json_body(request.body)
+    options = body.get("options") or {}
+    try:
+        nodes = parse_pipeline(registry, body.get("nodes"), settings.PIPELINE_MAX_NODES)
+        parallelism = int(options.get("parallelism") or settings.BATCH_MAX_PARALLELISM)
+    except (PipelineError, ValueError) as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=400), [], 0
+    return None, nodes, max(1, min(parallelism, settings.BATCH_MAX_PARALLELISM))
+
+
+def _batch_response(results: List[Dict[str, Any]], started: float) -> JsonResponse:
+    results.sort(key=lambda item: item["index"])
+    return JsonResponse(
+        {
+            "success": all(item["success"] for item in results),
+            "results": results,
+            "durationMs": round((time.monotonic() - started) * 1000, 1),
+        }
+    )
+
+
+def _parse_map_options(options: Dict[str, Any]) -> Tuple[Optional[JsonResponse], Optional[MapSpec]]:
+    if not options.get("map"):
+        return None, None
+    try:
+        spec = parse_map(registry, options["map"], settings.BATCH_MAX_PARALLELISM)
+    except (TypeError, ValueError) as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=400), None
+    return None, spec
+
+
+def _map_response(payload: Dict[str, Any]) -> JsonResponse:
+    return JsonResponse(payload, status=200 if payload["success"] else 500)
+
+
+def _plan(request, artifact: ArtifactFile) -> DownloadPlan:
+    return plan_download(
+        artifact,
+        range_header=request.headers.get("Range"),
+        if_range=request.headers.get("If-Range"),
+        if_none_match=request.headers.get("If-None-Match"),
+        accept_encoding=request.headers.get("Accept-Encoding"),
+    )
+
+
+def _download_response(request, plan: DownloadPlan, body) -> HttpResponse:
+    if plan.status in (304, 416) or request.method == "HEAD":
+        response = HttpResponse(status=plan.status)
+    else:
+        response = body
+        response.status_code = plan.status
+    for name, value in plan.headers.items():
+        response[name] = value
+    return response
+
+
+def _artifact_not_found() -> JsonResponse:
+    return JsonResponse({"success": False, "error": "Artifact not found"}, status=404)
+
+
+def _zip_headers(response: HttpResponse, execution_id: str) -> HttpResponse:
+    response["Content-Disposition"] = f'attachment; filename="{execution_id}-artifacts.zip"'
+    return response
+
+
+async def _async_chunks(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    # File reads (and zip deflating) stay off the event loop.
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _execution_response(result: ExecutionResult) -> JsonResponse:
+    return JsonResponse(result_payload(result), status=200 if result.success else 500)
+
+
+def _rejected_response(exc: AdmissionRejected) -> JsonResponse:
+    response = JsonResponse(
+        {"success": False, "error": str(exc), "retryAfter": exc.retry_after},
+        status=429,
+    )
+    response["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+def _skills_payload() -> Dict[str, Any]:
+    return {
+        "skills": registry.list_metadata(),
+        "errors": registry.get_errors(),
+        "generation": registry.generation,
+    }
+
+
 @require_http_methods(["GET"])
 def health(request):
     return JsonResponse({"status": "ok"})
@@ -35,54 +217,268 @@ def health(request):
 
 @require_http_methods(["GET"])
 def list_skills(request):
-    payload = {
-        "skills": registry.list_metadata(),
-        "errors": registry.get_errors(),
-    }
-    return JsonResponse(payload)
+    return JsonResponse(_skills_payload())
+
+
+@require_http_methods(["GET"])
+def runtime_stats(request):
+    return JsonResponse(executor.stats())
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
 def execute_skill(request):
-    body = _read_json_body(request.body)
-    if not body:
-        return JsonResponse({"success": False, "error": "Invalid JSON body"}, status=400)
+    error, skill, input_data, timeout_ms, options = _parse_execute_request(request)
+    if error is None:
+        error, map_spec = _parse_map_options(options)
+    if error is not None:
+        return error
 
-    skill_name = body.get("skillName")
-    input_data = body.get("input") or {}
-    options = body.get("options") or {}
-    timeout_ms = options.get("timeoutMs")
+    if map_spec is not None:
+        try:
+            payload = run_map(executor, skill, input_data, timeout_ms, map_spec, settings.BATCH_MAX_ITEMS)
+        except ValueError as exc:
+            return JsonResponse({"success": False, "error": str(exc)}, status=400)
+        return _map_response(payload)
 
-    if not skill_name:
-        return JsonResponse({"success": False, "error": "skillName is required"}, status=400)
+    try:
+        result = executor.execute(skill, input_data=input_data, timeout_ms=timeout_ms)
+    except AdmissionRejected as exc:
+        return _rejected_response(exc)
+    except SpawnerUnavailable as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=503)
+    except Exception as exc:  # noqa: BLE001
+        return JsonResponse({"success": False, "error": str(exc)}, status=500)
+
+    return _execution_response(result)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def execute_batch(request):
+    error, items, parallelism, stream = _parse_batch_request(request)
+    if error is not None:
+        return error
+    started = time.monotonic()
+    results = run_batch(executor, items, parallelism)
+    if stream:
+        lines = (json.dumps(item, ensure_ascii=False) + "\n" for item in results)
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")
+    return _batch_response(list(results), started)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def execute_pipeline(request):
+    error, nodes, parallelism = _parse_pipeline_request(request)
+    if error is not None:
+        return error
+    return JsonResponse(run_pipeline(executor, nodes, parallelism))
 
-    skill = registry.get(skill_name)
-    if not skill:
-        return JsonResponse({"success": False, "error": "Skill not found"}, status=404)
 
+@csrf_exempt
+@require_http_methods(["POST"])
+def create_job(request):
+    error, skill, input_data, timeout_ms, _ = _parse_execute_request(request)
+    if error is not None:
+        return error
+    job = Job.objects.create(skill_name=skill.name, input=input_data, timeout_ms=timeout_ms)
+    return JsonResponse(job_payload(job), status=202)
+
+
+@require_http_methods(["GET", "HEAD"])
+def download_artifact(request, execution_id, artifact_path):
+    artifact = find_artifact(ARTIFACTS_DIR, executor.blobs, execution_id, artifact_path)
+    if artifact is None:
+        return _artifact_not_found()
+    plan = _plan(request, artifact)
+    body = None
+    if plan.status in (200, 206) and request.method == "GET":
+        if plan.status == 200 and (plan.raw or not artifact.encoding):
+            # Whole stored files go through wsgi.file_wrapper (sendfile).
+            body = FileResponse(open(artifact.path, "rb"))
+        else:
+            body = StreamingHttpResponse(iter_content(artifact, plan))
+    return _download_response(request, plan, body)
+
+
+@require_http_methods(["GET"])
+def download_artifacts_zip(request, execution_id):
+    artifacts = list_artifacts(ARTIFACTS_DIR, executor.blobs, execution_id)
+    if artifacts is None:
+        return _artifact_not_found()
+    response = StreamingHttpResponse(iter_zip(artifacts), content_type="application/zip")
+    return _zip_headers(response, execution_id)
+
+
+@require_http_methods(["GET"])
+def get_job(request, job_id):
+    job = Job.objects.filter(id=job_id).first()
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(job_payload(job))
+
+
+@require_http_methods(["GET"])
+def wait_job(request, job_id):
+    deadline = time.monotonic() + _wait_seconds(request)
+    while True:
+        job = Job.objects.filter(id=job_id).first()
+        if job is None:
+            return JsonResponse({"error": "Job not found"}, status=404)
+        if job.status in Job.FINISHED or time.monotonic() >= deadline:
+            return JsonResponse(job_payload(job))
+        time.sleep(JOB_POLL_SECONDS)
+
+
+def _wait_seconds(request) -> float:
+    # Long-poll window, capped below the gunicorn worker timeout.
     try:
-        result = executor.execute(skill, input_data=input_data, timeout_ms=timeout_ms)
+        wait_ms = int(request.GET.get("timeoutMs", settings.JOB_WAIT_MAX_MS))
+    except ValueError:
+        wait_ms = settings.JOB_WAIT_MAX_MS
+    return max(0, min(wait_ms, settings.JOB_WAIT_MAX_MS)) / 1000
+
+
+# Async variants for ASGI deployments (RUNTIME_ASYNC_VIEWS=1). Method checks
+# are done inline because Django 4.2's view decorators only wrap sync views.
+
+
+async def health_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return JsonResponse({"status": "ok"})
+
+
+async def list_skills_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return JsonResponse(_skills_payload())
+
+
+async def runtime_stats_async(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    return JsonResponse(await asyncio.to_thread(executor.stats))
+
+
+async def execute_skill_async(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    error, skill, input_data, timeout_ms, options = _parse_execute_request(request)
+    if error is None:
+        error, map_spec = _parse_map_options(options)
+    if error is not None:
+        return error
+
+    if map_spec is not None:
+        try:
+            payload = await run_map_async(
+                executor, skill, input_data, timeout_ms, map_spec, settings.BATCH_MAX_ITEMS
+            )
+        except ValueError as exc:
+            return JsonResponse({"success": False, "error": str(exc)}, status=400)
+        return _map_response(payload)
+
+    try:
+        result = await executor.execute_async(skill, input_data=input_data, timeout_ms=timeout_ms)
+    except AdmissionRejected as exc:
+        return _rejected_response(exc)
+    except SpawnerUnavailable as exc:
+        return JsonResponse({"success": False, "error": str(exc)}, status=503)
     except Exception as exc:  # noqa: BLE001
         return JsonResponse({"success": False, "error": str(exc)}, status=500)
 
-    if result.success:
-        return JsonResponse(
-            {
-                "success": True,
-                "executionId": result.execution_id,
-                "output": result.output,
-                "artifacts": result.artifacts,
-                "stderr": result.stderr,
-            }
-        )
+    return _execution_response(result)
 
-    return JsonResponse(
-        {
-            "success": False,
-            "executionId": result.execution_id,
-            "error": result.error,
-            "stderr": result.stderr,
-        },
-        status=500,
+
+async def execute_batch_async(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    error, items, parallelism, stream = _parse_batch_request(request)
+    if error is not None:
+        return error
+    started = time.monotonic()
+    results = run_batch_async(executor, items, parallelism)
+    if stream:
+
+        async def lines():
+            async for item in results:
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        return StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    return _batch_response([item async for item in results], started)
+
+
+async def execute_pipeline_async(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    error, nodes, parallelism = _parse_pipeline_request(request)
+    if error is not None:
+        return error
+    return JsonResponse(await run_pipeline_async(executor, nodes, parallelism))
+
+
+async def create_job_async(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    error, skill, input_data, timeout_ms, _ = _parse_execute_request(request)
+    if error is not None:
+        return error
+    job = await Job.objects.acreate(skill_name=skill.name, input=input_data, timeout_ms=timeout_ms)
+    return JsonResponse(job_payload(job), status=202)
+
+
+async def get_job_async(request, job_id):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    job = await Job.objects.filter(id=job_id).afirst()
+    if job is None:
+        return JsonResponse({"error": "Job not found"}, status=404)
+    return JsonResponse(job_payload(job))
+
+
+async def wait_job_async(request, job_id):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    deadline = time.monotonic() + _wait_seconds(request)
+    while True:
+        job = await Job.objects.filter(id=job_id).afirst()
+        if job is None:
+            return JsonResponse({"error": "Job not found"}, status=404)
+        if job.status in Job.FINISHED or time.monotonic() >= deadline:
+            return JsonResponse(job_payload(job))
+        await asyncio.sleep(JOB_POLL_SECONDS)
+
+
+async def download_artifact_async(request, execution_id, artifact_path):
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    artifact = await asyncio.to_thread(
+        find_artifact, ARTIFACTS_DIR, executor.blobs, execution_id, artifact_path
+    )
+    if artifact is None:
+        return _artifact_not_found()
+    plan = _plan(request, artifact)
+    body = None
+    if plan.status in (200, 206) and request.method == "GET":
+        body = StreamingHttpResponse(_async_chunks(iter_content(artifact, plan)))
+    return _download_response(request, plan, body)
+
+
+async def download_artifacts_zip_async(request, execution_id):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    artifacts = await asyncio.to_thread(list_artifacts, ARTIFACTS_DIR, executor.blobs, execution_id)
+    if artifacts is None:
+        return _artifact_not_found()
+    response = StreamingHttpResponse(
+        _async_chunks(iter_zip(artifacts)), content_type="application/zip"
     )
+    return _zip_headers(response, execution_id)
+
+
+execute_skill_async.csrf_exempt = True
+execute_batch_async.csrf_exempt = True
+execute_pipeline_async.csrf_exempt = True
+create_job_async.csrf_exempt = True
@@ -0,0 +1,116 @@
+# Runs a skill's helper scripts (scripts/<name>.py) inside the skill's own
+# interpreter instead of a second one. Shared by skill-creator and
+# skill-installer; not a skill itself (no skill.yaml).
+#
+# The working directory, os.environ and sys.stdout/sys.stderr are process
+# global, so run_script serializes the scripts it runs. Skills using it can be
+# marked mode: persistent or fork_safe, but concurrent requests to one worker
+# then wait for each other.
+import contextlib
+import importlib.util
+import io
+import os
+import re
+import sys
+import threading
+import traceback
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Optional
+
+_LOCK = threading.RLock()
+
+
+def _module_name(scripts_dir: Path, filename: str) -> str:
+    # Namespaced by skill so two skills' scripts (or a script and a
+    # standard-library module) never share a sys.modules entry.
+    skill = re.sub(r"\W", "_", scripts_dir.parent.name)
+    script = re.sub(r"\W", "_", Path(filename).stem)
+    return f"_skill_scripts_{skill}_{script}"
+
+
+def load_script(scripts_dir: Path, filename: str) -> ModuleType:
+    # Imported once per process; sibling imports (mini_yaml, github_utils)
+    # resolve through scripts_dir as they do when the script runs standalone.
+    module_name = _module_name(scripts_dir, filename)
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    if str(scripts_dir) not in sys.path:
+        sys.path.insert(0, str(scripts_dir))
+    spec = importlib.util.spec_from_file_location(module_name, scripts_dir / filename)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"cannot load {scripts_dir / filename}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+def exit_status(code: Any) -> int:
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def call_main(scripts_dir: Path, filename: str, args: list[str]) -> int:
+    saved_argv = sys.argv
+    sys.argv = [str(scripts_dir / filename), *args]
+    try:
+        return exit_status(load_script(scripts_dir, filename).main(args))
+    except SystemExit as exc:
+        return exit_status(exc.code)
+    except Exception:  # noqa: BLE001
+        traceback.print_exc()
+        return 1
+    finally:
+        sys.argv = saved_argv
+
+
+@contextlib.contextmanager
+def _environ(overrides: dict[str, str]):
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_script(
+    scripts_dir: Path,
+    filename: str,
+    args: list[str],
+    cwd: Path,
+    env: Optional[dict[str, str]] = None,
+) -> dict[str, Any]:
+    # The result has the same shape a subprocess run used to produce.
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with _LOCK:
+        saved_cwd = os.getcwd()
+        os.chdir(cwd)
+        try:
+            with _environ(env or {}):
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                    exit_code = call_main(scripts_dir, filename, args)
+        finally:
+            os.chdir(saved_cwd)
+    return {
+        "success": exit_code == 0,
+        "command": [sys.executable, str(scripts_dir / filename), *args],
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue().strip(),
+        "stderr": stderr.getvalue().strip(),
+    }
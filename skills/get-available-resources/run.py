@@ -63,7 +63,7 @@ def main():
         "python_version": platform.python_version(),
     }
 
-    artifacts_dir = Path(__file__).parent / "artifacts"
+    artifacts_dir = Path(os.environ.get("SKILL_ARTIFACTS_DIR") or Path(__file__).parent / "artifacts")
     artifacts_dir.mkdir(parents=True, exist_ok=True)
     (artifacts_dir / "resources.json").write_text(
         json.dumps(output, ensure_ascii=False, indent=2),
@@ -1,14 +1,18 @@
 import json
-import subprocess
+import os
 import sys
 from pathlib import Path
 from typing import Any
 
 
 SKILL_DIR = Path(__file__).resolve().parent
+# Helpers shared with the other bundled skills; see skills/_shared.
+sys.path.insert(0, str(SKILL_DIR.parent / "_shared"))
+import script_runner  # noqa: E402
+
 PROJECT_ROOT = SKILL_DIR.parent.parent
 SCRIPTS_DIR = SKILL_DIR / "scripts"
-ARTIFACT_PATH = SKILL_DIR / "artifacts" / "last_result.json"
+ARTIFACT_NAME = "last_result.json"
 DEFAULT_SKILLS_DIR = SKILL_DIR.parent
 
 
@@ -51,25 +55,21 @@ def normalize_interface(value: Any) -> list[str]:
     return interface
 
 
-def run_command(command: list[str]) -> dict[str, Any]:
-    proc = subprocess.run(
-        command,
-        cwd=str(PROJECT_ROOT),
-        capture_output=True,
-        text=True,
-    )
-    return {
-        "success": proc.returncode == 0,
-        "command": command,
-        "exit_code": proc.returncode,
-        "stdout": proc.stdout.strip(),
-        "stderr": proc.stderr.strip(),
-    }
+def run_script(filename: str, args: list[str]) -> dict[str, Any]:
+    return script_runner.run_script(SCRIPTS_DIR, filename, args, cwd=PROJECT_ROOT)
+
+
+def artifact_path() -> Path:
+    # Looked up per run: the runtime points SKILL_ARTIFACTS_DIR at the
+    # execution directory, and forked runs only see it after import.
+    artifacts_dir = os.environ.get("SKILL_ARTIFACTS_DIR")
+    return Path(artifacts_dir or SKILL_DIR / "artifacts") / ARTIFACT_NAME
 
 
 def write_artifact(payload: dict[str, Any]) -> None:
-    ARTIFACT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    ARTIFACT_PATH.write_text(
+    path = artifact_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
         json.dumps(payload, ensure_ascii=False, indent=2),
         encoding="utf-8",
     )
@@ -118,22 +118,16 @@ def main() -> None:
             print(json.dumps(result, ensure_ascii=False))
             return
         path = str(data.get("path") or DEFAULT_SKILLS_DIR)
-        command = [
-            sys.executable,
-            str(SCRIPTS_DIR / "init_skill.py"),
-            str(skill_name),
-            "--path",
-            path,
-        ]
+        args = [str(skill_name), "--path", path]
         resources = normalize_resources(data.get("resources"))
         if resources:
-            command.extend(["--resources", resources])
+            args.extend(["--resources", resources])
         if bool(data.get("examples")):
-            command.append("--examples")
+            args.append("--examples")
         for item in normalize_interface(data.get("interface")):
-            command.extend(["--interface", item])
+            args.extend(["--interface", item])
 
-        result = {"action": action, **run_command(command)}
+        result = {"action": action, **run_script("init_skill.py", args)}
         write_artifact(result)
         print(json.dumps(result, ensure_ascii=False))
         return
@@ -149,18 +143,14 @@ def main() -> None:
             write_artifact(result)
             print(json.dumps(result, ensure_ascii=False))
             return
-        command = [
-            sys.executable,
-            str(SCRIPTS_DIR / "generate_openai_yaml.py"),
-            str(skill_dir),
-        ]
+        args = [str(skill_dir)]
         name = data.get("name")
         if name:
-            command.extend(["--name", str(name)])
+            args.extend(["--name", str(name)])
         for item in normalize_interface(data.get("interface")):
-            command.extend(["--interface", item])
+            args.extend(["--interface", item])
 
-        result = {"action": action, **run_command(command)}
+        result = {"action": action, **run_script("generate_openai_yaml.py", args)}
         write_artifact(result)
         print(json.dumps(result, ensure_ascii=False))
         return
@@ -176,12 +166,7 @@ def main() -> None:
             write_artifact(result)
             print(json.dumps(result, ensure_ascii=False))
             return
-        command = [
-            sys.executable,
-            str(SCRIPTS_DIR / "quick_validate.py"),
-            str(skill_dir),
-        ]
-        result = {"action": action, **run_command(command)}
+        result = {"action": action, **run_script("quick_validate.py", [str(skill_dir)])}
         write_artifact(result)
         print(json.dumps(result, ensure_ascii=False))
         return
@@ -189,7 +189,7 @@ def write_openai_yaml(skill_dir, skill_name, raw_overrides):
     return output_path
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Create agents/openai.yaml for a skill directory.",
     )
@@ -204,7 +204,7 @@ def main():
         default=[],
         help="Interface override in key=value format (repeatable)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     skill_dir = Path(args.skill_dir).resolve()
     if not skill_dir.exists():
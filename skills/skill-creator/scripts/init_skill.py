@@ -330,7 +330,7 @@ def init_skill(skill_name, path, resources, include_examples, interface_override
     return skill_dir
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Create a new skill directory with a SKILL.md template.",
     )
@@ -352,7 +352,7 @@ def main():
         default=[],
         help="Interface override in key=value format (repeatable)",
     )
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     raw_skill_name = args.skill_name
     skill_name = normalize_skill_name(raw_skill_name)
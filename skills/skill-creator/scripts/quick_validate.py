@@ -94,11 +94,16 @@ def validate_skill(skill_path):
     return True, "Skill is valid!"
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
         print("Usage: python quick_validate.py <skill_directory>")
         sys.exit(1)
 
-    valid, message = validate_skill(sys.argv[1])
+    valid, message = validate_skill(argv[0])
     print(message)
     sys.exit(0 if valid else 1)
+
+
+if __name__ == "__main__":
+    main()
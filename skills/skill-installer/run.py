@@ -1,17 +1,20 @@
 import json
 import os
-import subprocess
 import sys
 from pathlib import Path
 from typing import Any
 
 
 SKILL_DIR = Path(__file__).resolve().parent
+# Helpers shared with the other bundled skills; see skills/_shared.
+sys.path.insert(0, str(SKILL_DIR.parent / "_shared"))
+import script_runner  # noqa: E402
+
 SCRIPTS_DIR = SKILL_DIR / "scripts"
 PROJECT_ROOT = SKILL_DIR.parent.parent
 DEFAULT_DEST = PROJECT_ROOT / "skills"
 DEFAULT_CODEX_HOME = PROJECT_ROOT
-ARTIFACT_PATH = SKILL_DIR / "artifacts" / "last_result.json"
+ARTIFACT_NAME = "last_result.json"
 
 
 def read_input() -> dict[str, Any]:
@@ -25,33 +28,31 @@ def read_input() -> dict[str, Any]:
     return payload if isinstance(payload, dict) else {}
 
 
+def artifact_path() -> Path:
+    # Looked up per run: the runtime points SKILL_ARTIFACTS_DIR at the
+    # execution directory, and forked runs only see it after import.
+    artifacts_dir = os.environ.get("SKILL_ARTIFACTS_DIR")
+    return Path(artifacts_dir or SKILL_DIR / "artifacts") / ARTIFACT_NAME
+
+
 def write_artifact(payload: dict[str, Any]) -> None:
-    ARTIFACT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    ARTIFACT_PATH.write_text(
+    path = artifact_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
         json.dumps(payload, ensure_ascii=False, indent=2),
         encoding="utf-8",
     )
 
 
-def run_command(command: list[str], codex_home: str) -> dict[str, Any]:
-    env = os.environ.copy()
-    env["CODEX_HOME"] = codex_home
-    proc = subprocess.run(
-        command,
-        cwd=str(SKILL_DIR),
-        capture_output=True,
-        text=True,
-        env=env,
+def run_script(filename: str, args: list[str], codex_home: str) -> dict[str, Any]:
+    result = script_runner.run_script(
+        SCRIPTS_DIR,
+        filename,
+        args,
+        cwd=SKILL_DIR,
+        env={"CODEX_HOME": codex_home},
     )
-    result: dict[str, Any] = {
-        "success": proc.returncode == 0,
-        "command": command,
-        "exit_code": proc.returncode,
-        "stdout": proc.stdout.strip(),
-        "stderr": proc.stderr.strip(),
-        "codex_home": codex_home,
-    }
-    return result
+    return {**result, "codex_home": codex_home}
 
 
 def normalize_paths(data: dict[str, Any]) -> list[str]:
@@ -112,12 +113,12 @@ def main() -> None:
         return
 
     if action == "list":
-        command = [sys.executable, str(SCRIPTS_DIR / "list-skills.py")]
+        args: list[str] = []
         for field in ("repo", "path", "ref", "format"):
             value = data.get(field)
             if value:
-                command.extend([f"--{field}", str(value)])
-        result = {"action": action, **run_command(command, codex_home)}
+                args.extend([f"--{field}", str(value)])
+        result = {"action": action, **run_script("list-skills.py", args, codex_home)}
         parsed = parse_json_stdout(result.get("stdout", ""))
         if parsed is not None:
             result["parsed"] = parsed
@@ -140,9 +141,7 @@ def main() -> None:
         repo = str(data.get("repo") or "openai/skills")
         collection_path = str(data.get("collection_path") or "skills/.curated").strip("/")
         skill_path = f"{collection_path}/{skill_name}"
-        command = [
-            sys.executable,
-            str(SCRIPTS_DIR / "install-skill-from-github.py"),
+        args = [
             "--repo",
             repo,
             "--path",
@@ -151,23 +150,23 @@ def main() -> None:
             str(data.get("dest") or DEFAULT_DEST),
         ]
         if data.get("ref"):
-            command.extend(["--ref", str(data.get("ref"))])
+            args.extend(["--ref", str(data.get("ref"))])
         if data.get("method"):
-            command.extend(["--method", str(data.get("method"))])
-        result = {"action": action, **run_command(command, codex_home)}
+            args.extend(["--method", str(data.get("method"))])
+        result = {"action": action, **run_script("install-skill-from-github.py", args, codex_home)}
         write_artifact(result)
         print(json.dumps(result, ensure_ascii=False))
         return
 
     if action == "install":
-        command = [sys.executable, str(SCRIPTS_DIR / "install-skill-from-github.py")]
+        args: list[str] = []
 
         url = data.get("url")
         repo = data.get("repo")
         if url:
-            command.extend(["--url", str(url)])
+            args.extend(["--url", str(url)])
         if repo:
-            command.extend(["--repo", str(repo)])
+            args.extend(["--repo", str(repo)])
         if not url and not repo:
             result = {
                 "success": False,
@@ -180,17 +179,17 @@ def main() -> None:
 
         paths = normalize_paths(data)
         if paths:
-            command.append("--path")
-            command.extend(paths)
+            args.append("--path")
+            args.extend(paths)
 
-        command.extend(["--dest", str(data.get("dest") or DEFAULT_DEST)])
+        args.extend(["--dest", str(data.get("dest") or DEFAULT_DEST)])
 
         for field in ("ref", "name", "method"):
             value = data.get(field)
             if value:
-                command.extend([f"--{field}", str(value)])
+                args.extend([f"--{field}", str(value)])
 
-        result = {"action": action, **run_command(command, codex_home)}
+        result = {"action": action, **run_script("install-skill-from-github.py", args, codex_home)}
         write_artifact(result)
         print(json.dumps(result, ensure_ascii=False))
         return
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 
 from pathlib import Path
 import os
+import shlex
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -89,6 +90,7 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": os.environ.get("SQLITE_PATH", str(BASE_DIR / "db.sqlite3")),
+        "OPTIONS": {"timeout": 20},
     }
 }
 
@@ -139,3 +141,31 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 SKILLS_DIR = os.environ.get("SKILLS_DIR", str(BASE_DIR / "skills"))
 ARTIFACTS_DIR = os.environ.get("ARTIFACTS_DIR", str(BASE_DIR / "artifacts"))
 DEFAULT_TIMEOUT_MS = int(os.environ.get("DEFAULT_TIMEOUT_MS", "10000"))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", str(Path(ARTIFACTS_DIR) / ".cache"))
+RESULT_CACHE_MAX_MB = int(os.environ.get("RESULT_CACHE_MAX_MB", "256"))
+KILL_GRACE_MS = int(os.environ.get("KILL_GRACE_MS", "1000"))
+ARTIFACT_COMPRESS = os.environ.get("ARTIFACT_COMPRESS", "0") == "1"
+ARTIFACT_MAX_AGE_HOURS = float(os.environ.get("ARTIFACT_MAX_AGE_HOURS", "168"))
+ARTIFACT_MAX_TOTAL_MB = int(os.environ.get("ARTIFACT_MAX_TOTAL_MB", "0"))
+ARTIFACT_MAX_PER_SKILL = int(os.environ.get("ARTIFACT_MAX_PER_SKILL", "0"))
+ARTIFACT_GC_INTERVAL_SECONDS = int(os.environ.get("ARTIFACT_GC_INTERVAL_SECONDS", "600"))
+SKILLS_WATCH = os.environ.get("SKILLS_WATCH", "1") == "1"
+SKILLS_WATCH_POLL_SECONDS = float(os.environ.get("SKILLS_WATCH_POLL_SECONDS", "2"))
+SKILL_SPAWNER_SOCKET = os.environ.get("SKILL_SPAWNER_SOCKET", "").strip()
+SKILL_ENV_ALLOWLIST = [
+    name.strip() for name in os.environ.get("SKILL_ENV_ALLOWLIST", "").split(",") if name.strip()
+]
+SKILL_PRECOMPILE = os.environ.get("SKILL_PRECOMPILE", "1") == "1"
+SKILL_PYTHON_FLAGS = shlex.split(os.environ.get("SKILL_PYTHON_FLAGS", ""))
+# Transpiled TypeScript and NODE_COMPILE_CACHE per node skill; empty disables.
+NODE_CACHE_DIR = os.environ.get("NODE_CACHE_DIR", str(Path(ARTIFACTS_DIR) / ".node-cache")).strip()
+ADAPTIVE_LIMIT = os.environ.get("ADAPTIVE_LIMIT", "0") == "1"
+ADAPTIVE_LIMIT_MIN = int(os.environ.get("ADAPTIVE_LIMIT_MIN", "1"))
+ADAPTIVE_LIMIT_MAX = int(os.environ.get("ADAPTIVE_LIMIT_MAX", "64"))
+ADAPTIVE_LIMIT_INITIAL = int(os.environ.get("ADAPTIVE_LIMIT_INITIAL", "8"))
+BATCH_MAX_ITEMS = int(os.environ.get("BATCH_MAX_ITEMS", "100"))
+BATCH_MAX_PARALLELISM = int(os.environ.get("BATCH_MAX_PARALLELISM", "8"))
+PIPELINE_MAX_NODES = int(os.environ.get("PIPELINE_MAX_NODES", "50"))
+JOB_WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", "4"))
+JOB_WAIT_MAX_MS = int(os.environ.get("JOB_WAIT_MAX_MS", "25000"))
+RUNTIME_ASYNC_VIEWS = os.environ.get("RUNTIME_ASYNC_VIEWS", "0") == "1"